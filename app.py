@@ -2,15 +2,46 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 import warnings
+import os
+import shutil
+import tempfile
+import mimetypes
+import uuid
+import datetime
+from pathlib import Path
+
+from scoring import calculate_exit_air_scores, project_valuation_impact, score_portfolio, SCORE_COLUMNS
+from sweep import run_sensitivity_sweep
+from inverse import solve_required_scores, iso_multiple_line
+from pipeline import build_exit_pipeline, EXIT_PIPELINE_INPUTS
+from peer_index import load_peer_index, ordinal, DEAL_SIZES
+from baselines import load_baseline_table
+from rubric import load_rubric
+from reports import generate_bulk_reports, write_reports_zip
+from jobs import get_job_queue, JobLimitError, DONE, FAILED
+from monte_carlo import simulate_valuation, distribution_from_range, uniform
+from sensitivity import sensitivity_analysis, SENSITIVITY_LABELS
+from cache_policy import bounded_cache, cache_stats, clear_all_caches
+from assessment_store import open_assessment_store, SORTABLE_COLUMNS
+from scenarios import open_scenario_store, INPUT_COLUMNS as SCENARIO_INPUT_COLUMNS
+from buyers import load_buyer_library, BuyerLibrary, BUYER_COLUMNS
+from history import open_score_history, quarter_label, quarter_ordinal, METRIC_COLUMNS, METRIC_LABELS
+from instrumentation import start_rerun, profile_section, profiled_fragment, finish_rerun, METRICS
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from charts import (
+    render_chart_cached, render_dimension_scores, render_valuation_comparison,
+    render_sensitivity_ternary, render_monte_carlo_distribution, render_iso_multiple,
+    CHART_BACKEND, dimension_scores_spec, valuation_comparison_spec, scenario_comparison_spec, score_trend_spec,
+    tornado_spec, buyer_heatmap_spec, iso_multiple_spec
+)
 
 # Suppress warnings for cleaner output in the console. Streamlit's own warnings are handled separately.
 warnings.filterwarnings('ignore')
 
-# Set a consistent aesthetic for plots
-sns.set_theme(style="whitegrid")
+# --- Optional rerun profiling (enabled with QULAB_PROFILING=1) ---
+start_rerun(session_id=getattr(get_script_run_ctx(), 'session_id', None))
+profile_section("page_setup")
 
 # --- Streamlit Page Configuration ---
 st.set_page_config(page_title="QuLab: Exit-Readiness AI Narrative & Valuation Impact Calculator", layout="wide")
@@ -28,9 +59,13 @@ if st.sidebar.button("Reset Application", key="sidebar_reset_button"):
     st.session_state.persona_name = "Jane Doe"
     st.session_state.firm_name = "Alpha Capital"
     st.session_state.company_name = "InnovateTech"
+    st.session_state.sector = "Software"
+    st.session_state.deal_size = "Mid"
     st.session_state.visible_score = 75
     st.session_state.documented_score = 60
     st.session_state.sustainable_score = 80
+    st.session_state.use_rubric = False
+    st.session_state.rubric_ratings = None
     st.session_state.w_visible = 0.35
     st.session_state.w_documented = 0.40
     st.session_state.w_sustainable = 0.25
@@ -42,6 +77,15 @@ if st.sidebar.button("Reset Application", key="sidebar_reset_button"):
     st.session_state.calculate_air_triggered = False
     st.session_state.project_valuation_triggered = False
     st.session_state.generate_narrative_triggered = False
+    st.session_state.sweep_triggered = False
+    st.session_state.monte_carlo_result = None
+    st.session_state.sensitivity_result = None
+    st.session_state.scored_portfolio = None
+    st.session_state.scored_portfolio_key = None
+    st.session_state.bulk_reports_job_id = None
+    st.session_state.monte_carlo_job_id = None
+    st.session_state.sensitivity_job_id = None
+    st.session_state.pipeline = build_exit_pipeline()
     st.rerun()
 
 st.sidebar.divider()
@@ -50,6 +94,7 @@ st.sidebar.divider()
 st.title("QuLab: Exit-Readiness AI Narrative & Valuation Impact Calculator")
 st.divider()
 
+profile_section("session_state_init")
 # --- Initialize session state for persistent variables ---
 # These initializations use the "if not in" pattern, which is standard for Streamlit
 # to maintain state across reruns, unless explicitly cleared (like by the reset button).
@@ -59,12 +104,20 @@ if 'firm_name' not in st.session_state:
     st.session_state.firm_name = "Alpha Capital"
 if 'company_name' not in st.session_state:
     st.session_state.company_name = "InnovateTech"
+if 'sector' not in st.session_state:
+    st.session_state.sector = "Software"
+if 'deal_size' not in st.session_state:
+    st.session_state.deal_size = "Mid"
 if 'visible_score' not in st.session_state:
     st.session_state.visible_score = 75
 if 'documented_score' not in st.session_state:
     st.session_state.documented_score = 60
 if 'sustainable_score' not in st.session_state:
     st.session_state.sustainable_score = 80
+if 'use_rubric' not in st.session_state:
+    st.session_state.use_rubric = False
+if 'rubric_ratings' not in st.session_state:
+    st.session_state.rubric_ratings = None # {criterion id: rating}, seeded from the sliders on first use
 if 'w_visible' not in st.session_state:
     st.session_state.w_visible = 0.35
 if 'w_documented' not in st.session_state:
@@ -89,8 +142,32 @@ if 'project_valuation_triggered' not in st.session_state:
     st.session_state.project_valuation_triggered = False
 if 'generate_narrative_triggered' not in st.session_state:
     st.session_state.generate_narrative_triggered = False
-
-
+if 'sweep_triggered' not in st.session_state:
+    st.session_state.sweep_triggered = False
+if 'monte_carlo_result' not in st.session_state:
+    st.session_state.monte_carlo_result = None
+if 'sensitivity_result' not in st.session_state:
+    st.session_state.sensitivity_result = None
+if 'scored_portfolio' not in st.session_state:
+    st.session_state.scored_portfolio = None # last scored section 6 portfolio, valued for every buyer in section 12
+if 'scored_portfolio_key' not in st.session_state:
+    st.session_state.scored_portfolio_key = None # (upload file_id, weights, baseline, delta) it was scored with
+if 'bulk_reports_job_id' not in st.session_state:
+    st.session_state.bulk_reports_job_id = None
+if 'monte_carlo_job_id' not in st.session_state:
+    st.session_state.monte_carlo_job_id = None
+if 'sensitivity_job_id' not in st.session_state:
+    st.session_state.sensitivity_job_id = None
+# Background jobs belong to an owner id kept in the URL, so they can be found again after navigating away
+if 'job_owner' not in st.session_state:
+    st.session_state.job_owner = st.query_params.get("job_owner") or uuid.uuid4().hex
+    st.query_params["job_owner"] = st.session_state.job_owner
+# Score -> valuation -> narrative dependency graph; recomputes only what the changed inputs affect
+if 'pipeline' not in st.session_state:
+    st.session_state.pipeline = build_exit_pipeline()
+
+
+profile_section("introduction")
 # --- Business Logic / Story Flow Introduction ---
 st.markdown("""
 As **Jane Doe**, a Portfolio Manager at **Alpha Capital**, your mission is to systematically assess one of your portfolio companies,
@@ -111,136 +188,197 @@ st.markdown("---")
 
 
 # --- Utility Functions ---
-@st.cache_data
+DIMENSION_LABELS = ['Visible', 'Documented', 'Sustainable']
+
 def plot_dimension_scores_cached(scores_dict, company_name):
     """
-    Generates a bar chart visualizing the individual AI readiness dimension scores.
-    This cached version handles the plotting and returns a dummy value for caching.
+    Displays a bar chart visualizing the individual AI readiness dimension scores.
+    With the Vega backend the browser draws it from a small spec; otherwise the rendered PNG
+    is served from the shared chart cache, keyed on the plotted inputs.
     """
-    df_scores = pd.DataFrame(list(scores_dict.items()), columns=['Dimension', 'Score'])
+    if CHART_BACKEND == 'vega':
+        st.vega_lite_chart(dimension_scores_spec(scores_dict, company_name), width="stretch")
+    else:
+        st.image(render_chart_cached(render_dimension_scores, scores_dict, company_name))
 
-    fig, ax = plt.subplots(figsize=(8, 5))
-    sns.barplot(x='Dimension', y='Score', data=df_scores, palette='viridis', ax=ax)
-    ax.set_ylim(0, 100)
-    ax.set_title(f"{company_name}'s AI Exit-Readiness Dimension Scores")
-    ax.set_ylabel("Score (0-100)")
-    ax.set_xlabel("AI Capability Dimension")
-    st.pyplot(fig) # Display the plot in Streamlit
-    plt.close(fig) # Close the figure to free up memory
-    return True # Return a dummy value for cache_data to work
+def sync_pipeline_inputs():
+    """Pushes the current workflow inputs from session state into the incremental pipeline."""
+    st.session_state.pipeline.set_inputs(
+        report_date=datetime.date.today(), **{name: st.session_state[name] for name in EXIT_PIPELINE_INPUTS}
+    )
+
+def redraw_later_sections():
+    """
+    A fragment rerun only redraws its own section. Called from a fragment whose change must show in a
+    later section, this reruns the whole app; in a full run the later sections run anyway.
+    """
+    ctx = get_script_run_ctx()
+    if ctx is not None and ctx.fragment_ids_this_run:
+        st.rerun()
+
+def portfolio_company_names(portfolio):
+    """A portfolio's company names; missing or blank names fall back to "Company {row position}"."""
+    fallback = pd.Series([f"Company {i}" for i in range(len(portfolio))], index=portfolio.index)
+    if 'company_name' not in portfolio.columns:
+        return fallback
+    names = portfolio['company_name']
+    return names.where(names.notna() & (names.astype(str).str.strip() != ""), fallback)
+
+def apply_reference_baseline(sector, sub_sector=None, as_of=None, interpolate=False):
+    """
+    Callback: sets the baseline multiple to the sector reference value before the rerun.
+    The widget key is dropped so the number input picks the new value up as its default.
+    """
+    table = load_baseline_table()
+    if table is None or sector not in table.sectors:
+        return
+    multiple = table.baseline_multiple(sector, sub_sector, as_of, interpolate)
+    st.session_state.baseline_ebitda_multiple = round(min(max(multiple, 0.0), 20.0), 1)
+    st.session_state.pop("baseline_ebitda_multiple_input", None)
+
+def prefill_sector_baseline():
+    """Callback for the details form: a newly selected sector pre-fills its latest baseline multiple."""
+    sector = st.session_state.get("sector_select", st.session_state.sector)
+    if sector != st.session_state.sector:
+        apply_reference_baseline(sector)
+
+def run_bulk_reports_job(job, scored_portfolio_df, output_dir, **report_options):
+    """
+    Background job: renders every company report under `output_dir` and packs them into a ZIP.
+    Runs on a job worker thread, so it reports progress through `job` and never calls st.*.
+    """
+    reports_dir = os.path.join(output_dir, "reports")
+    written_reports = generate_bulk_reports(
+        scored_portfolio_df, reports_dir,
+        progress=lambda done, total: job.report(0.95 * done / total, f"Rendered {done:,} of {total:,} reports"),
+        **report_options
+    )
+    job.report(0.95, "Packing ZIP archive")
+    return write_reports_zip(reports_dir, written_reports, os.path.join(output_dir, "ai_exit_reports.zip"))
+
+def run_monte_carlo_job(job, distributions, weights, **options):
+    """Background job: runs the section 8 simulation and returns its MonteCarloResult."""
+    return simulate_valuation(
+        distributions, weights,
+        progress=lambda done, total: job.report(done / total, f"Simulated {done:,} of {total:,} draws"),
+        **options
+    )
+
+def run_sensitivity_job(job, base, distributions, n_samples):
+    """Background job: attributes the projected multiple's variance and returns the SensitivityResult."""
+    return sensitivity_analysis(
+        base, distributions, n_samples=n_samples,
+        progress=lambda done, total: job.report(done / total, f"Evaluated {done} of {total} sample batches")
+    )
+
+def collect_job_result(job_id_key, result_key):
+    """
+    Picks up the result of the background job whose id is kept under `job_id_key` once it has
+    finished, storing it under `result_key`. Returns True while the job is still queued or running.
+    """
+    job = get_job_queue().get(st.session_state[job_id_key]) if st.session_state[job_id_key] else None
+    if job is None:
+        st.session_state[job_id_key] = None
+        return False
+    if job.active:
+        return True
+    if job.status == DONE:
+        st.session_state[result_key] = job.result
+    elif job.status == FAILED:
+        st.error(f"Error: {job.error}")
+    st.session_state[job_id_key] = None
+    return False
+
+def warn_weight_normalization(result, total_weight):
+    """Turns the normalization masks of one calculate_exit_air_scores result into UI messages."""
+    if result.normalized_mask:
+        st.warning(f"Warning: Provided weights sum to {total_weight:.2f}. Normalizing to 1.0 for calculation.")
+        if result.zero_weight_mask:
+            st.error("Error: Sum of weights is zero, cannot normalize. Please provide valid weights.")
 
 # No @st.cache_data for calculate_exit_air_score because it might interact with st.warning directly,
 # and its output (a tuple including normalized weights) is simple enough not to require caching benefits.
 def calculate_exit_air_score(visible, documented, sustainable, w_v, w_d, w_s):
     """
     Calculates the overall Exit-AI-R Score based on dimension scores and custom weights.
-    Also handles weight normalization.
+    Also handles weight normalization. The arithmetic is shared with the vectorized
+    portfolio engine in scoring.py; this wrapper only turns its masks into UI messages.
     """
-    total_weight = w_v + w_d + w_s
-    
-    # Check if total_weight is approximately 1.0, allowing for floating point inaccuracies
-    if not np.isclose(total_weight, 1.0):
-        st.warning(f"Warning: Provided weights sum to {total_weight:.2f}. Normalizing to 1.0 for calculation.")
-        # Ensure that normalization doesn't divide by zero if total_weight is very small or zero
-        if total_weight == 0:
-            st.error("Error: Sum of weights is zero, cannot normalize. Please provide valid weights.")
-            return 0.0, 0.0, 0.0, 0.0 # Return default values to prevent further errors
-        w_v_norm = w_v / total_weight
-        w_d_norm = w_d / total_weight
-        w_s_norm = w_s / total_weight
-    else:
-        w_v_norm = w_v
-        w_d_norm = w_d
-        w_s_norm = w_s
+    result = calculate_exit_air_scores(visible, documented, sustainable, w_v, w_d, w_s)
+    warn_weight_normalization(result, w_v + w_d + w_s)
+    if result.zero_weight_mask:
+        return 0.0, 0.0, 0.0, 0.0 # Return default values to prevent further errors
+    return float(result.score), float(result.w_v), float(result.w_d), float(result.w_s)
 
-    score = (w_v_norm * visible + w_d_norm * documented + w_s_norm * sustainable)
-    return score, w_v_norm, w_d_norm, w_s_norm
+def pipeline_exit_air_score(pipeline):
+    """
+    Returns the Exit-AI-R Score for the pipeline's current scores and weights, with the same
+    normalization messages as calculate_exit_air_score. The pipeline memoizes the calculation.
+    """
+    warn_weight_normalization(
+        pipeline.get('exit_air'),
+        pipeline.get('w_visible') + pipeline.get('w_documented') + pipeline.get('w_sustainable')
+    )
+    return pipeline.get('exit_ai_r_score')
 
-@st.cache_data
+@bounded_cache("valuation", max_entries=1024, ttl_seconds=3600, max_bytes=32 * 1024 * 1024)
 def project_valuation_impact_cached(score, baseline, premium_coeff):
     """
     Projects the potential valuation multiple uplift attributable to the Exit-AI-R score.
     The score is normalized by 100 as it's a percentage-like value (0-100).
+    Accepts scalars or arrays, so a whole portfolio can be projected in one cached call.
     """
-    ai_multiple_uplift = (premium_coeff * score) / 100
-    projected = baseline + ai_multiple_uplift
-    return projected
+    return project_valuation_impact(score, baseline, premium_coeff)
 
-@st.cache_data
 def plot_valuation_comparison_cached(baseline, projected, company_name):
     """
-    Generates a bar chart comparing the baseline and projected EBITDA multiples.
-    This cached version handles the plotting and returns a dummy value for caching.
+    Displays a bar chart comparing the baseline and projected EBITDA multiples.
+    With the Vega backend the browser draws it from a small spec; otherwise the rendered PNG
+    is served from the shared chart cache, keyed on the plotted inputs.
     """
-    multiples_df = pd.DataFrame({
-        'Metric': ['Baseline EBITDA Multiple', 'Projected EBITDA Multiple (with AI Premium)'],
-        'Value': [baseline, projected]
-    })
+    if CHART_BACKEND == 'vega':
+        st.vega_lite_chart(valuation_comparison_spec(baseline, projected, company_name), width="stretch")
+    else:
+        st.image(render_chart_cached(render_valuation_comparison, baseline, projected, company_name))
 
-    fig, ax = plt.subplots(figsize=(8, 5))
-    sns.barplot(x='Metric', y='Value', data=multiples_df, palette='coolwarm', ax=ax)
-    ax.set_title(f"{company_name}'s Valuation Multiple Comparison")
-    ax.set_ylabel("EBITDA Multiple (x)")
-    ax.set_xlabel("")
-    st.pyplot(fig) # Display the plot in Streamlit
-    plt.close(fig) # Close the figure to free up memory
-    return True # Return a dummy value for cache_data
+def plot_iso_multiple_cached(line_x, line_y, current_point, fix_points, axis_labels, target_multiple, company_name):
+    """
+    Displays the iso-multiple line for a target multiple over two dimension scores,
+    with the current scores and the single-dimension improvements that reach it.
+    With the Vega backend the browser draws it from a small spec, so a slider move renders nothing
+    on the server; otherwise the rendered PNG is served from the shared chart cache.
+    """
+    args = (line_x, line_y, current_point, fix_points, axis_labels, target_multiple, company_name)
+    if CHART_BACKEND == 'vega':
+        st.vega_lite_chart(iso_multiple_spec(*args), width="stretch")
+    else:
+        st.image(render_chart_cached(render_iso_multiple, *args))
 
-@st.cache_data
-def generate_ai_exit_narrative_cached(company, air_score, visible, documented, sustainable, base_mult, proj_mult, delta, persona_name, firm_name):
+@bounded_cache("sensitivity_sweep", max_entries=16, ttl_seconds=1800, max_bytes=128 * 1024 * 1024)
+def run_sensitivity_sweep_cached(visible, documented, sustainable, resolution, deltas, baselines):
     """
-    Generates a comprehensive AI exit narrative report.
-    Fixed f-string and SyntaxWarning for LaTeX commands.
+    Runs the broadcasted weight-simplex x delta x baseline sweep.
+    Cached so that browsing the results with the display sliders does not recompute the grid.
     """
-    # Use double backslashes for literal backslashes in f-strings when they are part of LaTeX commands
-    # (e.g., `\\delta` to produce `\delta` in Markdown).
-    narrative = f"""
----
-**{company}: Quantified AI Exit Narrative Report**
-Date: {pd.Timestamp.now().strftime('%Y-%m-%d')}
-Prepared by: {persona_name}, {firm_name}
----
+    return run_sensitivity_sweep(visible, documented, sustainable, resolution, deltas, baselines)
 
-**Executive Summary:**
-{company} demonstrates a strong AI readiness for exit, with an overall **Exit-AI-R Score of {air_score:.2f}**.
-This robust capability is projected to contribute to a significant valuation uplift, transforming the
-baseline sector EBITDA multiple of {base_mult:.2f}x to an estimated **{proj_mult:.2f}x**.
-This uplift, driven by an AI Premium Coefficient ($\\delta$) of {delta:.2f}, underscores the market's
-recognition of {company}'s advanced AI integration and value creation potential.
-
-**1. AI Exit-Readiness Assessment Details:**
-*   **Overall Exit-AI-R Score**: {air_score:.2f} (out of 100)
-*   **Visible AI Capabilities Score**: {visible:.0f}/100
-*   **Documented AI Impact Score**: {documented:.0f}/100
-*   **Sustainable AI Capabilities Score**: {sustainable:.0f}/100
-
-**2. Projected Valuation Impact:**
-*   **Baseline Sector EBITDA Multiple**: {base_mult:.2f}x
-*   **AI Premium Coefficient ($\\delta$)**: {delta:.2f} turns
-*   **Projected EBITDA Multiple (with AI Premium)**: {proj_mult:.2f}x
-*   **Implied Multiple Uplift**: {(proj_mult - base_mult):.2f}x
-
-**3. Strategic Narrative Points:**
-*   **Strong Capability Foundation**: {company} has achieved an impressive Exit-AI-R score of {air_score:.2f},
-    reflecting a deliberate and strategic build-out of AI capabilities that are poised for market recognition and premium valuation.
-*   **Proven Value Creation**: With a **Documented AI Impact Score of {documented:.0f}**, {company}
-    provides auditable evidence of financial return on AI investments, proving that our AI is a profit-center,
-    not just a cost-center. This directly translates into higher, quantifiable value for acquirers.
-*   **Market Differentiation & Visibility**: A high **Visible AI Capabilities Score of {visible:.0f}**
-    ensures that potential buyers can clearly perceive and understand how InnovateTech's AI differentiates
-    its products and services, creating a defensible competitive moat and immediate market appeal.
-*   **Long-term & Scalable Impact**: The **Sustainable AI Capabilities Score of {sustainable:.0f}**
-    assures buyers of deep integration, robust governance, a strong talent base, and scalable processes.
-    This signifies low integration risk and guarantees enduring AI-driven value post-acquisition,
-    making {company} a highly attractive long-term investment.
+def plot_sensitivity_ternary_cached(weights, projected, company_name, delta, baseline):
+    """
+    Displays a ternary plot of the projected EBITDA multiple over the weight simplex
+    for one (delta, baseline) slice of a sensitivity sweep.
+    """
+    st.image(render_chart_cached(render_sensitivity_ternary, weights, projected, company_name, delta, baseline))
 
----
-"""
-    return narrative
+def plot_monte_carlo_distribution_cached(bin_edges, hist_counts, percentiles, company_name):
+    """
+    Displays a histogram of the simulated projected EBITDA multiple with P10/P50/P90 markers.
+    """
+    st.image(render_chart_cached(render_monte_carlo_distribution, bin_edges, hist_counts, percentiles, company_name))
 
 
 # --- Streamlit UI Layout ---
 
+profile_section("1_setup")
 ## 1. Setup and Introduction
 st.header("1. Setting the Stage: InnovateTech's Exit Readiness")
 st.markdown(
@@ -253,12 +391,31 @@ st.markdown(
 )
 
 st.subheader("Persona & Company Details")
-st.session_state.persona_name = st.text_input("Persona Name", value=st.session_state.persona_name, key="persona_name_input")
-st.session_state.firm_name = st.text_input("Firm Name", value=st.session_state.firm_name, key="firm_name_input")
-st.session_state.company_name = st.text_input("Company Name", value=st.session_state.company_name, key="company_name_input")
+# Names appear in every section, so they are applied together on submit with a single full rerun
+with st.form("persona_details_form", border=False):
+    st.session_state.persona_name = st.text_input("Persona Name", value=st.session_state.persona_name, key="persona_name_input")
+    st.session_state.firm_name = st.text_input("Firm Name", value=st.session_state.firm_name, key="firm_name_input")
+    st.session_state.company_name = st.text_input("Company Name", value=st.session_state.company_name, key="company_name_input")
+    # Sector and deal size select the peer group the scores are benchmarked against
+    peer_index = load_peer_index()
+    sector_options = peer_index.sectors if peer_index else [st.session_state.sector]
+    size_options = peer_index.deal_sizes if peer_index else DEAL_SIZES
+    sector_col, size_col = st.columns(2)
+    with sector_col:
+        st.session_state.sector = st.selectbox(
+            "Sector", sector_options, key="sector_select",
+            index=sector_options.index(st.session_state.sector) if st.session_state.sector in sector_options else 0
+        )
+    with size_col:
+        st.session_state.deal_size = st.selectbox(
+            "Deal Size", size_options, key="deal_size_select",
+            index=size_options.index(st.session_state.deal_size) if st.session_state.deal_size in size_options else 0
+        )
+    st.form_submit_button("Update Details", key="update_details_button", on_click=prefill_sector_baseline)
 
 st.markdown("---")
 
+profile_section("2_dimension_scores")
 ## 2. Assessing InnovateTech's AI Exit-Readiness Dimensions
 st.header("2. Assessing InnovateTech's AI Exit-Readiness Dimensions")
 st.markdown(
@@ -270,198 +427,1215 @@ st.markdown(
     """
 )
 
-# Sliders for dimension scores
-st.session_state.visible_score = st.slider(
-    "Visible AI Capabilities Score (0-100)",
-    min_value=0, max_value=100, value=st.session_state.visible_score, step=1,
-    key="visible_score_slider"
-)
-st.info("🎯 **Visible**: Reflects how clearly buyers can perceive InnovateTech's AI in products, services, and core technology stack, indicating immediate market differentiation.")
+def dimension_scores_section():
+    """Dimension scores from the sliders or the sub-criteria rubric, and the score chart."""
+    # Dimension scores come either from the three sliders or from the weighted sub-criteria rubric
+    rubric = load_rubric()
+    if rubric is not None:
+        st.session_state.use_rubric = st.toggle(
+            "Score dimensions from the detailed sub-criteria rubric", value=st.session_state.use_rubric, key="use_rubric_toggle"
+        )
+
+    if rubric is not None and st.session_state.use_rubric:
+        if st.session_state.rubric_ratings is None:
+            # Seeded from the current slider values, so switching to the rubric does not move any score
+            st.session_state.rubric_ratings = rubric.ratings_from_dimension_scores(
+                {col: st.session_state[col] for col in SCORE_COLUMNS}
+            )
+        st.markdown("Rate each criterion from 0 to 100. Weights are relative within each dimension; clear a rating to leave the criterion out.")
+        rubric_df = pd.DataFrame({
+            'Dimension': [rubric.labels[c.dimension] for c in rubric.criteria],
+            'Criterion': [c.label for c in rubric.criteria],
+            'Weight': rubric.matrix.sum(axis=1),
+            'Rating': [st.session_state.rubric_ratings.get(c.id) for c in rubric.criteria],
+        }, index=rubric.ids)
+        edited_rubric_df = st.data_editor(
+            rubric_df, key="rubric_editor", disabled=['Dimension', 'Criterion', 'Weight'],
+            column_config={
+                'Weight': st.column_config.NumberColumn(format="percent"),
+                'Rating': st.column_config.NumberColumn(min_value=0, max_value=100, step=1),
+            }
+        )
+        st.session_state.rubric_ratings = edited_rubric_df['Rating'].astype(float).to_dict()
+
+        rubric_scores = rubric.dimension_scores(st.session_state.rubric_ratings)
+        rubric_score_cols = st.columns(len(SCORE_COLUMNS))
+        for col, score, metric_col in zip(SCORE_COLUMNS, rubric_scores, rubric_score_cols):
+            if np.isnan(score):
+                st.warning(f"No {rubric.labels[col]} criteria are rated; the dimension is scored as 0.")
+                score = 0.0
+            st.session_state[col] = float(score)
+            with metric_col:
+                st.metric(f"{rubric.labels[col]} Score", f"{score:.1f}")
+        # The sliders re-initialize from the rubric scores when the rubric is switched off
+        for slider_key in ("visible_score_slider", "documented_score_slider", "sustainable_score_slider"):
+            st.session_state.pop(slider_key, None)
+    else:
+        # Sliders for dimension scores. Rubric and loaded scores may be fractional while the sliders are
+        # integer widgets, so a score is only replaced once its slider is actually moved
+        visible_score = st.slider(
+            "Visible AI Capabilities Score (0-100)",
+            min_value=0, max_value=100, value=int(round(st.session_state.visible_score)), step=1,
+            key="visible_score_slider"
+        )
+        if visible_score != int(round(st.session_state.visible_score)):
+            st.session_state.visible_score = visible_score
+        st.info("🎯 **Visible**: Reflects how clearly buyers can perceive InnovateTech's AI in products, services, and core technology stack, indicating immediate market differentiation.")
+
+        documented_score = st.slider(
+            "Documented AI Impact Score (0-100)",
+            min_value=0, max_value=100, value=int(round(st.session_state.documented_score)), step=1,
+            key="documented_score_slider"
+        )
+        if documented_score != int(round(st.session_state.documented_score)):
+            st.session_state.documented_score = documented_score
+        st.info("💰 **Documented**: Quantifies the proven financial return on AI investments, such as ROI and EBITDA uplift, providing auditable evidence of value creation.")
+
+        sustainable_score = st.slider(
+            "Sustainable AI Capabilities Score (0-100)",
+            min_value=0, max_value=100, value=int(round(st.session_state.sustainable_score)), step=1,
+            key="sustainable_score_slider"
+        )
+        if sustainable_score != int(round(st.session_state.sustainable_score)):
+            st.session_state.sustainable_score = sustainable_score
+        st.info("🌱 **Sustainable**: Measures the deep integration of AI capabilities, including talent, governance, and scalable processes, assuring buyers of long-term value and low integration risk.")
+
+    if st.button("Plot Dimension Scores", key="plot_scores_button"):
+        st.session_state.plot_scores_triggered = True
+
+    if st.session_state.plot_scores_triggered:
+        innovatech_scores = {
+            'Visible': st.session_state.visible_score,
+            'Documented': st.session_state.documented_score,
+            'Sustainable': st.session_state.sustainable_score
+        }
+        plot_dimension_scores_cached(innovatech_scores, st.session_state.company_name)
+
+    sync_pipeline_inputs()
+
+def exit_air_score_section():
+    """Weights form, the Exit-AI-R Score and its peer percentiles."""
+    ## 3. Calculating the Overall Exit-AI-R Score
+    st.header("3. Calculating the Overall Exit-AI-R Score")
+    st.markdown(
+        """
+        The **Exit-AI-R Score** is a weighted average of the three dimensions, designed to provide a comprehensive
+        measure of InnovateTech's AI readiness for an exit. You can customize the weighting of each AI dimension
+        to reflect varying buyer priorities or market dynamics.
+        """
+    )
+    st.markdown(r"""
+    $$Exit\text{-}AI\text{-}R = w_1 \cdot Visible + w_2 \cdot Documented + w_3 \cdot Sustainable$$
+    """)
+    st.markdown(f"""
+    where:
+    - $Visible$ is the Visible AI Capabilities Score
+    - $Documented$ is the Documented AI Impact Score
+    - $Sustainable$ is the Sustainable AI Capabilities Score
+    - $w_1$, $w_2$, $w_3$ are the custom weights for each dimension.
+    """)
+    # The weights are submitted together with the Calculate button, so editing them triggers no rerun
+    with st.form("weights_form", border=False):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.session_state.w_visible = st.number_input(
+                "Weight for Visible AI ($w_1$)",
+                min_value=0.0, max_value=1.0, value=st.session_state.w_visible, step=0.05, format="%.2f",
+                key="w_visible_input"
+            )
+        with col2:
+            st.session_state.w_documented = st.number_input(
+                "Weight for Documented AI ($w_2$)",
+                min_value=0.0, max_value=1.0, value=st.session_state.w_documented, step=0.05, format="%.2f",
+                key="w_documented_input"
+            )
+        with col3:
+            st.session_state.w_sustainable = st.number_input(
+                "Weight for Sustainable AI ($w_3$)",
+                min_value=0.0, max_value=1.0, value=st.session_state.w_sustainable, step=0.05, format="%.2f",
+                key="w_sustainable_input"
+            )
+
+        st.info("💡 Adjust these weights to reflect how potential buyers (strategic or financial) typically prioritize Visible capabilities, Documented impact, and Sustainable foundations in AI-enabled companies.")
+        calculate_air_clicked = st.form_submit_button("Calculate Exit-AI-R Score", key="calculate_air_button")
+
+    if calculate_air_clicked:
+        st.session_state.calculate_air_triggered = True
+    sync_pipeline_inputs()
+
+    # Once revealed, results follow the current inputs; the pipeline recomputes only stages whose inputs changed
+    if st.session_state.calculate_air_triggered:
+        st.session_state.exit_ai_r_score = pipeline_exit_air_score(st.session_state.pipeline)
+        st.markdown(f"### {st.session_state.company_name}'s calculated Exit-AI-R Score is: **{st.session_state.exit_ai_r_score:.2f}**")
+        peer_context = st.session_state.pipeline.get('peer_context')
+        if peer_context:
+            ranks = peer_context['percentiles']
+            st.markdown(
+                f"**Peer percentile** ({peer_context['group']}, {peer_context['n_peers']:,} assessments): "
+                f"Exit-AI-R **{ordinal(ranks['exit_ai_r_score'])}** · Visible {ordinal(ranks['visible_score'])} · "
+                f"Documented {ordinal(ranks['documented_score'])} · Sustainable {ordinal(ranks['sustainable_score'])}"
+            )
+        st.info(f"📈 The **Exit-AI-R Score** quantifies {st.session_state.company_name}'s overall AI readiness, directly influencing the valuation premium potential. A higher score signifies a more attractive AI proposition for buyers.")
+
+def valuation_section():
+    """Baseline multiple and delta, the projected multiple and the target-multiple solver."""
+    ## 4. Projecting Valuation Uplift through AI Premium
+    st.header("4. Projecting Valuation Uplift through AI Premium")
+    st.markdown(
+        """
+        Now, let's project the potential exit valuation by adding an **AI Premium** to the sector's baseline EBITDA multiple.
+        This premium reflects the market's willingness to pay more for companies with strong, integrated AI capabilities,
+        driven by InnovateTech's calculated Exit-AI-R Score and a market-specific AI Premium Coefficient ($\\delta$).
+        """
+    )
+    st.markdown(r"""
+    $$Multiple_{projected} = Multiple_{baseline} + \delta \cdot \frac{Exit\text{-}AI\text{-}R}{100}$$
+    """)
+    # Corrected f-string for LaTeX command escapes
+    st.markdown(f"""
+    where:
+    - $Multiple_{{projected}}$ is the projected EBITDA multiple including the AI premium.
+    - $Multiple_{{baseline}}$ is the sector's average baseline EBITDA multiple without specific AI considerations.
+    - $\\delta$ (delta) is the AI Premium Coefficient, representing market enthusiasm for AI-driven value.
+    - $Exit\\text{{-}}AI\\text{{-}}R$ is the calculated Exit-AI-R Score (ranging from 0 to 100).
+    """)
+    # Conditional rendering of widgets and button based on exit_ai_r_score
+    if st.session_state.exit_ai_r_score is None:
+        st.warning("Please calculate the Exit-AI-R Score in the previous section to proceed with valuation projection.")
+    else:
+        # Sector reference multiples come from a memory-mapped table shared by all sessions
+        baseline_table = load_baseline_table()
+        if baseline_table is not None and st.session_state.sector in baseline_table.sectors:
+            with st.expander(f"Sector Reference Baseline: {st.session_state.sector}"):
+                first_date, last_date = baseline_table.date_range(st.session_state.sector)
+                col_sub, col_date = st.columns(2)
+                with col_sub:
+                    sub_sector = st.selectbox(
+                        "Sub-sector", ["All sub-sectors"] + baseline_table.sub_sectors(st.session_state.sector),
+                        key="baseline_sub_sector_select"
+                    )
+                with col_date:
+                    as_of = st.date_input(
+                        "As of", value=last_date, min_value=first_date, max_value=last_date, key="baseline_as_of_input"
+                    )
+                interpolate = st.checkbox("Interpolate between quarterly observations", key="baseline_interpolate_checkbox")
+                sub_sector = None if sub_sector == "All sub-sectors" else sub_sector
+                reference = baseline_table.baseline_multiple(st.session_state.sector, sub_sector, as_of, interpolate)
+                st.markdown(f"Reference baseline multiple: **{reference:.2f}x**")
+                st.button(
+                    "Use Reference Baseline", key="apply_reference_baseline_button",
+                    on_click=apply_reference_baseline, args=(st.session_state.sector, sub_sector, as_of, interpolate)
+                )
+
+        col_base, col_coeff = st.columns(2)
+        with col_base:
+            st.session_state.baseline_ebitda_multiple = st.number_input(
+                "Baseline EBITDA Multiple",
+                min_value=0.0, max_value=20.0, value=st.session_state.baseline_ebitda_multiple, step=0.1, format="%.1f",
+                key="baseline_ebitda_multiple_input"
+            )
+        with col_coeff:
+            st.session_state.ai_premium_coefficient = st.slider(
+                "AI Premium Coefficient ($\\delta$)", # Fixed \delta escape for f-string
+                min_value=0.0, max_value=5.0, value=st.session_state.ai_premium_coefficient, step=0.1,
+                key="ai_premium_coefficient_slider"
+            )
+        # Fixed \delta escape for f-string
+        st.info("📊 This coefficient represents the market's enthusiasm for AI-driven value. A higher $\\delta$ implies greater valuation premiums for strong AI capabilities in a given market segment.")
+
+        if st.button("Project Valuation Uplift", key="project_valuation_button"):
+            st.session_state.project_valuation_triggered = True
+        sync_pipeline_inputs()
+
+        if st.session_state.project_valuation_triggered:
+            st.session_state.projected_ebitda_multiple = st.session_state.pipeline.get('projected_ebitda_multiple')
+            st.markdown(f"\n- Baseline EBITDA Multiple: **{st.session_state.baseline_ebitda_multiple:.2f}x**")
+            st.markdown(f"- Projected EBITDA Multiple (with AI Premium): **{st.session_state.projected_ebitda_multiple:.2f}x**")
+            st.info(f"💰 This **Projected EBITDA Multiple** demonstrates the tangible financial benefit of {st.session_state.company_name}'s AI maturity, a critical figure for anchoring your exit negotiations.")
+            plot_valuation_comparison_cached(st.session_state.baseline_ebitda_multiple, st.session_state.projected_ebitda_multiple, st.session_state.company_name)
+
+        st.subheader("Target Multiple: Required Scores")
+        st.markdown(
+            "Work backwards from the multiple you want to defend: the Exit-AI-R Score it requires with the current weights, "
+            "$\\delta$ and baseline, and the smallest change to a single dimension that gets there."
+        )
+        col_target, col_held = st.columns(2)
+        with col_target:
+            target_multiple = st.number_input(
+                "Target EBITDA Multiple", min_value=0.0, max_value=30.0, value=8.5, step=0.1, format="%.1f",
+                key="target_multiple_input"
+            )
+        with col_held:
+            held_dimension = st.selectbox(
+                "Dimension Held Fixed in the Chart", [0, 1, 2], index=2,
+                format_func=lambda k: DIMENSION_LABELS[k], key="iso_held_dimension_select"
+            )
+
+        dimension_scores = [st.session_state.visible_score, st.session_state.documented_score, st.session_state.sustainable_score]
+        inverse = solve_required_scores(
+            target_multiple, *dimension_scores,
+            st.session_state.w_visible, st.session_state.w_documented, st.session_state.w_sustainable,
+            st.session_state.baseline_ebitda_multiple, st.session_state.ai_premium_coefficient
+        )
+        required_score = float(inverse.required_score)
+        if inverse.already_met:
+            st.success(f"The current Exit-AI-R Score of {float(inverse.current_score):.2f} already reaches {target_multiple:.2f}x (it needs {required_score:.2f}).")
+        elif not inverse.feasible:
+            st.error(
+                f"{target_multiple:.2f}x is out of reach with these weights, $\\delta$ and baseline"
+                + (f": it needs an Exit-AI-R Score of {required_score:.2f}, above the maximum of 100." if np.isfinite(required_score) else ".")
+            )
+        else:
+            st.markdown(f"{target_multiple:.2f}x requires an Exit-AI-R Score of **{required_score:.2f}** (currently {float(inverse.current_score):.2f}).")
+            st.dataframe(pd.DataFrame({
+                'Dimension': DIMENSION_LABELS,
+                'Current Score': dimension_scores,
+                'Required Score (Alone)': np.where(inverse.dimension_feasible, inverse.required_dimension, np.nan),
+                'Increase (Points)': np.where(inverse.dimension_feasible, inverse.dimension_increase, np.nan),
+            }), hide_index=True)
+            if inverse.best_dimension >= 0:
+                st.info(f"🎯 Cheapest single-dimension path: raise **{DIMENSION_LABELS[int(inverse.best_dimension)]}** by **{float(inverse.best_increase):.1f}** points.")
+            else:
+                st.warning("No single dimension can reach the target on its own; several scores must rise together (see the chart).")
+
+        x_dim, y_dim = [k for k in range(3) if k != held_dimension]
+        normalized = st.session_state.pipeline.get('exit_air')
+        normalized_weights = [float(normalized.w_v), float(normalized.w_d), float(normalized.w_s)]
+        line_x, line_y = iso_multiple_line(
+            required_score, normalized_weights[x_dim], normalized_weights[y_dim],
+            fixed_contribution=normalized_weights[held_dimension] * dimension_scores[held_dimension]
+        )
+        fix_points = {}
+        if not inverse.already_met:
+            for k in (x_dim, y_dim):
+                if inverse.dimension_feasible[k]:
+                    moved = list(dimension_scores)
+                    moved[k] = float(inverse.required_dimension[k])
+                    fix_points[DIMENSION_LABELS[k]] = (moved[x_dim], moved[y_dim])
+        plot_iso_multiple_cached(
+            line_x, line_y, (dimension_scores[x_dim], dimension_scores[y_dim]), fix_points,
+            (DIMENSION_LABELS[x_dim], DIMENSION_LABELS[y_dim]), target_multiple, st.session_state.company_name
+        )
 
-st.session_state.documented_score = st.slider(
-    "Documented AI Impact Score (0-100)",
-    min_value=0, max_value=100, value=st.session_state.documented_score, step=1,
-    key="documented_score_slider"
+def narrative_section():
+    """The generated AI exit narrative, read from the pipeline."""
+    ## 5. Crafting the Compelling AI Exit Narrative
+    st.header("5. Crafting the Compelling AI Exit Narrative")
+    st.markdown(
+        """
+        The final and most crucial step is to synthesize all your quantitative insights—the AI readiness scores,
+        dimension analyses, and valuation projections—into a cohesive and persuasive narrative report.
+        This report will serve as a foundational document for the Information Memorandum (IM) or management presentation,
+        articulating InnovateTech's unique AI-driven value proposition to potential strategic and financial buyers.
+        """
+    )
+    # Conditional rendering of button based on projected_ebitda_multiple
+    if st.session_state.projected_ebitda_multiple is None:
+        st.warning("Please complete the valuation projection in the previous section to generate the narrative report.")
+    else:
+        if st.button("Generate AI Exit Narrative", key="generate_narrative_button"):
+            st.session_state.generate_narrative_triggered = True
+
+        if st.session_state.generate_narrative_triggered:
+            narrative_text = st.session_state.pipeline.get('narrative')
+            with st.expander("View Generated AI Exit Narrative Report", expanded=True):
+                st.markdown(narrative_text)
+            st.info("📝 This comprehensive report synthesizes all your assessments and calculations into a structured, compelling story for potential acquirers, highlighting InnovateTech's AI-driven value proposition and the tangible financial impact.")
+
+@st.fragment
+@profiled_fragment("2_to_5_assessment_workflow")
+def assessment_workflow_fragment():
+    """
+    Dimension scores, weights, Exit-AI-R Score, valuation projection and narrative (sections 2 to 5).
+    They share one fragment because every later step is derived from the earlier inputs through the
+    incremental pipeline: moving a slider reruns only this fragment and recomputes only the outputs
+    that depend on it.
+    """
+    dimension_scores_section()
+    st.markdown("---")
+
+    profile_section("3_exit_ai_r_score")
+    exit_air_score_section()
+    st.markdown("---")
+
+    profile_section("4_valuation")
+    valuation_section()
+    st.markdown("---")
+
+    profile_section("5_narrative")
+    narrative_section()
+
+assessment_workflow_fragment()
+
+st.markdown("---")
+
+profile_section("6_portfolio")
+## 6. Scoring the Whole Portfolio
+st.header("6. Scoring the Whole Portfolio")
+st.markdown(
+    f"""
+    The same Exit-AI-R and valuation formulas can be applied to every company in your book in a single pass.
+    Upload a CSV with one row per company containing `{'`, `'.join(SCORE_COLUMNS)}` (and optionally `company_name`),
+    or one column per sub-criterion id of the detailed rubric instead of the three dimension scores.
+    Per-row `w_visible`, `w_documented`, `w_sustainable`, `baseline_ebitda_multiple` and `ai_premium_coefficient`
+    columns are used when present; otherwise the weights from section 3 and the valuation inputs from section 4 apply.
+    """
 )
-st.info("💰 **Documented**: Quantifies the proven financial return on AI investments, such as ROI and EBITDA uplift, providing auditable evidence of value creation.")
 
-st.session_state.sustainable_score = st.slider(
-    "Sustainable AI Capabilities Score (0-100)",
-    min_value=0, max_value=100, value=st.session_state.sustainable_score, step=1,
-    key="sustainable_score_slider"
+@st.fragment
+@profiled_fragment("6_portfolio")
+def portfolio_fragment():
+    """Portfolio upload, scoring and bulk reports."""
+    portfolio_file = st.file_uploader("Portfolio CSV", type=["csv"], key="portfolio_file_uploader")
+    st.session_state.scored_portfolio = None
+    st.session_state.scored_portfolio_key = None
+    if portfolio_file is not None:
+        try:
+            portfolio_df = pd.read_csv(portfolio_file)
+            # Rubric criterion columns, when given instead of dimension scores, are rolled up in one matrix product
+            portfolio_rubric = load_rubric()
+            if portfolio_rubric is not None:
+                portfolio_df = portfolio_rubric.with_dimension_scores(portfolio_df)
+            scored_portfolio_df = score_portfolio(
+                portfolio_df,
+                weights=(st.session_state.w_visible, st.session_state.w_documented, st.session_state.w_sustainable)
+            )
+        except (ValueError, pd.errors.ParserError) as e:
+            st.error(f"Error: {e}")
+        else:
+            # Per-row valuation inputs take precedence over the shared section 4 values
+            portfolio_baseline = (
+                portfolio_df['baseline_ebitda_multiple'].to_numpy(dtype=float)
+                if 'baseline_ebitda_multiple' in portfolio_df.columns else st.session_state.baseline_ebitda_multiple
+            )
+            portfolio_coeff = (
+                portfolio_df['ai_premium_coefficient'].to_numpy(dtype=float)
+                if 'ai_premium_coefficient' in portfolio_df.columns else st.session_state.ai_premium_coefficient
+            )
+            scored_portfolio_df['projected_ebitda_multiple'] = project_valuation_impact_cached(
+                scored_portfolio_df['exit_ai_r_score'].to_numpy(), portfolio_baseline, portfolio_coeff
+            )
+            st.session_state.scored_portfolio = scored_portfolio_df.assign(baseline_ebitda_multiple=portfolio_baseline)
+            st.session_state.scored_portfolio_key = (
+                portfolio_file.file_id,
+                st.session_state.w_visible, st.session_state.w_documented, st.session_state.w_sustainable,
+                st.session_state.baseline_ebitda_multiple, st.session_state.ai_premium_coefficient,
+            )
+
+            n_normalized = int((scored_portfolio_df['weights_normalized'] & ~scored_portfolio_df['weights_zero_sum']).sum())
+            n_zero = int(scored_portfolio_df['weights_zero_sum'].sum())
+            if n_normalized:
+                st.warning(f"Warning: {n_normalized} companies have weights that do not sum to 1.0. Normalizing to 1.0 for calculation.")
+            if n_zero:
+                st.error(f"Error: {n_zero} companies have weights summing to zero and were scored as 0.00.")
+
+            st.dataframe(scored_portfolio_df)
+            st.download_button(
+                "Download Scored Portfolio (CSV)",
+                data=scored_portfolio_df.to_csv(index=False).encode("utf-8"),
+                file_name="scored_portfolio.csv",
+                mime="text/csv",
+                key="portfolio_download_button"
+            )
+            if st.button("Save Scored Portfolio to Assessment History", key="portfolio_save_button"):
+                try:
+                    n_saved = open_assessment_store().save_many(scored_portfolio_df.assign(
+                        persona_name=st.session_state.persona_name,
+                        firm_name=st.session_state.firm_name,
+                        company_name=portfolio_company_names(scored_portfolio_df),
+                        w_visible=scored_portfolio_df['w_visible_norm'],
+                        w_documented=scored_portfolio_df['w_documented_norm'],
+                        w_sustainable=scored_portfolio_df['w_sustainable_norm'],
+                        baseline_ebitda_multiple=portfolio_baseline,
+                        ai_premium_coefficient=portfolio_coeff,
+                    ))
+                except ValueError as e:
+                    st.error(f"Error: {e}")
+                else:
+                    st.success(f"Saved {n_saved:,} assessments. Browse them in section 9.")
+
+            st.subheader("Bulk AI Exit Narrative Reports")
+            st.markdown("Render the narrative report for every company in the uploaded portfolio, optionally with its two charts, and download them as one ZIP archive.")
+            col_report_charts, col_report_workers = st.columns(2)
+            with col_report_charts:
+                bulk_include_charts = st.checkbox("Include Charts", value=True, key="bulk_reports_charts_checkbox")
+            with col_report_workers:
+                bulk_report_workers = st.number_input(
+                    "Worker Processes", min_value=1, max_value=os.cpu_count() or 1, value=os.cpu_count() or 1, step=1,
+                    key="bulk_reports_workers_input"
+                )
+
+            if st.button("Generate Bulk Reports", key="bulk_reports_button"):
+                # Reports render in a background job, in a temporary folder removed when the job expires
+                bulk_output_dir = tempfile.mkdtemp(prefix="qulab_reports_")
+                try:
+                    bulk_job = get_job_queue().submit(
+                        st.session_state.job_owner, f"Bulk reports ({len(scored_portfolio_df):,} companies)",
+                        run_bulk_reports_job, scored_portfolio_df.copy(), bulk_output_dir,
+                        baseline=st.session_state.baseline_ebitda_multiple,
+                        delta=st.session_state.ai_premium_coefficient,
+                        persona_name=st.session_state.persona_name,
+                        firm_name=st.session_state.firm_name,
+                        with_charts=bulk_include_charts,
+                        n_workers=int(bulk_report_workers),
+                        cleanup=lambda job: shutil.rmtree(bulk_output_dir, ignore_errors=True)
+                    )
+                except JobLimitError as e:
+                    shutil.rmtree(bulk_output_dir, ignore_errors=True)
+                    st.error(f"Error: {e}")
+                else:
+                    st.session_state.bulk_reports_job_id = bulk_job.id
+                    st.rerun() # Full rerun so the sidebar job panel starts polling
+
+            if st.session_state.bulk_reports_job_id and get_job_queue().get(st.session_state.bulk_reports_job_id):
+                st.info("⏳ Bulk reports run in the background. Follow their progress and download the ZIP under **Background Jobs** in the sidebar; the job keeps running if you leave this page.")
+
+    # Section 12 values the scored portfolio for every buyer; redraw it if it shows a different portfolio
+    if (
+        'buyer_matrix_portfolio_key' in st.session_state
+        and st.session_state.buyer_matrix_portfolio_key != st.session_state.scored_portfolio_key
+    ):
+        redraw_later_sections()
+
+portfolio_fragment()
+
+st.markdown("---")
+
+profile_section("7_sensitivity_sweep")
+## 7. Sensitivity Sweep Across Buyer Weights and AI Premium
+st.header("7. Sensitivity Sweep Across Buyer Weights and AI Premium")
+st.markdown(
+    """
+    Instead of trying one weight and $\\delta$ combination at a time, sweep the full space of buyer priorities at once.
+    Every weight triplet on a grid over $w_1 + w_2 + w_3 = 1$ is combined with a range of AI Premium Coefficients
+    and baseline multiples, using the current dimension scores from section 2. The ternary plot shows the projected
+    EBITDA multiple for each weight mix at the selected $\\delta$ and baseline.
+    """
 )
-st.info("🌱 **Sustainable**: Measures the deep integration of AI capabilities, including talent, governance, and scalable processes, assuring buyers of long-term value and low integration risk.")
 
-if st.button("Plot Dimension Scores", key="plot_scores_button"):
-    st.session_state.plot_scores_triggered = True
+@st.fragment
+@profiled_fragment("7_sensitivity_sweep")
+def sensitivity_sweep_fragment():
+    """Sweep inputs and the ternary plot; browsing the results only reruns this section."""
+    col_res, col_delta, col_sweep_base = st.columns(3)
+    with col_res:
+        sweep_resolution = st.select_slider(
+            "Weight Grid Resolution",
+            options=[0.1, 0.05, 0.02, 0.01], value=0.01, format_func=lambda r: f"{r:.0%}",
+            key="sweep_resolution_slider"
+        )
+    with col_delta:
+        sweep_delta_range = st.slider(
+            "AI Premium Coefficient Range ($\\delta$)",
+            min_value=0.0, max_value=5.0, value=(0.0, 5.0), step=0.1,
+            key="sweep_delta_range_slider"
+        )
+        sweep_n_deltas = st.number_input(
+            "Number of $\\delta$ Values", min_value=2, max_value=200, value=50, step=1,
+            key="sweep_n_deltas_input"
+        )
+    with col_sweep_base:
+        sweep_baseline_range = st.slider(
+            "Baseline EBITDA Multiple Range",
+            min_value=0.0, max_value=20.0, value=(5.0, 9.0), step=0.5,
+            key="sweep_baseline_range_slider"
+        )
+        sweep_n_baselines = st.number_input(
+            "Number of Baseline Values", min_value=1, max_value=50, value=5, step=1,
+            key="sweep_n_baselines_input"
+        )
 
-if st.session_state.plot_scores_triggered:
-    innovatech_scores = {
-        'Visible': st.session_state.visible_score,
-        'Documented': st.session_state.documented_score,
-        'Sustainable': st.session_state.sustainable_score
-    }
-    plot_dimension_scores_cached(innovatech_scores, st.session_state.company_name)
+    if st.button("Run Sensitivity Sweep", key="run_sweep_button"):
+        st.session_state.sweep_triggered = True
 
+    if st.session_state.sweep_triggered:
+        sweep = run_sensitivity_sweep_cached(
+            st.session_state.visible_score,
+            st.session_state.documented_score,
+            st.session_state.sustainable_score,
+            sweep_resolution,
+            tuple(np.linspace(*sweep_delta_range, int(sweep_n_deltas))),
+            tuple(np.linspace(*sweep_baseline_range, int(sweep_n_baselines)))
+        )
+        st.markdown(
+            f"Evaluated **{sweep.projected.size:,}** combinations "
+            f"({len(sweep.weights):,} weight points x {len(sweep.deltas)} $\\delta$ values x {len(sweep.baselines)} baselines)."
+        )
+
+        col_show_delta, col_show_base = st.columns(2)
+        with col_show_delta:
+            delta_idx = st.select_slider(
+                "Show $\\delta$", options=list(range(len(sweep.deltas))), value=len(sweep.deltas) // 2,
+                format_func=lambda i: f"{sweep.deltas[i]:.2f}", key="sweep_show_delta_slider"
+            )
+        with col_show_base:
+            baseline_idx = st.select_slider(
+                "Show Baseline Multiple", options=list(range(len(sweep.baselines))), value=len(sweep.baselines) // 2,
+                format_func=lambda i: f"{sweep.baselines[i]:.2f}x", key="sweep_show_baseline_slider"
+            )
+
+        projected_slice = sweep.projected[:, delta_idx, baseline_idx]
+        plot_sensitivity_ternary_cached(
+            sweep.weights, projected_slice, st.session_state.company_name,
+            sweep.deltas[delta_idx], sweep.baselines[baseline_idx]
+        )
+
+        best_idx, worst_idx = int(np.argmax(projected_slice)), int(np.argmin(projected_slice))
+        st.dataframe(pd.DataFrame({
+            'Case': ['Most favourable buyer weights', 'Least favourable buyer weights'],
+            'w_visible': sweep.weights[[best_idx, worst_idx], 0],
+            'w_documented': sweep.weights[[best_idx, worst_idx], 1],
+            'w_sustainable': sweep.weights[[best_idx, worst_idx], 2],
+            'Exit-AI-R Score': sweep.scores[[best_idx, worst_idx]],
+            'Projected EBITDA Multiple': projected_slice[[best_idx, worst_idx]],
+        }))
+        st.info("🧭 The spread between the most and least favourable weightings shows how much of the valuation story depends on which buyer priorities you are pitching to.")
+
+sensitivity_sweep_fragment()
 
 st.markdown("---")
 
-## 3. Calculating the Overall Exit-AI-R Score
-st.header("3. Calculating the Overall Exit-AI-R Score")
+profile_section("8_monte_carlo")
+## 8. Valuation Uncertainty with Monte Carlo Simulation
+st.header("8. Valuation Uncertainty with Monte Carlo Simulation")
 st.markdown(
     """
-    The **Exit-AI-R Score** is a weighted average of the three dimensions, designed to provide a comprehensive
-    measure of InnovateTech's AI readiness for an exit. You can customize the weighting of each AI dimension
-    to reflect varying buyer priorities or market dynamics.
+    Due-diligence scores are ranges, not points. Give each input a distribution around its current value and
+    simulate the Exit-AI-R and valuation chain many times to see the range of projected EBITDA multiples.
+    **Triangular** peaks at the current value, **Normal** treats the range as $\\pm 2$ standard deviations, and
+    **Uniform** draws evenly across the range. The weights from section 3 are applied to every draw.
     """
 )
-st.markdown(r"""
-$$Exit\text{-}AI\text{-}R = w_1 \cdot Visible + w_2 \cdot Documented + w_3 \cdot Sustainable$$
-""")
-st.markdown(f"""
-where:
-- $Visible$ is the Visible AI Capabilities Score
-- $Documented$ is the Documented AI Impact Score
-- $Sustainable$ is the Sustainable AI Capabilities Score
-- $w_1$, $w_2$, $w_3$ are the custom weights for each dimension.
-""")
 
-col1, col2, col3 = st.columns(3)
-with col1:
-    st.session_state.w_visible = st.number_input(
-        "Weight for Visible AI ($w_1$)",
-        min_value=0.0, max_value=1.0, value=st.session_state.w_visible, step=0.05, format="%.2f",
-        key="w_visible_input"
-    )
-with col2:
-    st.session_state.w_documented = st.number_input(
-        "Weight for Documented AI ($w_2$)",
-        min_value=0.0, max_value=1.0, value=st.session_state.w_documented, step=0.05, format="%.2f",
-        key="w_documented_input"
-    )
-with col3:
-    st.session_state.w_sustainable = st.number_input(
-        "Weight for Sustainable AI ($w_3$)",
-        min_value=0.0, max_value=1.0, value=st.session_state.w_sustainable, step=0.05, format="%.2f",
-        key="w_sustainable_input"
+@st.fragment
+@profiled_fragment("8_monte_carlo")
+def monte_carlo_fragment():
+    """Distribution inputs, simulation and results; reruns on its own while inputs are edited."""
+    mc_input_specs = [
+        # (name, label, current value, default half-width, slider min, slider max, step)
+        ('visible', "Visible Score", st.session_state.visible_score, 10, 0, 100, 1),
+        ('documented', "Documented Score", st.session_state.documented_score, 10, 0, 100, 1),
+        ('sustainable', "Sustainable Score", st.session_state.sustainable_score, 10, 0, 100, 1),
+        ('delta', "AI Premium Coefficient ($\\delta$)", st.session_state.ai_premium_coefficient, 0.5, 0.0, 5.0, 0.1),
+        ('baseline', "Baseline EBITDA Multiple", st.session_state.baseline_ebitda_multiple, 1.0, 0.0, 20.0, 0.1),
+    ]
+    mc_distributions = {}
+    for mc_col, (name, label, value, half_width, lo, hi, step) in zip(st.columns(len(mc_input_specs)), mc_input_specs):
+        with mc_col:
+            kind = st.selectbox(label, ["Triangular", "Normal", "Uniform", "Fixed"], key=f"mc_{name}_kind_select")
+            default_range = (max(lo, value - half_width), min(hi, value + half_width))
+            if isinstance(step, int):
+                # Rubric-derived scores can be fractional; integer sliders need integer bounds
+                default_range = tuple(int(round(bound)) for bound in default_range)
+            value_range = st.slider(
+                f"{label} Range", min_value=lo, max_value=hi,
+                value=default_range, step=step,
+                key=f"mc_{name}_range_slider", disabled=(kind == "Fixed")
+            )
+            mc_distributions[name] = distribution_from_range(kind, value, *value_range, clip_low=lo, clip_high=hi)
+
+    col_draws, col_seed, col_workers = st.columns(3)
+    with col_draws:
+        mc_n_draws = st.number_input("Number of Draws", min_value=1_000, max_value=50_000_000, value=1_000_000, step=100_000, key="mc_n_draws_input")
+    with col_seed:
+        mc_seed = st.number_input("Random Seed", min_value=0, value=42, step=1, key="mc_seed_input")
+    with col_workers:
+        mc_n_workers = st.number_input("Worker Processes", min_value=1, max_value=os.cpu_count() or 1, value=1, step=1, key="mc_n_workers_input")
+
+    if st.button("Run Monte Carlo Simulation", key="run_monte_carlo_button"):
+        # Large simulations run as a background job, so the session stays responsive and can cancel them
+        try:
+            mc_job = get_job_queue().submit(
+                st.session_state.job_owner, f"Monte Carlo simulation ({int(mc_n_draws):,} draws)",
+                run_monte_carlo_job, mc_distributions,
+                (st.session_state.w_visible, st.session_state.w_documented, st.session_state.w_sustainable),
+                n_draws=int(mc_n_draws), seed=int(mc_seed), n_workers=int(mc_n_workers)
+            )
+        except JobLimitError as e:
+            st.error(f"Error: {e}")
+        else:
+            st.session_state.monte_carlo_job_id = mc_job.id
+            st.rerun() # Full rerun so the sidebar job panel starts polling
+
+    if collect_job_result('monte_carlo_job_id', 'monte_carlo_result'):
+        st.info("⏳ The simulation runs in the background. Follow its progress under **Background Jobs** in the sidebar; the results appear here once it finishes.")
+
+    if st.session_state.monte_carlo_result is not None:
+        mc_result = st.session_state.monte_carlo_result
+        col_p10, col_p50, col_p90, col_mean = st.columns(4)
+        col_p10.metric("P10 Projected Multiple", f"{mc_result.percentiles[10]:.2f}x")
+        col_p50.metric("P50 Projected Multiple", f"{mc_result.percentiles[50]:.2f}x")
+        col_p90.metric("P90 Projected Multiple", f"{mc_result.percentiles[90]:.2f}x")
+        col_mean.metric("Mean (Std. Dev.)", f"{mc_result.mean:.2f}x", f"±{mc_result.std:.2f}", delta_color="off")
+        plot_monte_carlo_distribution_cached(mc_result.bin_edges, mc_result.hist_counts, mc_result.percentiles, st.session_state.company_name)
+        st.info(f"🎲 Based on {mc_result.n_draws:,} simulated draws. The P10-P90 band is the range to quote when buyers challenge the point estimate.")
+
+    st.subheader("What Drives the Projected Multiple?")
+    st.markdown(
+        """
+        Attribute the projected multiple's variance to each input over the ranges above, with each weight also varied
+        uniformly by the amount below. The **first-order** index is the share of variance an input explains on its
+        own and the **total effect** adds its interactions with the other inputs. The **derivative** is the change
+        in multiple per unit of the input at the current values. The tornado shows how far the multiple moves when
+        each input alone goes from its P10 to its P90.
+        """
     )
+    col_weight_range, col_samples = st.columns(2)
+    with col_weight_range:
+        weight_half_width = st.slider("Weight Uncertainty (±)", min_value=0.0, max_value=0.3, value=0.1, step=0.01, key="sensitivity_weight_range_slider")
+    with col_samples:
+        n_sensitivity_samples = st.selectbox(
+            "Quasi-Random Samples", [10_000, 50_000, 100_000, 500_000], index=2,
+            format_func=lambda n: f"{n:,}", key="sensitivity_samples_select"
+        )
+
+    if st.button("Attribute Valuation Sensitivity", key="run_sensitivity_button"):
+        weights = {
+            'w_visible': st.session_state.w_visible,
+            'w_documented': st.session_state.w_documented,
+            'w_sustainable': st.session_state.w_sustainable,
+        }
+        base = {
+            'visible': st.session_state.visible_score,
+            'documented': st.session_state.documented_score,
+            'sustainable': st.session_state.sustainable_score,
+            'delta': st.session_state.ai_premium_coefficient,
+            'baseline': st.session_state.baseline_ebitda_multiple,
+            **weights,
+        }
+        distributions = dict(mc_distributions)
+        if weight_half_width > 0:
+            distributions.update({
+                name: uniform(max(0.0, value - weight_half_width), min(1.0, value + weight_half_width))
+                for name, value in weights.items()
+            })
+        try:
+            sensitivity_job = get_job_queue().submit(
+                st.session_state.job_owner, f"Sensitivity attribution ({int(n_sensitivity_samples):,} samples)",
+                run_sensitivity_job, base, distributions, int(n_sensitivity_samples)
+            )
+        except JobLimitError as e:
+            st.error(f"Error: {e}")
+        else:
+            st.session_state.sensitivity_job_id = sensitivity_job.id
+            st.rerun() # Full rerun so the sidebar job panel starts polling
+
+    if collect_job_result('sensitivity_job_id', 'sensitivity_result'):
+        st.info("⏳ The attribution runs in the background. Follow its progress under **Background Jobs** in the sidebar; the results appear here once it finishes.")
+
+    if st.session_state.sensitivity_result is not None:
+        sensitivity = st.session_state.sensitivity_result
+        if sensitivity.variance == 0:
+            st.info("Every input is fixed, so the projected multiple has no variance to attribute.")
+        else:
+            st.vega_lite_chart(
+                tornado_spec(sensitivity.indices, sensitivity.base_projected, st.session_state.company_name, SENSITIVITY_LABELS),
+                width="stretch"
+            )
+            table = sensitivity.indices.sort_values('total_effect', ascending=False)
+            table = table[['first_order', 'total_effect', 'derivative', 'low', 'high', 'projected_low', 'projected_high']]
+            table.index = table.index.map(SENSITIVITY_LABELS)
+            st.dataframe(table.rename(columns={
+                'first_order': "First-Order Index", 'total_effect': "Total Effect", 'derivative': "dMultiple/dInput",
+                'low': "Input P10", 'high': "Input P90", 'projected_low': "Multiple at P10", 'projected_high': "Multiple at P90",
+            }).round(4))
+            driver = table.index[0]
+            st.info(
+                f"📊 {driver} explains {table['total_effect'].iloc[0]:.0%} of the projected multiple's variance "
+                f"(standard deviation {sensitivity.variance ** 0.5:.2f}x around a mean of {sensitivity.mean:.2f}x), "
+                f"based on {sensitivity.n_samples:,} quasi-random samples."
+            )
+
+monte_carlo_fragment()
+
+st.markdown("---")
 
-st.info("💡 Adjust these weights to reflect how potential buyers (strategic or financial) typically prioritize Visible capabilities, Documented impact, and Sustainable foundations in AI-enabled companies.")
+profile_section("9_saved_assessments")
+## 9. Saved Assessments
+st.header("9. Saved Assessments")
+st.markdown(
+    """
+    Save the current assessment, with its inputs, weights, valuation results and narrative, to the local
+    assessment database, then filter, page through, compare or reload any past assessment.
+    Reloading restores every input in sections 1 to 5.
+    """
+)
 
-if st.button("Calculate Exit-AI-R Score", key="calculate_air_button"):
+# Session state key -> widget key for every input restored when a saved assessment is loaded
+LOADED_ASSESSMENT_INPUTS = {
+    'persona_name': "persona_name_input",
+    'firm_name': "firm_name_input",
+    'company_name': "company_name_input",
+    'visible_score': "visible_score_slider",
+    'documented_score': "documented_score_slider",
+    'sustainable_score': "sustainable_score_slider",
+    'w_visible': "w_visible_input",
+    'w_documented': "w_documented_input",
+    'w_sustainable': "w_sustainable_input",
+    'baseline_ebitda_multiple': "baseline_ebitda_multiple_input",
+    'ai_premium_coefficient': "ai_premium_coefficient_slider",
+}
+
+def restore_workflow_inputs(saved):
+    """
+    Copies saved input values (a dict keyed like LOADED_ASSESSMENT_INPUTS) into session state and
+    marks the results as calculated. The results are recomputed from the restored inputs rather than
+    copied, so they always match them. Widget keys are dropped so every input re-initializes from
+    the loaded values on the next full rerun.
+    """
+    for state_key, widget_key in LOADED_ASSESSMENT_INPUTS.items():
+        if saved.get(state_key) is not None:
+            # Exact values, including fractional rubric scores; the sliders keep them until moved
+            st.session_state[state_key] = float(saved[state_key]) if state_key.endswith('_score') else saved[state_key]
+        st.session_state.pop(widget_key, None)
+    sync_pipeline_inputs()
+    st.session_state.exit_ai_r_score = st.session_state.pipeline.get('exit_ai_r_score')
     st.session_state.calculate_air_triggered = True
-    st.session_state.exit_ai_r_score, _, _, _ = calculate_exit_air_score(
-        st.session_state.visible_score,
-        st.session_state.documented_score,
-        st.session_state.sustainable_score,
-        st.session_state.w_visible,
-        st.session_state.w_documented,
-        st.session_state.w_sustainable
+    st.session_state.project_valuation_triggered = saved.get('projected_ebitda_multiple') is not None
+    st.session_state.projected_ebitda_multiple = (
+        st.session_state.pipeline.get('projected_ebitda_multiple') if st.session_state.project_valuation_triggered else None
+    )
+    st.session_state.generate_narrative_triggered = False
+    # Saved inputs hold dimension scores only, so the loaded scores go back on the sliders
+    st.session_state.use_rubric = False
+    st.session_state.rubric_ratings = None
+    for rubric_key in ("use_rubric_toggle", "rubric_editor"):
+        st.session_state.pop(rubric_key, None)
+
+def load_assessment_into_session(assessment_id):
+    """Button callback that copies a saved assessment into session state."""
+    saved = open_assessment_store().get(assessment_id)
+    if saved is None:
+        return
+    restore_workflow_inputs(saved)
+    st.session_state.assessment_loaded = True
+
+@st.fragment
+@profiled_fragment("9_saved_assessments")
+def saved_assessments_fragment():
+    """Saving, filtering, paging, comparing and reloading stored assessments."""
+    if st.session_state.pop('assessment_loaded', False):
+        st.rerun() # The loaded inputs belong to other sections, so redraw the whole app
+
+    store = open_assessment_store()
+    if st.session_state.projected_ebitda_multiple is None:
+        st.warning("Please complete the valuation projection in section 4 to save the current assessment.")
+    elif st.button("Save Current Assessment", key="save_assessment_button"):
+        assessment_id = store.save({
+            'persona_name': st.session_state.persona_name,
+            'firm_name': st.session_state.firm_name,
+            'company_name': st.session_state.company_name,
+            'visible_score': st.session_state.visible_score,
+            'documented_score': st.session_state.documented_score,
+            'sustainable_score': st.session_state.sustainable_score,
+            'w_visible': st.session_state.w_visible,
+            'w_documented': st.session_state.w_documented,
+            'w_sustainable': st.session_state.w_sustainable,
+            'baseline_ebitda_multiple': st.session_state.baseline_ebitda_multiple,
+            'ai_premium_coefficient': st.session_state.ai_premium_coefficient,
+            'exit_ai_r_score': st.session_state.exit_ai_r_score,
+            'projected_ebitda_multiple': st.session_state.projected_ebitda_multiple,
+            'narrative': st.session_state.pipeline.get('narrative'),
+        })
+        st.success(f"Saved assessment #{assessment_id}.")
+
+    st.subheader("Browse Assessments")
+    col_company, col_firm, col_dates, col_scores = st.columns(4)
+    with col_company:
+        company_filter = st.text_input("Company Name Starts With", key="history_company_filter")
+    with col_firm:
+        firm_filter = st.text_input("Firm Name", key="history_firm_filter")
+    with col_dates:
+        date_from = st.date_input("Saved From", value=None, key="history_date_from_input")
+        date_to = st.date_input("Saved To", value=None, key="history_date_to_input")
+    with col_scores:
+        score_range = st.slider(
+            "Exit-AI-R Score Range", min_value=0.0, max_value=100.0, value=(0.0, 100.0), step=1.0,
+            key="history_score_range_slider"
+        )
+    filters = dict(
+        company_prefix=company_filter.strip() or None,
+        firm=firm_filter.strip() or None,
+        date_from=date_from.isoformat() if date_from else None,
+        date_to=date_to.isoformat() if date_to else None,
+        min_score=score_range[0] if score_range[0] > 0 else None,
+        max_score=score_range[1] if score_range[1] < 100 else None,
     )
 
-if st.session_state.calculate_air_triggered and st.session_state.exit_ai_r_score is not None:
-    st.markdown(f"### {st.session_state.company_name}'s calculated Exit-AI-R Score is: **{st.session_state.exit_ai_r_score:.2f}**")
-    st.info(f"📈 The **Exit-AI-R Score** quantifies {st.session_state.company_name}'s overall AI readiness, directly influencing the valuation premium potential. A higher score signifies a more attractive AI proposition for buyers.")
+    n_matching = store.count(**filters)
+    col_sort, col_order, col_page_size, col_page = st.columns(4)
+    with col_sort:
+        order_by = st.selectbox("Sort By", SORTABLE_COLUMNS, key="history_sort_select")
+    with col_order:
+        descending = st.toggle("Descending", value=True, key="history_descending_toggle")
+    with col_page_size:
+        page_size = st.selectbox("Rows per Page", [25, 50, 100], index=1, key="history_page_size_select")
+    with col_page:
+        n_pages = max(1, -(-n_matching // page_size))
+        page = st.number_input(f"Page (of {n_pages:,})", min_value=1, max_value=n_pages, value=1, step=1, key="history_page_input")
+
+    page_df = store.query(**filters, order_by=order_by, descending=descending, page=int(page) - 1, page_size=page_size)
+    st.caption(f"{n_matching:,} matching assessments.")
+    st.dataframe(page_df, hide_index=True)
+
+    if not page_df.empty:
+        companies_by_id = dict(zip(page_df['id'], page_df['company_name']))
+        col_load, col_compare = st.columns(2)
+        with col_load:
+            selected_id = st.selectbox(
+                "Assessment", list(companies_by_id), format_func=lambda i: f"#{i} {companies_by_id[i]}",
+                key="history_selected_select"
+            )
+            st.button("Load into Workflow", key="history_load_button", on_click=load_assessment_into_session, args=(int(selected_id),))
+            saved_narrative = store.get(selected_id)['narrative']
+            if saved_narrative:
+                with st.expander("Saved AI Exit Narrative Report"):
+                    st.markdown(saved_narrative)
+        with col_compare:
+            compare_ids = st.multiselect(
+                "Compare Assessments", list(companies_by_id), format_func=lambda i: f"#{i} {companies_by_id[i]}",
+                key="history_compare_select"
+            )
+            if compare_ids:
+                st.dataframe(store.get_many(compare_ids).set_index('id').T.astype(str)) # Mixed-type rows, shown as text
+
+saved_assessments_fragment()
 
 st.markdown("---")
 
-## 4. Projecting Valuation Uplift through AI Premium
-st.header("4. Projecting Valuation Uplift through AI Premium")
+profile_section("10_scenarios")
+## 10. What-If Scenarios
+st.header("10. What-If Scenarios")
 st.markdown(
-    """
-    Now, let's project the potential exit valuation by adding an **AI Premium** to the sector's baseline EBITDA multiple.
-    This premium reflects the market's willingness to pay more for companies with strong, integrated AI capabilities,
-    driven by InnovateTech's calculated Exit-AI-R Score and a market-specific AI Premium Coefficient ($\\delta$).
+    f"""
+    Keep several named cases for **{st.session_state.company_name}** side by side, such as a strategic buyer, a financial
+    sponsor and a downside case, instead of overwriting one set of inputs. Each scenario stores its scores, weights,
+    $\\delta$ and baseline multiple. Compare any selection against a base scenario, push shared inputs from the current
+    workflow into every scenario at once, or load a scenario back into sections 2 to 5.
     """
 )
-st.markdown(r"""
-$$Multiple_{projected} = Multiple_{baseline} + \delta \cdot \frac{Exit\text{-}AI\text{-}R}{100}$$
-""")
-# Corrected f-string for LaTeX command escapes
-st.markdown(f"""
-where:
-- $Multiple_{{projected}}$ is the projected EBITDA multiple including the AI premium.
-- $Multiple_{{baseline}}$ is the sector's average baseline EBITDA multiple without specific AI considerations.
-- $\\delta$ (delta) is the AI Premium Coefficient, representing market enthusiasm for AI-driven value.
-- $Exit\\text{{-}}AI\\text{{-}}R$ is the calculated Exit-AI-R Score (ranging from 0 to 100).
-""")
 
-# Conditional rendering of widgets and button based on exit_ai_r_score
-if st.session_state.exit_ai_r_score is None:
-    st.warning("Please calculate the Exit-AI-R Score in the previous section to proceed with valuation projection.")
-else:
-    col_base, col_coeff = st.columns(2)
+def load_scenario_into_session(company, scenario):
+    """Button callback that copies a saved scenario's inputs into session state."""
+    rows = open_scenario_store().scenarios(company)
+    rows = rows[rows['scenario'] == scenario]
+    if rows.empty:
+        return
+    restore_workflow_inputs(rows.iloc[0].to_dict())
+    st.session_state.scenario_loaded = True
+
+@st.fragment
+@profiled_fragment("10_scenarios")
+def scenarios_fragment():
+    """Saving, comparing, updating and loading the current company's scenarios."""
+    if st.session_state.pop('scenario_loaded', False):
+        st.rerun() # The loaded inputs belong to other sections, so redraw the whole app
+
+    store = open_scenario_store()
+    company = st.session_state.company_name
+    current_inputs = {col: st.session_state[col] for col in SCENARIO_INPUT_COLUMNS}
+
+    col_scenario_name, col_scenario_save = st.columns([3, 1], vertical_alignment="bottom")
+    with col_scenario_name:
+        scenario_name = st.text_input("Scenario Name", value="Base case", key="scenario_name_input").strip()
+    with col_scenario_save:
+        if st.button("Save Current Inputs", key="save_scenario_button") and scenario_name:
+            store.save(company, scenario_name, **current_inputs)
+            st.success(f"Saved scenario '{scenario_name}' for {company}.")
+
+    scenarios_df = store.scenarios(company)
+    if scenarios_df.empty:
+        st.info(f"No scenarios saved for {company} yet.")
+        return
+
+    with st.expander("Apply Shared Inputs to Every Scenario"):
+        shared_inputs = st.multiselect(
+            "Current workflow inputs to apply", SCENARIO_INPUT_COLUMNS, default=SCORE_COLUMNS, key="scenario_shared_inputs_select"
+        )
+        if st.button("Apply to All Scenarios", key="apply_shared_scenario_button") and shared_inputs:
+            # One vectorized recompute of every scenario of the company
+            n_updated = store.update_shared(company, **{col: current_inputs[col] for col in shared_inputs})
+            st.success(f"Updated {n_updated} scenarios.")
+            scenarios_df = store.scenarios(company)
+
+    scenario_names = scenarios_df['scenario'].tolist()
+    col_compare, col_base = st.columns([3, 1])
+    with col_compare:
+        compared = st.multiselect("Compare Scenarios", scenario_names, default=scenario_names[:4], key="scenario_compare_select")
     with col_base:
-        st.session_state.baseline_ebitda_multiple = st.number_input(
-            "Baseline EBITDA Multiple",
-            min_value=0.0, max_value=20.0, value=st.session_state.baseline_ebitda_multiple, step=0.1, format="%.1f",
-            key="baseline_ebitda_multiple_input"
+        base_scenario = st.selectbox("Base Scenario", compared or scenario_names, key="scenario_base_select")
+    if compared:
+        comparison = store.compare(company, compared, base=base_scenario if base_scenario in compared else None)
+        col_values, col_diff = st.columns(2)
+        with col_values:
+            st.markdown("**Scenario values**")
+            st.dataframe(comparison.values.round(3))
+        with col_diff:
+            st.markdown(f"**Difference from {base_scenario}**")
+            if comparison.diff is not None:
+                st.dataframe(comparison.diff.round(3))
+        st.vega_lite_chart(
+            scenario_comparison_spec(compared, comparison.values.loc['projected_ebitda_multiple'].tolist(), company),
+            width="stretch"
         )
-    with col_coeff:
-        st.session_state.ai_premium_coefficient = st.slider(
-            "AI Premium Coefficient ($\\delta$)", # Fixed \delta escape for f-string
-            min_value=0.0, max_value=5.0, value=st.session_state.ai_premium_coefficient, step=0.1,
-            key="ai_premium_coefficient_slider"
+
+    col_pick, col_load, col_delete = st.columns([2, 1, 1], vertical_alignment="bottom")
+    with col_pick:
+        picked_scenario = st.selectbox("Scenario", scenario_names, key="scenario_pick_select")
+    with col_load:
+        st.button(
+            "Load into Workflow", key="load_scenario_button",
+            on_click=load_scenario_into_session, args=(company, picked_scenario)
         )
-    # Fixed \delta escape for f-string
-    st.info("📊 This coefficient represents the market's enthusiasm for AI-driven value. A higher $\\delta$ implies greater valuation premiums for strong AI capabilities in a given market segment.")
-
-    if st.button("Project Valuation Uplift", key="project_valuation_button"):
-        st.session_state.project_valuation_triggered = True
-        st.session_state.projected_ebitda_multiple = project_valuation_impact_cached(
-            st.session_state.exit_ai_r_score,
-            st.session_state.baseline_ebitda_multiple,
-            st.session_state.ai_premium_coefficient
+    with col_delete:
+        st.button(
+            "Delete Scenario", key="delete_scenario_button",
+            on_click=store.delete, args=(company, picked_scenario)
         )
 
-    if st.session_state.project_valuation_triggered and st.session_state.projected_ebitda_multiple is not None:
-        st.markdown(f"\n- Baseline EBITDA Multiple: **{st.session_state.baseline_ebitda_multiple:.2f}x**")
-        st.markdown(f"- Projected EBITDA Multiple (with AI Premium): **{st.session_state.projected_ebitda_multiple:.2f}x**")
-        st.info(f"💰 This **Projected EBITDA Multiple** demonstrates the tangible financial benefit of {st.session_state.company_name}'s AI maturity, a critical figure for anchoring your exit negotiations.")
-        plot_valuation_comparison_cached(st.session_state.baseline_ebitda_multiple, st.session_state.projected_ebitda_multiple, st.session_state.company_name)
+scenarios_fragment()
 
+st.markdown("---")
+
+profile_section("11_history")
+## 11. Quarterly Score History
+st.header("11. Quarterly Score History")
+st.markdown(
+    """
+    Record each quarter's reassessment to follow the Exit-AI-R Score, each dimension and the projected multiple over
+    time. Records are only ever appended; rolling means, quarter-over-quarter changes and fund-level averages are
+    updated as each assessment is recorded, so the trend views below load instantly even across years of a full
+    portfolio.
+    """
+)
+
+@st.fragment
+@profiled_fragment("11_history")
+def score_history_fragment():
+    """Recording the current assessment for a quarter and the company and fund trend views."""
+    history = open_score_history()
+    current_quarter = quarter_ordinal(datetime.date.today())
+    quarter_options = [quarter_label(q) for q in range(current_quarter, current_quarter - 12, -1)]
+
+    col_quarter, col_fund, col_record = st.columns([1, 2, 1], vertical_alignment="bottom")
+    with col_quarter:
+        quarter = st.selectbox("Quarter", quarter_options, key="trend_quarter_select")
+    with col_fund:
+        fund = st.text_input("Fund", value=st.session_state.firm_name, key="trend_fund_input").strip()
+    with col_record:
+        record_clicked = st.button(
+            "Record Current Assessment", key="record_history_button",
+            disabled=st.session_state.projected_ebitda_multiple is None
+        )
+    if st.session_state.projected_ebitda_multiple is None:
+        st.caption("Complete the valuation projection in section 4 to record the current assessment.")
+    elif record_clicked:
+        history.append(
+            st.session_state.company_name, quarter, fund=fund or None,
+            exit_ai_r_score=st.session_state.exit_ai_r_score,
+            visible_score=st.session_state.visible_score,
+            documented_score=st.session_state.documented_score,
+            sustainable_score=st.session_state.sustainable_score,
+            projected_ebitda_multiple=st.session_state.projected_ebitda_multiple,
+        )
+        st.success(f"Recorded {st.session_state.company_name} for {quarter}.")
+
+    companies = history.companies()
+    if not companies:
+        st.info("No score history recorded yet. Illustrative demo history can be added with `python history.py seed`.")
+        return
+
+    col_view, col_metric, col_subject = st.columns([1, 1, 2])
+    with col_view:
+        view = st.radio("Trend View", ["Company", "Fund"], horizontal=True, key="trend_view_radio")
+    with col_metric:
+        metric = st.selectbox("Metric", METRIC_COLUMNS, format_func=METRIC_LABELS.get, key="trend_metric_select")
+    with col_subject:
+        if view == "Company":
+            default = companies.index(st.session_state.company_name) if st.session_state.company_name in companies else 0
+            subject = st.selectbox("Company", companies, index=default, key="trend_company_select")
+        else:
+            subject = st.selectbox("Fund", ["All funds"] + history.funds(), key="trend_fund_select")
+
+    if view == "Company":
+        trend = history.company_trend(subject)
+        columns = {metric: METRIC_LABELS[metric], f"rolling_{metric}": "Rolling Mean (4Q)", f"qoq_{metric}": "QoQ Change"}
+    else:
+        trend = history.fund_trend(None if subject == "All funds" else subject)
+        columns = {metric: f"Average {METRIC_LABELS[metric]}", f"qoq_{metric}": "QoQ Change", 'n_companies': "Companies"}
+    st.vega_lite_chart(
+        score_trend_spec(trend, metric, f"{subject}: {METRIC_LABELS[metric]} by Quarter", METRIC_LABELS[metric]),
+        width="stretch"
+    )
+    st.dataframe(trend[list(columns)].rename(columns=columns).round(2))
+
+    if view == "Fund":
+        latest = history.latest(None if subject == "All funds" else subject)
+        st.markdown(f"**Largest quarter-over-quarter moves in {METRIC_LABELS[metric]}** (latest assessment per company)")
+        movers = latest.dropna(subset=[f"qoq_{metric}"])
+        movers = movers.reindex(movers[f"qoq_{metric}"].abs().sort_values(ascending=False).index).head(10)
+        st.dataframe(
+            movers[['company_name', 'fund', 'quarter', metric, f"qoq_{metric}"]].round(2), hide_index=True
+        )
+
+score_history_fragment()
 
 st.markdown("---")
 
-## 5. Crafting the Compelling AI Exit Narrative
-st.header("5. Crafting the Compelling AI Exit Narrative")
+profile_section("12_buyers")
+## 12. Best Buyers Across Acquirer Profiles
+st.header("12. Best Buyers Across Acquirer Profiles")
 st.markdown(
     """
-    The final and most crucial step is to synthesize all your quantitative insights—the AI readiness scores,
-    dimension analyses, and valuation projections—into a cohesive and persuasive narrative report.
-    This report will serve as a foundational document for the Information Memorandum (IM) or management presentation,
-    articulating InnovateTech's unique AI-driven value proposition to potential strategic and financial buyers.
+    Different acquirers value AI maturity differently: a technology strategic may pay most for visible AI products,
+    a buyout fund for documented ROI, long-term capital for sustainable capabilities. Each buyer in the library below
+    has its own dimension weights and AI Premium Coefficient ($\\delta$). The current company, and the portfolio
+    scored in section 6, are valued for every buyer at once, ranking the buyers likely to pay the highest multiple.
     """
 )
 
-# Conditional rendering of button based on projected_ebitda_multiple
-if st.session_state.projected_ebitda_multiple is None:
-    st.warning("Please complete the valuation projection in the previous section to generate the narrative report.")
-else:
-    if st.button("Generate AI Exit Narrative", key="generate_narrative_button"):
-        st.session_state.generate_narrative_triggered = True
-
-    if st.session_state.generate_narrative_triggered:
-        narrative_text = generate_ai_exit_narrative_cached(
-            st.session_state.company_name,
-            st.session_state.exit_ai_r_score,
-            st.session_state.visible_score,
-            st.session_state.documented_score,
-            st.session_state.sustainable_score,
-            st.session_state.baseline_ebitda_multiple,
-            st.session_state.projected_ebitda_multiple,
-            st.session_state.ai_premium_coefficient,
-            st.session_state.persona_name,
-            st.session_state.firm_name
+BUYER_HEATMAP_ROWS = 25
+BUYER_HEATMAP_COMPANIES = 25
+
+@st.fragment
+@profiled_fragment("12_buyers")
+def buyer_matrix_fragment():
+    """Buyer library editing, the buyers x companies valuation matrix, best-buyer ranking and heatmap."""
+    buyer_file = st.file_uploader(
+        "Buyer Library CSV (optional)", type=["csv"], key="buyer_library_uploader",
+        help=f"Columns: {', '.join(BUYER_COLUMNS)}. Replaces the bundled buyer library."
+    )
+    try:
+        if buyer_file is not None:
+            buyer_frame = pd.read_csv(buyer_file)
+        else:
+            library = load_buyer_library()
+            buyer_frame = library.to_frame() if library is not None else pd.DataFrame(columns=BUYER_COLUMNS)
+        with st.expander(f"Buyer Library ({len(buyer_frame):,} buyers)"):
+            edited_buyers = st.data_editor(
+                buyer_frame, num_rows="dynamic", hide_index=True,
+                key=f"buyer_library_editor_{buyer_file.file_id if buyer_file is not None else 'default'}"
+            )
+        library = BuyerLibrary.from_frame(edited_buyers)
+    except (ValueError, pd.errors.ParserError) as e:
+        st.error(f"Error: {e}")
+        st.session_state.pop('buyer_matrix_portfolio_key', None) # No matrix on screen
+        return
+    st.session_state.buyer_matrix_portfolio_key = st.session_state.scored_portfolio_key
+
+    companies = pd.DataFrame({
+        'company_name': [st.session_state.company_name],
+        'visible_score': [st.session_state.visible_score],
+        'documented_score': [st.session_state.documented_score],
+        'sustainable_score': [st.session_state.sustainable_score],
+        'baseline_ebitda_multiple': [st.session_state.baseline_ebitda_multiple],
+    })
+    portfolio = st.session_state.scored_portfolio
+    if portfolio is not None:
+        portfolio = portfolio[SCORE_COLUMNS + ['baseline_ebitda_multiple']].assign(
+            company_name=portfolio_company_names(portfolio)
         )
-        with st.expander("View Generated AI Exit Narrative Report", expanded=True):
-            st.markdown(narrative_text)
-        st.info("📝 This comprehensive report synthesizes all your assessments and calculations into a structured, compelling story for potential acquirers, highlighting InnovateTech's AI-driven value proposition and the tangible financial impact.")
+        companies = pd.concat([companies, portfolio], ignore_index=True)
+    else:
+        st.caption("Score a portfolio in section 6 to value every company in it as well.")
+
+    valuation = library.value_portfolio(companies)
+    n_buyers, n_companies = valuation.projected.shape
+    st.caption(f"{n_buyers:,} buyers x {n_companies:,} companies = {n_buyers * n_companies:,} valuations.")
+
+    col_company, col_top = st.columns([2, 1])
+    with col_company:
+        company_index = st.selectbox(
+            "Company", range(n_companies), format_func=lambda i: valuation.companies[i], key="buyers_company_select"
+        )
+    with col_top:
+        top_n = st.number_input(
+            "Buyers to Rank", min_value=1, max_value=n_buyers, value=min(10, n_buyers), step=1, key="buyers_top_n_input"
+        )
+
+    ranked = library.best_buyers(valuation, int(top_n))
+    company_ranked = ranked.iloc[company_index * int(top_n):(company_index + 1) * int(top_n)]
+    best = company_ranked.iloc[0]
+    st.markdown(
+        f"**Best buyer for {valuation.companies[company_index]}:** {best['buyer_name']} ({best['buyer_type']}), "
+        f"at a projected **{best['projected_ebitda_multiple']:.2f}x** EBITDA, "
+        f"{best['premium_vs_median_buyer']:+.2f}x over the median buyer."
+    )
+    st.dataframe(company_ranked.drop(columns='company_name').round(2), hide_index=True)
+    st.download_button(
+        "Download Best-Buyer Ranking for All Companies (CSV)",
+        data=ranked.to_csv(index=False).encode("utf-8"),
+        file_name="best_buyers.csv",
+        mime="text/csv",
+        key="buyers_download_button"
+    )
+
+    heatmap_field = st.radio(
+        "Heatmap Value", ['projected', 'exit_air'], horizontal=True, key="buyers_heatmap_radio",
+        format_func={'projected': "Projected EBITDA Multiple", 'exit_air': "Exit-AI-R Score"}.get
+    )
+    # The selected company's best buyers as rows, and how they value it next to the other companies
+    buyer_rows = np.argsort(-valuation.projected[:, company_index], kind='stable')[:BUYER_HEATMAP_ROWS]
+    company_cols = [company_index] + [i for i in range(n_companies) if i != company_index][:BUYER_HEATMAP_COMPANIES - 1]
+    matrix = library.matrix_frame(valuation, heatmap_field).iloc[buyer_rows, company_cols]
+    value_title = "Projected EBITDA Multiple (x)" if heatmap_field == 'projected' else "Exit-AI-R Score"
+    st.vega_lite_chart(
+        buyer_heatmap_spec(matrix, f"{valuation.companies[company_index]}'s Top Buyers Across Companies", value_title),
+        width="stretch"
+    )
+
+buyer_matrix_fragment()
 
+profile_section("footer")
 st.markdown("---")
 st.caption(f"Developed for {st.session_state.firm_name} by {st.session_state.persona_name}.")
 
 
+profile_section("background_jobs")
+# --- Background jobs panel: refreshes every second while any of this owner's jobs are queued or running ---
+def background_jobs_panel(polling):
+    """Lists this owner's background jobs with progress, cancel and result download."""
+    queue = get_job_queue()
+    owner_jobs = queue.jobs(st.session_state.job_owner)
+    if not owner_jobs:
+        st.caption("No background jobs.")
+    for job in owner_jobs:
+        st.markdown(f"**{job.name}** · {job.status} · {job.elapsed:.0f}s")
+        if job.active:
+            st.progress(job.progress, text=job.message)
+            st.button("Cancel", key=f"cancel_job_{job.id}", on_click=queue.cancel, args=(job.id,))
+        elif job.status == DONE and isinstance(job.result, str) and os.path.isfile(job.result):
+            st.download_button(
+                "Download Result",
+                data=lambda path=job.result: Path(path).read_bytes(), # Read from disk only when the user clicks
+                file_name=os.path.basename(job.result),
+                mime=mimetypes.guess_type(job.result)[0] or "application/octet-stream",
+                on_click="ignore",
+                key=f"download_job_{job.id}"
+            )
+        elif job.status == FAILED:
+            st.error(job.error)
+    # Once everything has finished, one full rerun stops the polling and lets section 8 pick up its results
+    if polling and not any(job.active for job in owner_jobs):
+        st.rerun()
+
+with st.sidebar.expander("Background Jobs", expanded=True):
+    jobs_polling = any(job.active for job in get_job_queue().jobs(st.session_state.job_owner))
+    st.fragment(run_every=1.0 if jobs_polling else None)(
+        profiled_fragment("background_jobs")(background_jobs_panel)
+    )(jobs_polling)
+
+profile_section("cache_admin")
+# --- Cache admin panel (written to the sidebar at the end of the run so it includes this run's lookups) ---
+with st.sidebar.expander("Cache Admin"):
+    cache_stats_df = cache_stats()
+    st.metric("Cached Memory", f"{cache_stats_df['current_bytes'].sum() / 1024 ** 2:.1f} MiB")
+    st.dataframe(cache_stats_df)
+    if st.button("Clear All Caches", key="clear_caches_button"):
+        clear_all_caches()
+        st.rerun()
+
+
 
 # License
 st.caption('''
@@ -478,3 +1652,15 @@ This notebook was created for **educational purposes only** and is **not intende
 
 All rights reserved. For permissions or commercial licensing, contact: [info@qusandbox.com](mailto:info@qusandbox.com)
 ''')
+
+
+# --- Developer timing panel (only when profiling is enabled) ---
+rerun_record = finish_rerun()
+if rerun_record is not None:
+    with st.sidebar.expander("Developer Timing", expanded=False):
+        recent = METRICS.recent_percentiles()
+        st.metric("Last Rerun", f"{rerun_record['total_seconds'] * 1000:.0f} ms")
+        st.caption(f"Recent reruns: p50 {recent[50] * 1000:.0f} ms, p95 {recent[95] * 1000:.0f} ms")
+        st.dataframe(pd.DataFrame(rerun_record['sections']).assign(ms=lambda df: df['seconds'] * 1000)[['section', 'ms']])
+        if rerun_record['calls']:
+            st.dataframe(pd.DataFrame(rerun_record['calls']).assign(ms=lambda df: df['seconds'] * 1000)[['function', 'hit', 'ms']])
@@ -0,0 +1,221 @@
+"""
+SQLite store for saved Exit-AI-R assessments.
+
+Each row holds one assessment: the names, dimension scores, weights, valuation inputs, the
+resulting score and projected multiple, and optionally the narrative report. Queries are
+filtered and paginated in SQL against indexed columns, so browsing stays fast with hundreds of
+thousands of rows and never loads the table into memory. The database runs in WAL mode so
+concurrent Streamlit sessions can read while another session is saving.
+"""
+import functools
+import itertools
+import os
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import datetime, timezone
+
+import pandas as pd
+
+DEFAULT_DB_PATH = os.environ.get("QULAB_ASSESSMENT_DB", "assessments.db")
+
+# Stored fields, in table order (the `id` primary key and `created_at` timestamp come first)
+ASSESSMENT_COLUMNS = [
+    'persona_name', 'firm_name', 'company_name',
+    'visible_score', 'documented_score', 'sustainable_score',
+    'w_visible', 'w_documented', 'w_sustainable',
+    'baseline_ebitda_multiple', 'ai_premium_coefficient',
+    'exit_ai_r_score', 'projected_ebitda_multiple', 'narrative',
+]
+# Columns returned by list queries; the narrative is only fetched for single assessments
+LIST_COLUMNS = ['id', 'created_at'] + [c for c in ASSESSMENT_COLUMNS if c != 'narrative']
+SORTABLE_COLUMNS = ('created_at', 'exit_ai_r_score', 'projected_ebitda_multiple', 'company_name')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS assessments (
+    id INTEGER PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    persona_name TEXT,
+    firm_name TEXT,
+    company_name TEXT NOT NULL,
+    visible_score REAL NOT NULL,
+    documented_score REAL NOT NULL,
+    sustainable_score REAL NOT NULL,
+    w_visible REAL NOT NULL,
+    w_documented REAL NOT NULL,
+    w_sustainable REAL NOT NULL,
+    baseline_ebitda_multiple REAL,
+    ai_premium_coefficient REAL,
+    exit_ai_r_score REAL NOT NULL,
+    projected_ebitda_multiple REAL,
+    narrative TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_assessments_company ON assessments (company_name, created_at);
+CREATE INDEX IF NOT EXISTS idx_assessments_firm ON assessments (firm_name, created_at);
+CREATE INDEX IF NOT EXISTS idx_assessments_created ON assessments (created_at);
+CREATE INDEX IF NOT EXISTS idx_assessments_score ON assessments (exit_ai_r_score);
+"""
+
+
+def utc_timestamp():
+    """Current UTC time as sortable ISO-8601 text, the format stored in `created_at`."""
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+
+
+def _prefix_upper_bound(prefix):
+    """Smallest string greater than every string starting with `prefix` (for index range scans)."""
+    return prefix + "\U0010ffff"
+
+
+class AssessmentStore:
+    """
+    Saves, bulk-inserts and queries assessments in one SQLite file.
+    A connection is opened per operation, so one store can be shared by all Streamlit sessions;
+    writes are serialized with a lock.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = str(path)
+        self._write_lock = threading.Lock()
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _insert(self, chunks):
+        """
+        Inserts every chunk of rows in one transaction and returns (rows inserted, last row id).
+        A row missing a required value raises ValueError and nothing is saved.
+        """
+        placeholders = ", ".join("?" * (len(ASSESSMENT_COLUMNS) + 1))
+        sql = f"INSERT INTO assessments (created_at, {', '.join(ASSESSMENT_COLUMNS)}) VALUES ({placeholders})"
+        with self._write_lock, closing(self._connect()) as conn:
+            try:
+                with conn:
+                    inserted = sum(conn.executemany(sql, rows).rowcount for rows in chunks)
+            except sqlite3.IntegrityError as e:
+                raise ValueError(f"Assessment is missing a required value ({e}); nothing was saved.") from e
+            return inserted, conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+
+    def save(self, assessment, created_at=None):
+        """Saves one assessment (a dict keyed by ASSESSMENT_COLUMNS) and returns its id."""
+        row = [created_at or utc_timestamp()] + [_to_sql(assessment.get(c)) for c in ASSESSMENT_COLUMNS]
+        return self._insert([[row]])[1]
+
+    def save_many(self, assessments, created_at=None, chunk_size=10_000):
+        """
+        Bulk-inserts assessments from a DataFrame or an iterable of dicts, `chunk_size` rows at a time
+        but in one transaction, so either every row is saved or none is. Missing optional columns are
+        stored as NULL; a row without a company name or another required value raises ValueError.
+        Returns the number of rows saved.
+        """
+        timestamp = created_at or utc_timestamp()
+        if isinstance(assessments, pd.DataFrame):
+            # Converting per chunk keeps the object copy small; NaN becomes NULL
+            records = (
+                [timestamp] + record
+                for start in range(0, len(assessments), chunk_size)
+                for record in _frame_to_rows(assessments.iloc[start:start + chunk_size])
+            )
+        else:
+            records = ([timestamp] + [_to_sql(a.get(c)) for c in ASSESSMENT_COLUMNS] for a in assessments)
+
+        records = iter(records)
+        chunks = iter(lambda: list(itertools.islice(records, chunk_size)), [])
+        return self._insert(chunks)[0]
+
+    def get(self, assessment_id):
+        """Returns one assessment, including its narrative, as a dict (or None if it does not exist)."""
+        with closing(self._connect()) as conn:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute("SELECT * FROM assessments WHERE id = ?", (int(assessment_id),)).fetchone()
+        return dict(row) if row is not None else None
+
+    def get_many(self, assessment_ids):
+        """Returns the listed assessments (without narratives) as a DataFrame, e.g. for side-by-side comparison."""
+        ids = [int(i) for i in assessment_ids]
+        if not ids:
+            return pd.DataFrame(columns=LIST_COLUMNS)
+        sql = f"SELECT {', '.join(LIST_COLUMNS)} FROM assessments WHERE id IN ({', '.join('?' * len(ids))}) ORDER BY id"
+        with closing(self._connect()) as conn:
+            return pd.read_sql_query(sql, conn, params=ids)
+
+    def _where(self, company_prefix=None, firm=None, date_from=None, date_to=None, min_score=None, max_score=None):
+        """Builds the WHERE clause and parameters shared by query() and count()."""
+        clauses, params = [], []
+        if company_prefix:
+            # A range instead of LIKE so the company index is used
+            clauses.append("company_name >= ? AND company_name < ?")
+            params += [company_prefix, _prefix_upper_bound(company_prefix)]
+        if firm:
+            clauses.append("firm_name = ?")
+            params.append(firm)
+        if date_from:
+            clauses.append("created_at >= ?")
+            params.append(str(date_from))
+        if date_to:
+            # Dates without a time include the whole day
+            clauses.append("created_at <= ?")
+            params.append(str(date_to) + ("T23:59:59" if len(str(date_to)) == 10 else ""))
+        if min_score is not None:
+            clauses.append("exit_ai_r_score >= ?")
+            params.append(float(min_score))
+        if max_score is not None:
+            clauses.append("exit_ai_r_score <= ?")
+            params.append(float(max_score))
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(self, company_prefix=None, firm=None, date_from=None, date_to=None, min_score=None, max_score=None,
+              order_by='created_at', descending=True, page=0, page_size=50):
+        """
+        Returns one page of matching assessments (without narratives) as a DataFrame.
+        Filters are combined with AND; `company_prefix` matches the start of the company name.
+        """
+        if order_by not in SORTABLE_COLUMNS:
+            raise ValueError(f"order_by must be one of {SORTABLE_COLUMNS}, got '{order_by}'.")
+        where, params = self._where(company_prefix, firm, date_from, date_to, min_score, max_score)
+        direction = "DESC" if descending else "ASC"
+        sql = (
+            f"SELECT {', '.join(LIST_COLUMNS)} FROM assessments{where} "
+            f"ORDER BY {order_by} {direction}, id {direction} LIMIT ? OFFSET ?"
+        )
+        with closing(self._connect()) as conn:
+            return pd.read_sql_query(sql, conn, params=params + [int(page_size), int(page) * int(page_size)])
+
+    def count(self, company_prefix=None, firm=None, date_from=None, date_to=None, min_score=None, max_score=None):
+        """Returns the number of assessments matching the same filters as query()."""
+        where, params = self._where(company_prefix, firm, date_from, date_to, min_score, max_score)
+        with closing(self._connect()) as conn:
+            return conn.execute(f"SELECT COUNT(*) FROM assessments{where}", params).fetchone()[0]
+
+    def delete(self, assessment_id):
+        """Deletes one assessment; returns True if it existed."""
+        with self._write_lock, closing(self._connect()) as conn, conn:
+            return conn.execute("DELETE FROM assessments WHERE id = ?", (int(assessment_id),)).rowcount > 0
+
+
+@functools.lru_cache(maxsize=None)
+def open_assessment_store(path=DEFAULT_DB_PATH):
+    """Returns the process-wide store for `path`, creating the database on first use."""
+    return AssessmentStore(path)
+
+
+def _to_sql(value):
+    """Converts NumPy scalars and NaN to values sqlite3 can bind."""
+    if value is None:
+        return None
+    if hasattr(value, 'item'):
+        value = value.item()
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+
+def _frame_to_rows(frame):
+    """Converts a DataFrame to lists of Python values in ASSESSMENT_COLUMNS order, with NULL for missing data."""
+    frame = frame.reindex(columns=ASSESSMENT_COLUMNS).astype(object)
+    return frame.where(frame.notna(), None).to_numpy().tolist()
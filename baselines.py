@@ -0,0 +1,162 @@
+"""
+Reference baseline EBITDA multiples by sector, sub-sector and date.
+
+The table ships as an uncompressed Arrow IPC file, built from data/sector_baselines.csv with
+`python baselines.py`, sorted by sector, sub-sector and date. It is memory-mapped once per process
+and read zero-copy, so every session shares the same mapped pages instead of holding its own copy
+of the comps history, and only the pages a lookup touches are read from disk.
+
+Usage:
+    python baselines.py [source.csv] [table.arrow]
+"""
+import argparse
+import datetime
+import functools
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+BASELINE_COLUMNS = ['sector', 'sub_sector', 'as_of', 'ebitda_multiple']
+DATA_DIR = Path(__file__).resolve().parent / "data"
+DEFAULT_BASELINE_SOURCE = DATA_DIR / "sector_baselines.csv"
+DEFAULT_BASELINE_TABLE = DATA_DIR / "sector_baselines.arrow"
+BASELINE_TABLE_PATH = Path(os.environ.get("QULAB_BASELINE_TABLE", DEFAULT_BASELINE_TABLE))
+
+EPOCH = datetime.date(1970, 1, 1)
+
+
+def build_baseline_table(source=DEFAULT_BASELINE_SOURCE, target=DEFAULT_BASELINE_TABLE):
+    """
+    Converts a CSV of BASELINE_COLUMNS into the sorted, uncompressed Arrow IPC file the app maps.
+    Returns the number of rows written.
+    """
+    import pyarrow as pa
+
+    frame = pd.read_csv(source)
+    missing = [c for c in BASELINE_COLUMNS if c not in frame.columns]
+    if missing:
+        raise ValueError(f"Baseline data is missing required columns: {', '.join(missing)}")
+    frame = frame[BASELINE_COLUMNS].dropna()
+    frame['as_of'] = pd.to_datetime(frame['as_of']).dt.date
+    frame = frame.sort_values(['sector', 'sub_sector', 'as_of'], kind='stable')
+
+    schema = pa.schema([
+        ('sector', pa.string()), ('sub_sector', pa.string()),
+        ('as_of', pa.date32()), ('ebitda_multiple', pa.float64()),
+    ])
+    table = pa.Table.from_pandas(frame, schema=schema, preserve_index=False).combine_chunks()
+    # One uncompressed record batch, so the columns can be viewed in place once mapped
+    with pa.OSFile(str(target), 'wb') as sink, pa.ipc.new_file(sink, schema) as writer:
+        writer.write_table(table, max_chunksize=max(len(table), 1))
+    return len(table)
+
+
+class BaselineTable:
+    """
+    Lookups over a (memory-mapped) Arrow table of BASELINE_COLUMNS sorted by sector,
+    sub-sector and date. `groups` maps (sector, sub_sector) -> row slice.
+    """
+
+    def __init__(self, table):
+        import pyarrow.compute as pc
+
+        self.table = table.combine_chunks()
+        n = len(self.table)
+        # Zero-copy views of the mapped buffers: dates as days since the epoch
+        self._days = self.table.column('as_of').chunk(0).view('int32').to_numpy() if n else np.array([], dtype=np.int32)
+        self._multiples = self.table.column('ebitda_multiple').chunk(0).to_numpy() if n else np.array([])
+
+        sector, sub_sector = self.table.column('sector'), self.table.column('sub_sector')
+        starts = np.array([0], dtype=np.int64)
+        if n > 1:
+            changed = pc.or_(
+                pc.not_equal(sector.slice(1), sector.slice(0, n - 1)),
+                pc.not_equal(sub_sector.slice(1), sub_sector.slice(0, n - 1)),
+            )
+            starts = np.concatenate([starts, np.flatnonzero(changed.to_numpy(zero_copy_only=False)) + 1])
+        # Only the first row of each series is converted to Python strings
+        self.groups = {}
+        if n:
+            bounds = np.append(starts, n)
+            names = zip(pc.take(sector, starts).to_pylist(), pc.take(sub_sector, starts).to_pylist())
+            for (name, sub), start, stop in zip(names, bounds[:-1], bounds[1:]):
+                self.groups[(name, sub)] = slice(int(start), int(stop))
+        self.sectors = sorted({name for name, _ in self.groups})
+
+    def sub_sectors(self, sector):
+        """Sub-sectors with a baseline series in `sector`."""
+        return sorted(sub for name, sub in self.groups if name == sector)
+
+    def date_range(self, sector=None):
+        """First and last observation dates, optionally for one sector."""
+        days = [self._days[rows] for (name, _), rows in self.groups.items() if sector is None or name == sector]
+        if not days:
+            return None
+        days = np.concatenate(days)
+        return (EPOCH + datetime.timedelta(days=int(days.min())), EPOCH + datetime.timedelta(days=int(days.max())))
+
+    def baseline_multiple(self, sector, sub_sector=None, as_of=None, interpolate=False):
+        """
+        The baseline multiple for `sector` (averaged over its sub-sectors unless `sub_sector` is
+        given) as of a date: the latest observation on or before `as_of`, or, with `interpolate`,
+        the linear interpolation between the surrounding observations. `as_of=None` uses each
+        series' latest value; dates outside a series use its first or last observation.
+        Raises KeyError if there is no matching series.
+        """
+        series = [
+            rows for (name, sub), rows in self.groups.items()
+            if name == sector and (sub_sector is None or sub == sub_sector)
+        ]
+        if not series:
+            label = f"{sector} / {sub_sector}" if sub_sector else sector
+            raise KeyError(f"No baseline multiples for '{label}'.")
+
+        values = []
+        for rows in series:
+            days, multiples = self._days[rows], self._multiples[rows]
+            if as_of is None:
+                values.append(multiples[-1])
+                continue
+            day = (as_of - EPOCH).days
+            if interpolate:
+                values.append(np.interp(day, days, multiples))
+            else:
+                values.append(multiples[max(np.searchsorted(days, day, side='right') - 1, 0)])
+        return float(np.mean(values))
+
+
+@functools.lru_cache(maxsize=4)
+def _open_baseline_table(path, mtime):
+    import pyarrow as pa
+
+    # read_all on a memory map references the mapped pages instead of copying them
+    with pa.ipc.open_file(pa.memory_map(path, 'r')) as reader:
+        return BaselineTable(reader.read_all())
+
+
+def load_baseline_table(path=None):
+    """
+    Returns the process-wide mapped table at `path` (default: QULAB_BASELINE_TABLE or the bundled
+    file), reopening it only when the file changes. Returns None if the file is missing.
+    """
+    path = Path(path or BASELINE_TABLE_PATH)
+    if not path.exists():
+        return None
+    return _open_baseline_table(str(path), path.stat().st_mtime)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the memory-mapped sector baseline table from its CSV source.")
+    parser.add_argument('source', nargs='?', type=Path, default=DEFAULT_BASELINE_SOURCE, help="CSV with sector, sub_sector, as_of and ebitda_multiple.")
+    parser.add_argument('output', nargs='?', type=Path, default=DEFAULT_BASELINE_TABLE, help="Arrow IPC file to write.")
+    args = parser.parse_args(argv)
+    rows = build_baseline_table(args.source, args.output)
+    print(f"Wrote {rows:,} baseline multiples to {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,163 @@
+"""
+Headless batch scoring for portfolio files.
+
+Streams a CSV or Parquet file of companies through the same Exit-AI-R, valuation and narrative
+functions used by the Streamlit app, writing results chunk by chunk so memory use does not grow
+with the number of rows.
+
+Usage:
+    python batch_cli.py portfolio.csv scored.parquet --weights 0.35 0.40 0.25 --baseline 7.0 --delta 2.0
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from narrative import build_ai_exit_narrative
+from rubric import load_rubric
+from scoring import score_portfolio
+
+DEFAULT_CHUNK_SIZE = 50_000
+
+
+def _file_format(path):
+    """Returns 'csv' or 'parquet' based on the file extension."""
+    suffix = Path(path).suffix.lower()
+    if suffix == '.csv':
+        return 'csv'
+    if suffix in ('.parquet', '.pq'):
+        return 'parquet'
+    raise ValueError(f"Unsupported file type '{suffix}'. Use .csv or .parquet.")
+
+
+def iter_portfolio_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yields the input portfolio as DataFrames of at most `chunk_size` rows."""
+    if _file_format(path) == 'csv':
+        yield from pd.read_csv(path, chunksize=chunk_size)
+    else:
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+
+
+class ChunkWriter:
+    """Appends scored chunks to a CSV or Parquet output file without keeping earlier chunks in memory."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.format = _file_format(path)
+        self._parquet_writer = None
+        self._wrote_header = False
+
+    def write(self, chunk):
+        if self.format == 'csv':
+            chunk.to_csv(self.path, mode='a' if self._wrote_header else 'w', header=not self._wrote_header, index=False)
+            self._wrote_header = True
+            return
+
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if self._parquet_writer is None:
+            self._parquet_writer = pq.ParquetWriter(self.path, table.schema)
+        elif not table.schema.equals(self._parquet_writer.schema):
+            # Later chunks may infer e.g. int instead of float for a column; align to the first chunk
+            table = table.cast(self._parquet_writer.schema)
+        self._parquet_writer.write_table(table)
+
+    def close(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+
+
+def score_chunk(chunk, weights, baseline, delta, with_narrative=False, persona_name="Jane Doe", firm_name="Alpha Capital"):
+    """
+    Scores one chunk of companies and, optionally, adds the narrative report for each row.
+    Per-row weight / baseline / delta columns take precedence over the shared values, as in the app.
+    """
+    scored = score_portfolio(chunk, weights=weights, baseline=baseline, premium_coeff=delta)
+
+    if with_narrative:
+        companies = scored['company_name'] if 'company_name' in scored.columns else scored.index.map(lambda i: f"Company {i}")
+        baselines = scored['baseline_ebitda_multiple'] if 'baseline_ebitda_multiple' in scored.columns else [baseline] * len(scored)
+        deltas = scored['ai_premium_coefficient'] if 'ai_premium_coefficient' in scored.columns else [delta] * len(scored)
+        scored['narrative'] = [
+            build_ai_exit_narrative(company, score, v, d, s, base, proj, dlt, persona_name, firm_name)
+            for company, score, v, d, s, base, proj, dlt in zip(
+                companies, scored['exit_ai_r_score'], scored['visible_score'], scored['documented_score'],
+                scored['sustainable_score'], baselines, scored['projected_ebitda_multiple'], deltas
+            )
+        ]
+    return scored
+
+
+def run_batch(input_path, output_path, weights=(0.35, 0.40, 0.25), baseline=7.0, delta=2.0,
+              chunk_size=DEFAULT_CHUNK_SIZE, with_narrative=False, persona_name="Jane Doe", firm_name="Alpha Capital",
+              rubric=None):
+    """
+    Streams `input_path` through the scoring pipeline into `output_path`.
+    With a `rubric`, inputs may carry one column per criterion instead of the dimension scores.
+    Returns a summary dict with row and weight-handling counts.
+    """
+    summary = {'rows': 0, 'chunks': 0, 'weights_normalized': 0, 'weights_zero_sum': 0}
+    writer = ChunkWriter(output_path)
+    try:
+        for chunk in iter_portfolio_chunks(input_path, chunk_size):
+            # Keep the index global so generated company labels stay unique across chunks
+            chunk.index = range(summary['rows'], summary['rows'] + len(chunk))
+            if rubric is not None:
+                chunk = rubric.with_dimension_scores(chunk)
+            scored = score_chunk(chunk, weights, baseline, delta, with_narrative, persona_name, firm_name)
+            writer.write(scored)
+            summary['rows'] += len(scored)
+            summary['chunks'] += 1
+            summary['weights_normalized'] += int((scored['weights_normalized'] & ~scored['weights_zero_sum']).sum())
+            summary['weights_zero_sum'] += int(scored['weights_zero_sum'].sum())
+    finally:
+        writer.close()
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a portfolio CSV/Parquet file with the Exit-AI-R valuation pipeline.")
+    parser.add_argument('input', help="Input .csv or .parquet with visible_score, documented_score, sustainable_score columns.")
+    parser.add_argument('output', help="Output .csv or .parquet path.")
+    parser.add_argument('--weights', type=float, nargs=3, default=(0.35, 0.40, 0.25), metavar=('W_VISIBLE', 'W_DOCUMENTED', 'W_SUSTAINABLE'),
+                        help="Shared dimension weights for rows without w_visible/w_documented/w_sustainable columns.")
+    parser.add_argument('--baseline', type=float, default=7.0, help="Shared baseline EBITDA multiple.")
+    parser.add_argument('--delta', type=float, default=2.0, help="Shared AI Premium Coefficient.")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help="Rows processed per chunk.")
+    parser.add_argument('--with-narrative', action='store_true', help="Add the Markdown narrative report as a column.")
+    parser.add_argument('--rubric', type=Path, help="Rubric JSON; lets rows give sub-criterion ratings instead of dimension scores.")
+    parser.add_argument('--persona-name', default="Jane Doe")
+    parser.add_argument('--firm-name', default="Alpha Capital")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        rubric = None
+        if args.rubric is not None:
+            rubric = load_rubric(args.rubric)
+            if rubric is None:
+                raise FileNotFoundError(f"Rubric file not found: {args.rubric}")
+        summary = run_batch(
+            args.input, args.output, tuple(args.weights), args.baseline, args.delta,
+            args.chunk_size, args.with_narrative, args.persona_name, args.firm_name, rubric
+        )
+    except (ValueError, FileNotFoundError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    elapsed = time.perf_counter() - start
+    print(f"Scored {summary['rows']:,} companies in {summary['chunks']} chunks ({elapsed:.2f}s) -> {args.output}", file=sys.stderr)
+    if summary['weights_normalized']:
+        print(f"Warning: {summary['weights_normalized']} rows had weights not summing to 1.0 and were normalized.", file=sys.stderr)
+    if summary['weights_zero_sum']:
+        print(f"Error: {summary['weights_zero_sum']} rows had weights summing to zero and were scored as 0.00.", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,292 @@
+"""
+Micro-benchmarks for the scoring, valuation, narrative and chart hot paths.
+
+app.py cannot be imported outside a Streamlit run, so the benchmarks time the functions its
+wrappers and pipeline stages delegate to: the exit_air stage -> scoring.calculate_exit_air_scores,
+project_valuation_impact_cached -> scoring.project_valuation_impact, the narrative stage ->
+narrative.build_ai_exit_narrative and the two plot_*_cached helpers -> charts.render_*
+(cold render and chart-cache hit) or, with the default Vega backend, charts.*_spec. The peer stage is timed as one PeerIndex.peer_context lookup
+against n synthetic peers. The history benchmarks time ScoreHistory trend queries (served from
+the incrementally maintained roll-ups) and one append over n companies x 20 quarters of history.
+sensitivity_indices times a full Sobol attribution with n quasi-random samples (cached sample matrices).
+buyer_matrix values n companies for 200 synthetic buyers and ranks each company's top 10 buyers.
+
+Results are written as JSON and compared with a stored baseline; any benchmark slower than
+the baseline by more than --threshold, or without a baseline entry, fails the run (exit code 1).
+
+Usage (from the repository root):
+    python benchmarks/bench_core.py                      # run and compare with benchmarks/baseline.json
+    python benchmarks/bench_core.py --save-baseline      # record a new baseline on this machine
+    python benchmarks/bench_core.py --only NAME --save-baseline  # record (or refresh) one benchmark's entries
+    python benchmarks/bench_core.py --quick --output results.json
+"""
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from buyers import synthetic_buyer_library  # noqa: E402
+from charts import (  # noqa: E402
+    CHART_CACHE, dimension_scores_spec, render_chart_cached, render_dimension_scores, render_valuation_comparison,
+    valuation_comparison_spec,
+)
+from history import METRIC_COLUMNS, ScoreHistory, synthetic_history  # noqa: E402
+from narrative import build_ai_exit_narrative  # noqa: E402
+from peer_index import PeerIndex, synthetic_peer_assessments  # noqa: E402
+from monte_carlo import normal, triangular, uniform  # noqa: E402
+from scoring import calculate_exit_air_scores, project_valuation_impact  # noqa: E402
+from sensitivity import sensitivity_analysis  # noqa: E402
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+BATCH_SIZES = (1, 1_000, 1_000_000)
+
+
+def _score_inputs(n, seed=0):
+    """Random dimension scores and per-row weights for `n` companies."""
+    rng = np.random.default_rng(seed)
+    scores = rng.integers(0, 101, size=(3, n)).astype(float)
+    weights = rng.dirichlet([1, 1, 1], size=n).T
+    return scores, weights
+
+
+def bench_exit_air_score(n):
+    scores, weights = _score_inputs(n)
+    return lambda: calculate_exit_air_scores(*scores, *weights)
+
+
+def bench_valuation_projection(n):
+    air_scores = np.random.default_rng(1).uniform(0, 100, n)
+    return lambda: project_valuation_impact(air_scores, 7.0, 2.0)
+
+
+def bench_narrative(n):
+    rows = list(zip(*_score_inputs(n)[0], np.linspace(40, 90, n)))
+
+    def build_all():
+        for v, d, s, score in rows:
+            build_ai_exit_narrative("InnovateTech", score, v, d, s, 7.0, 7.0 + 2.0 * score / 100, 2.0, "Jane Doe", "Alpha Capital")
+    return build_all
+
+
+def bench_dimension_chart_render(n):
+    scores = {'Visible': 75, 'Documented': 60, 'Sustainable': 80}
+    return lambda: render_dimension_scores(scores, "InnovateTech")
+
+
+def bench_valuation_chart_render(n):
+    return lambda: render_valuation_comparison(7.0, 8.405, "InnovateTech")
+
+
+def bench_dimension_chart_spec(n):
+    scores = {'Visible': 75, 'Documented': 60, 'Sustainable': 80}
+    return lambda: dimension_scores_spec(scores, "InnovateTech")
+
+
+def bench_valuation_chart_spec(n):
+    return lambda: valuation_comparison_spec(7.0, 8.405, "InnovateTech")
+
+
+def bench_dimension_chart_cache_hit(n):
+    scores = {'Visible': 75, 'Documented': 60, 'Sustainable': 80}
+    render_chart_cached(render_dimension_scores, scores, "InnovateTech") # Warm the cache
+    return lambda: render_chart_cached(render_dimension_scores, scores, "InnovateTech")
+
+
+def bench_valuation_chart_cache_hit(n):
+    render_chart_cached(render_valuation_comparison, 7.0, 8.405, "InnovateTech")
+    return lambda: render_chart_cached(render_valuation_comparison, 7.0, 8.405, "InnovateTech")
+
+
+def bench_peer_percentiles(n):
+    index = PeerIndex.from_frame(synthetic_peer_assessments(n, seed=2))
+    scores = {'exit_ai_r_score': 61.5, 'visible_score': 75, 'documented_score': 60, 'sustainable_score': 80}
+    return lambda: index.peer_context(scores, "Software", "Mid")
+
+
+def _history(n):
+    """A ScoreHistory of n synthetic companies x 20 quarters in a temporary directory."""
+    history = ScoreHistory(tempfile.mkdtemp(prefix="qulab-bench-history-"))
+    history.append_many(synthetic_history(n, 20, seed=5))
+    return history
+
+
+def bench_history_company_trend(n):
+    history = _history(n)
+    return lambda: history.company_trend("Company 0001")
+
+
+def bench_history_fund_trend(n):
+    history = _history(n)
+    return lambda: history.fund_trend()
+
+
+def bench_history_append(n):
+    history = _history(n)
+    metrics = {m: 50.0 for m in METRIC_COLUMNS}
+    return lambda: history.append("Company 0001", "2025Q4", fund="Alpha Capital Fund I", **metrics)
+
+
+def bench_sensitivity_indices(n):
+    base = {
+        'visible': 75, 'documented': 60, 'sustainable': 80,
+        'w_visible': 0.35, 'w_documented': 0.40, 'w_sustainable': 0.25, 'delta': 2.0, 'baseline': 7.0,
+    }
+    distributions = {
+        'visible': triangular(65, 75, 85), 'documented': triangular(50, 60, 70), 'sustainable': normal(80, 5, 0, 100),
+        'w_visible': uniform(0.25, 0.45), 'w_documented': uniform(0.30, 0.50), 'w_sustainable': uniform(0.15, 0.35),
+        'delta': triangular(1.5, 2.0, 2.5), 'baseline': triangular(6.0, 7.0, 8.0),
+    }
+    return lambda: sensitivity_analysis(base, distributions, n_samples=n)
+
+
+def bench_buyer_matrix(n):
+    library = synthetic_buyer_library(200)
+    scores = _score_inputs(n)[0].T
+    return lambda: library.best_buyers(library.value(scores, 7.0), top_n=10)
+
+
+# name -> (setup(n) returning a zero-argument callable, batch sizes)
+BENCHMARKS = {
+    'calculate_exit_air_score': (bench_exit_air_score, BATCH_SIZES),
+    'project_valuation_impact': (bench_valuation_projection, BATCH_SIZES),
+    'generate_ai_exit_narrative': (bench_narrative, (1, 1_000)),
+    'peer_percentiles': (bench_peer_percentiles, (1_000, 1_000_000)),
+    'history_company_trend': (bench_history_company_trend, (400,)),
+    'history_fund_trend': (bench_history_fund_trend, (400,)),
+    'history_append': (bench_history_append, (400,)),
+    'sensitivity_indices': (bench_sensitivity_indices, (100_000,)),
+    'buyer_matrix': (bench_buyer_matrix, (1_000,)),
+    'plot_dimension_scores_render': (bench_dimension_chart_render, (1,)),
+    'plot_valuation_comparison_render': (bench_valuation_chart_render, (1,)),
+    'plot_dimension_scores_spec': (bench_dimension_chart_spec, (1,)),
+    'plot_valuation_comparison_spec': (bench_valuation_chart_spec, (1,)),
+    'plot_dimension_scores_cache_hit': (bench_dimension_chart_cache_hit, (1,)),
+    'plot_valuation_comparison_cache_hit': (bench_valuation_chart_cache_hit, (1,)),
+}
+
+
+def time_callable(func, min_time=0.2, repeat=5):
+    """
+    Returns the best per-call time over `repeat` measurements; each measurement loops
+    enough calls to last at least `min_time` seconds, as timeit's autorange does.
+    """
+    func() # Warm-up (imports, allocator, caches)
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        loops = max(loops * 2, int(loops * min_time / max(elapsed, 1e-9)))
+
+    best = elapsed / loops
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        best = min(best, (time.perf_counter() - start) / loops)
+    return best
+
+
+def run_benchmarks(quick=False, selected=None):
+    """Runs every benchmark (or the `selected` names) and returns {'name[n=size]': result}."""
+    results = {}
+    for name, (setup, sizes) in BENCHMARKS.items():
+        if selected and name not in selected:
+            continue
+        for n in sizes:
+            if quick and n >= 1_000_000:
+                continue
+            seconds = time_callable(setup(n))
+            results[f"{name}[n={n}]"] = {'size': n, 'seconds_per_call': seconds, 'rows_per_second': n / seconds}
+    return results
+
+
+def compare_with_baseline(results, baseline, threshold):
+    """
+    Returns (regressions, missing): (key, current, baseline, ratio) for benchmarks slower than the
+    baseline by > threshold, and the keys of results the baseline has no entry for.
+    """
+    regressions, missing = [], []
+    for key, result in results.items():
+        reference = baseline.get('results', {}).get(key)
+        if reference is None:
+            missing.append(key)
+            continue
+        ratio = result['seconds_per_call'] / reference['seconds_per_call']
+        result['baseline_ratio'] = ratio
+        if ratio > 1 + threshold:
+            regressions.append((key, result['seconds_per_call'], reference['seconds_per_call'], ratio))
+    return regressions, missing
+
+
+def merge_baseline(baseline, report):
+    """
+    The baseline updated with the results in `report`, so `--only NAME --save-baseline` records one
+    benchmark without discarding the others. Entries of benchmarks that no longer exist are dropped.
+    """
+    results = {
+        key: result for key, result in baseline.get('results', {}).items()
+        if key.split('[', 1)[0] in BENCHMARKS
+    }
+    results.update(report['results'])
+    return dict(report, results=results)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the Exit-AI-R hot paths.")
+    parser.add_argument('--quick', action='store_true', help="Skip the 1M-row batch sizes.")
+    parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS), help="Run only these benchmarks.")
+    parser.add_argument('--output', type=Path, help="Write the results JSON here.")
+    parser.add_argument('--baseline', type=Path, default=BASELINE_PATH, help="Baseline JSON to compare with.")
+    parser.add_argument('--save-baseline', action='store_true', help="Store these results as the new baseline.")
+    parser.add_argument('--threshold', type=float, default=0.5, help="Allowed slowdown vs. baseline (0.5 = 50%%).")
+    args = parser.parse_args(argv)
+
+    CHART_CACHE.clear()
+    results = run_benchmarks(args.quick, args.only)
+    report = {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'results': results,
+    }
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    regressions, missing = [], []
+    if not args.save_baseline:
+        regressions, missing = compare_with_baseline(results, baseline, args.threshold)
+
+    for key, result in results.items():
+        ratio = f"{result['baseline_ratio']:.2f}x baseline" if 'baseline_ratio' in result else ""
+        print(f"{key:<48} {result['seconds_per_call'] * 1e6:14.1f} us/call  {result['rows_per_second']:16,.0f} rows/s  {ratio}")
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(merge_baseline(baseline, report), indent=2))
+        print(f"Baseline saved to {args.baseline}")
+
+    for key, current, reference, ratio in regressions:
+        print(f"REGRESSION {key}: {current * 1e6:.1f} us vs {reference * 1e6:.1f} us baseline ({ratio:.2f}x)", file=sys.stderr)
+    # A benchmark without a baseline entry could never fail, so it fails the run until one is recorded
+    for key in missing:
+        print(
+            f"MISSING BASELINE {key}: not in {args.baseline}; record it with "
+            f"--only {key.split('[', 1)[0]} --save-baseline", file=sys.stderr
+        )
+    return 1 if regressions or missing else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
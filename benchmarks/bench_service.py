@@ -0,0 +1,196 @@
+"""
+Latency and throughput benchmark for the local scoring service (service.py).
+
+Starts the service in a subprocess on a free localhost port (or targets a running one with --url)
+and, for each concurrency level, runs that many keep-alive clients, each sending --requests small
+requests back to back over its own connection. Clients are threads spread over
+--client-processes load-generator processes so the generator is not limited to one core. Reports
+per-request latency percentiles, requests per second and the mean micro-batch size the service
+formed (from /healthz).
+
+Usage (from the repository root):
+    python benchmarks/bench_service.py --clients 1 8 32 --requests 500
+    python benchmarks/bench_service.py --url http://127.0.0.1:8765 --endpoint valuation --min-rps 2000
+"""
+import argparse
+import http.client
+import json
+import multiprocessing
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+PERCENTILES = (50, 90, 95, 99)
+
+REQUEST_BODIES = {
+    'score': {
+        'visible_score': 75, 'documented_score': 60, 'sustainable_score': 80,
+        'baseline_ebitda_multiple': 7.0, 'ai_premium_coefficient': 2.0,
+    },
+    'valuation': {'exit_ai_r_score': 70.25, 'baseline_ebitda_multiple': 7.0, 'ai_premium_coefficient': 2.0},
+    'narrative': {
+        'company_name': "InnovateTech", 'visible_score': 75, 'documented_score': 60, 'sustainable_score': 80,
+        'baseline_ebitda_multiple': 7.0, 'ai_premium_coefficient': 2.0,
+    },
+}
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _get_json(host, port, path):
+    connection = http.client.HTTPConnection(host, port, timeout=5)
+    try:
+        connection.request('GET', path)
+        return json.loads(connection.getresponse().read())
+    finally:
+        connection.close()
+
+
+def start_service(service_args):
+    """Starts service.py on a free port; returns (process, host, port) once /healthz answers."""
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, str(ROOT / "service.py"), '--port', str(port), *service_args],
+        stderr=subprocess.DEVNULL
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            _get_json('127.0.0.1', port, '/healthz')
+            return process, '127.0.0.1', port
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("The scoring service did not start within 30 seconds.")
+
+
+def _client(host, port, path, body, n_requests, latencies, errors):
+    """One keep-alive client: sends `n_requests` requests over a single connection."""
+    connection = http.client.HTTPConnection(host, port, timeout=30)
+    headers = {'Content-Type': 'application/json'}
+    try:
+        for _ in range(n_requests):
+            started = time.perf_counter()
+            connection.request('POST', path, body, headers)
+            response = connection.getresponse()
+            response.read()
+            latencies.append(time.perf_counter() - started)
+            if response.status != 200:
+                errors.append(response.status)
+    finally:
+        connection.close()
+
+
+def _load_generator(args):
+    """Runs `n_clients` client threads in this process; returns (latencies, errors, start, end)."""
+    host, port, path, body, n_clients, n_requests = args
+    latencies, errors = [], []
+    threads = [
+        threading.Thread(target=_client, args=(host, port, path, body, n_requests, latencies, errors))
+        for _ in range(n_clients)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors, started, time.perf_counter()
+
+
+def run_level(host, port, endpoint, n_clients, n_requests, client_processes):
+    """Runs `n_clients` concurrent clients against the service and summarizes the requests."""
+    body = json.dumps(REQUEST_BODIES[endpoint]).encode('utf-8')
+    n_procs = max(1, min(client_processes, n_clients))
+    shares = [n_clients // n_procs + (i < n_clients % n_procs) for i in range(n_procs)]
+    tasks = [(host, port, f"/v1/{endpoint}", body, share, n_requests) for share in shares]
+    before = _get_json(host, port, '/healthz')
+
+    if n_procs == 1:
+        results = [_load_generator(tasks[0])]
+    else:
+        with multiprocessing.Pool(n_procs) as pool:
+            results = pool.map(_load_generator, tasks)
+    # perf_counter is system-wide (CLOCK_MONOTONIC) on Linux, so process timings are comparable
+    elapsed = max(r[3] for r in results) - min(r[2] for r in results)
+
+    after = _get_json(host, port, '/healthz')
+    batches_key = 'valuation_batches' if endpoint == 'valuation' else 'score_batches'
+    n_batches = after[batches_key]['batches'] - before[batches_key]['batches']
+    n_batched = after[batches_key]['requests'] - before[batches_key]['requests']
+
+    latency_ms = np.array([lat for r in results for lat in r[0]]) * 1000
+    errors = sum(len(r[1]) for r in results)
+    return {
+        'clients': n_clients,
+        'requests': len(latency_ms),
+        'errors': errors,
+        'elapsed_seconds': elapsed,
+        'requests_per_second': len(latency_ms) / elapsed,
+        'latency_ms': {f"p{p}": float(np.percentile(latency_ms, p)) for p in PERCENTILES},
+        # Only meaningful when this benchmark is the service's only client
+        'mean_batch_size': n_batched / n_batches if n_batches else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Latency/throughput benchmark for the local scoring service.")
+    parser.add_argument('--url', help="Benchmark a running service instead of starting one, e.g. http://127.0.0.1:8765.")
+    parser.add_argument('--endpoint', choices=sorted(REQUEST_BODIES), default='score')
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 8, 32], help="Concurrency levels to test.")
+    parser.add_argument('--requests', type=int, default=500, help="Requests per client.")
+    parser.add_argument('--client-processes', type=int, default=max(1, min(4, multiprocessing.cpu_count() // 2)),
+                        help="Load-generator processes the clients are spread over.")
+    parser.add_argument('--service-args', default="", help="Extra service.py arguments when starting the service, e.g. '--workers 4'.")
+    parser.add_argument('--min-rps', type=float, help="Fail (exit 1) if the highest concurrency level is below this throughput.")
+    parser.add_argument('--output', type=Path, help="Optional path for the JSON report.")
+    args = parser.parse_args(argv)
+
+    process = None
+    if args.url:
+        parts = urlsplit(args.url)
+        host, port = parts.hostname, parts.port or 80
+    else:
+        process, host, port = start_service(args.service_args.split())
+
+    levels = []
+    try:
+        for n_clients in args.clients:
+            level = run_level(host, port, args.endpoint, n_clients, args.requests, args.client_processes)
+            levels.append(level)
+            lat = level['latency_ms']
+            print(
+                f"{n_clients:>4} clients | p50 {lat['p50']:6.2f} ms  p95 {lat['p95']:6.2f} ms  p99 {lat['p99']:6.2f} ms | "
+                f"{level['requests_per_second']:8.0f} req/s | mean batch {level['mean_batch_size']:5.1f} | "
+                f"{level['errors']} errors"
+            )
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    report = {'endpoint': args.endpoint, 'requests_per_client': args.requests, 'levels': levels}
+    exit_code = 1 if any(level['errors'] for level in levels) else 0
+    if args.min_rps is not None:
+        report['min_rps'] = args.min_rps
+        if levels[-1]['requests_per_second'] < args.min_rps:
+            print(f"Throughput at {levels[-1]['clients']} clients is below {args.min_rps:.0f} req/s")
+            exit_code = 1
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""
+Startup benchmark for the QuLab app.
+
+Measures, each in a fresh Python interpreter so that earlier measurements cannot warm
+the module cache:
+- import time of the app's own modules (the plotting stack should not be loaded yet),
+- time to the first full script run of app.py (what a new session waits for),
+- time to the first rendered chart (script run plus the 'Plot Dimension Scores' click).
+
+Usage (from the repository root):
+    python benchmarks/bench_startup.py --repeat 5 --output startup.json
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Heavy libraries whose presence in sys.modules after a measurement is reported
+HEAVY_MODULES = ['matplotlib', 'seaborn', 'scipy', 'sklearn', 'plotly']
+
+MEASUREMENTS = {
+    'import_app_modules': """
+import scoring, sweep, monte_carlo, charts, render_cache
+""",
+    'first_chart_render': """
+import charts
+charts.render_dimension_scores({'Visible': 75, 'Documented': 60, 'Sustainable': 80}, 'InnovateTech')
+""",
+    'first_app_run': """
+from streamlit.testing.v1 import AppTest
+AppTest.from_file('app.py', default_timeout=120).run()
+""",
+    'first_app_chart': """
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file('app.py', default_timeout=120).run()
+at.button(key='plot_scores_button').click().run()
+""",
+}
+
+# Wrapper executed in the child interpreter; prints one JSON line with the timing.
+CHILD_TEMPLATE = """
+import json, sys, time
+start = time.perf_counter()
+exec(compile({code!r}, '<benchmark>', 'exec'))
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'loaded': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def run_measurement(code):
+    """Runs one snippet in a new interpreter and returns (seconds, heavy modules loaded)."""
+    child = CHILD_TEMPLATE.format(code=code, heavy=HEAVY_MODULES)
+    completed = subprocess.run(
+        [sys.executable, '-c', child], cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    return result['seconds'], result['loaded']
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=3, help="Cold runs per measurement (median is reported).")
+    parser.add_argument('--output', type=Path, help="Optional path for the JSON report.")
+    args = parser.parse_args(argv)
+
+    report = {}
+    for name, code in MEASUREMENTS.items():
+        timings, loaded = [], []
+        for _ in range(args.repeat):
+            seconds, loaded = run_measurement(code)
+            timings.append(seconds)
+        report[name] = {
+            'median_seconds': statistics.median(timings),
+            'min_seconds': min(timings),
+            'runs': args.repeat,
+            'heavy_modules_loaded': loaded,
+        }
+        print(f"{name:<22} median {report[name]['median_seconds'] * 1000:8.1f} ms   loaded: {', '.join(loaded) or '-'}")
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+    return report
+
+
+if __name__ == '__main__':
+    main()
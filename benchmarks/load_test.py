@@ -0,0 +1,146 @@
+"""
+Multi-session load harness for the QuLab app, built on streamlit.testing.v1.AppTest.
+
+Simulates N analysts running the full workflow concurrently, with randomized inputs:
+dimension sliders -> Calculate Exit-AI-R -> valuation inputs -> Project -> Generate narrative.
+For each concurrency level it reports per-rerun latency percentiles, throughput, the
+per-session state footprint and how much the shared caches grew.
+
+All sessions run in one process, as on a Streamlit pod, so they share the app's caches.
+AppTest script runs are not safe to execute in parallel threads, so reruns are serialized
+with a lock. This mirrors a real pod, where CPU-bound reruns already contend for the GIL:
+`wait` is the time a rerun queued behind other sessions, `service` the time it ran, and
+`latency` (wait + service) what the analyst experiences.
+
+Usage (from the repository root):
+    python benchmarks/load_test.py --sessions 1 4 8 16 --iterations 3 --max-p95-ms 1500 --output load.json
+"""
+import argparse
+import json
+import random
+import resource
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from cache_policy import cache_stats, estimate_size  # noqa: E402
+
+APP_PATH = str(ROOT / "app.py")
+PERCENTILES = (50, 90, 95, 99)
+
+
+def simulate_session(session_id, iterations, seed, run_lock, timeout=120):
+    """
+    Drives one session through the full workflow `iterations` times.
+    Returns (per-rerun timing records, session-state footprint in bytes).
+    """
+    rng = random.Random(seed * 100_003 + session_id)
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    records = []
+
+    def rerun(step, prepare):
+        queued = time.perf_counter()
+        with run_lock:
+            started = time.perf_counter()
+            prepare().run()
+            finished = time.perf_counter()
+        if at.exception:
+            raise RuntimeError(f"Session {session_id} raised during '{step}': {at.exception[0].value}")
+        records.append({
+            'session': session_id, 'step': step,
+            'wait': started - queued, 'service': finished - started, 'latency': finished - queued,
+        })
+
+    rerun('initial', lambda: at)
+    for _ in range(iterations):
+        rerun('visible_slider', lambda: at.slider(key="visible_score_slider").set_value(rng.randint(0, 100)))
+        rerun('documented_slider', lambda: at.slider(key="documented_score_slider").set_value(rng.randint(0, 100)))
+        rerun('sustainable_slider', lambda: at.slider(key="sustainable_score_slider").set_value(rng.randint(0, 100)))
+        rerun('calculate', lambda: at.button(key="calculate_air_button").click())
+        rerun('baseline_input', lambda: at.number_input(key="baseline_ebitda_multiple_input").set_value(round(rng.uniform(4.0, 12.0), 1)))
+        rerun('delta_slider', lambda: at.slider(key="ai_premium_coefficient_slider").set_value(round(rng.uniform(0.0, 5.0), 1)))
+        rerun('project', lambda: at.button(key="project_valuation_button").click())
+        rerun('narrative', lambda: at.button(key="generate_narrative_button").click())
+
+    return records, estimate_size(at.session_state.to_dict())
+
+
+def run_load_level(n_sessions, iterations, seed):
+    """Runs `n_sessions` concurrent sessions and summarizes their reruns."""
+    run_lock = threading.Lock()
+    caches_before = cache_stats()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=n_sessions) as executor:
+        results = list(executor.map(
+            lambda sid: simulate_session(sid, iterations, seed, run_lock), range(n_sessions)
+        ))
+    elapsed = time.perf_counter() - started
+    caches_after = cache_stats()
+
+    records = [r for session_records, _ in results for r in session_records]
+    latency_ms = np.array([r['latency'] for r in records]) * 1000
+    service_ms = np.array([r['service'] for r in records]) * 1000
+    state_bytes = [footprint for _, footprint in results]
+
+    growth = caches_after[['entries', 'current_bytes']].subtract(
+        caches_before[['entries', 'current_bytes']].reindex(caches_after.index, fill_value=0)
+    )
+    return {
+        'sessions': n_sessions,
+        'reruns': len(records),
+        'elapsed_seconds': elapsed,
+        'reruns_per_second': len(records) / elapsed,
+        'latency_ms': {f"p{p}": float(np.percentile(latency_ms, p)) for p in PERCENTILES},
+        'service_ms': {'mean': float(service_ms.mean()), 'p95': float(np.percentile(service_ms, 95))},
+        'session_state_bytes': {'mean': float(np.mean(state_bytes)), 'max': int(max(state_bytes))},
+        'cache_growth': {name: {'entries': int(row['entries']), 'bytes': int(row['current_bytes'])} for name, row in growth.iterrows()},
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent-session load test for app.py.")
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 4, 8], help="Concurrency levels to test.")
+    parser.add_argument('--iterations', type=int, default=2, help="Full workflow passes per session.")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-p95-ms', type=float, help="Fail (exit 1) if any level's p95 rerun latency exceeds this.")
+    parser.add_argument('--output', type=Path, help="Optional path for the JSON report.")
+    args = parser.parse_args(argv)
+
+    levels = []
+    for n_sessions in args.sessions:
+        level = run_load_level(n_sessions, args.iterations, args.seed)
+        levels.append(level)
+        lat = level['latency_ms']
+        print(
+            f"{n_sessions:>4} sessions | p50 {lat['p50']:7.1f} ms  p95 {lat['p95']:7.1f} ms  p99 {lat['p99']:7.1f} ms | "
+            f"{level['reruns_per_second']:6.1f} reruns/s | state {level['session_state_bytes']['mean'] / 1024:6.1f} KiB/session | "
+            f"RSS {level['peak_rss_mb']:6.0f} MB"
+        )
+
+    report = {'iterations': args.iterations, 'seed': args.seed, 'levels': levels}
+    exit_code = 0
+    if args.max_p95_ms is not None:
+        within = [lvl['sessions'] for lvl in levels if lvl['latency_ms']['p95'] <= args.max_p95_ms]
+        report['max_p95_ms'] = args.max_p95_ms
+        report['supported_sessions'] = max(within) if within else 0
+        print(f"Largest tested concurrency within p95 <= {args.max_p95_ms:.0f} ms: {report['supported_sessions']} sessions")
+        if len(within) < len(levels):
+            exit_code = 1
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
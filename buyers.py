@@ -0,0 +1,187 @@
+"""
+Buyer-profile library and matrix valuation across many acquirer types.
+
+The weight triplet of section 3 describes one buyer's priorities. A buyer library holds many
+strategic and financial buyers, each with its own dimension weights and AI Premium Coefficient
+(delta), defined in a JSON config (data/buyers.json, or QULAB_BUYERS). Every company is valued for
+every buyer at once: the Exit-AI-R Scores are one (buyers x 3) @ (3 x companies) product of the
+normalized weight matrix and the dimension scores, and the projected multiples follow by
+broadcasting each buyer's delta against each company's baseline multiple.
+
+Config format:
+    {"buyers": [{"id": "big_tech_platform", "name": "...", "type": "Strategic - Technology",
+                 "w_visible": 0.5, "w_documented": 0.2, "w_sustainable": 0.3, "delta": 3.2}, ...]}
+"""
+import functools
+import json
+import os
+from collections import namedtuple
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from scoring import SCORE_COLUMNS, WEIGHT_COLUMNS, calculate_exit_air_scores, project_valuation_impact
+
+DEFAULT_BUYERS = Path(__file__).resolve().parent / "data" / "buyers.json"
+BUYERS_PATH = Path(os.environ.get("QULAB_BUYERS", DEFAULT_BUYERS))
+
+BUYER_COLUMNS = ['id', 'name', 'type'] + WEIGHT_COLUMNS + ['delta']
+
+# One acquirer profile; weights need not sum to 1 and are normalized as in section 3
+Buyer = namedtuple('Buyer', BUYER_COLUMNS)
+
+# Result of BuyerLibrary.value: `exit_air` and `projected` have shape (buyers, companies);
+# `companies` labels the columns and `baselines` holds each company's baseline multiple
+BuyerValuation = namedtuple('BuyerValuation', ['exit_air', 'projected', 'companies', 'baselines'])
+
+
+class BuyerLibrary:
+    """
+    A set of buyers. `weights` is the (buyers x 3) matrix of weights normalized exactly as
+    calculate_exit_air_scores normalizes a single triplet, and `deltas` the per-buyer coefficients.
+    """
+
+    def __init__(self, buyers):
+        self.buyers = list(buyers)
+        if not self.buyers:
+            raise ValueError("The buyer library is empty.")
+        self.ids = [b.id for b in self.buyers]
+        if len(set(self.ids)) != len(self.ids):
+            raise ValueError("Buyer ids must be unique.")
+        raw = np.array([[b.w_visible, b.w_documented, b.w_sustainable] for b in self.buyers], dtype=float)
+        deltas = np.array([b.delta for b in self.buyers], dtype=float)
+        if not np.isfinite(raw).all() or (raw < 0).any():
+            raise ValueError("Buyer weights must be non-negative numbers.")
+        if not np.isfinite(deltas).all():
+            raise ValueError("Buyer deltas must be numbers.")
+        normalized = calculate_exit_air_scores(0.0, 0.0, 0.0, *raw.T)
+        self.weights = np.column_stack([normalized.w_v, normalized.w_d, normalized.w_s])
+        self.deltas = deltas
+
+    @classmethod
+    def from_config(cls, config):
+        """Builds the library from the parsed JSON config (see the module docstring)."""
+        return cls(
+            Buyer(str(b['id']), b.get('name', b['id']), b.get('type', ""), *(float(b[w]) for w in WEIGHT_COLUMNS), float(b['delta']))
+            for b in config['buyers']
+        )
+
+    @classmethod
+    def from_frame(cls, frame):
+        """Builds the library from a DataFrame of BUYER_COLUMNS (e.g. an edited to_frame()); blank rows are skipped."""
+        missing = [c for c in BUYER_COLUMNS if c not in frame.columns]
+        if missing:
+            raise ValueError(f"Buyer table is missing required columns: {', '.join(missing)}")
+        frame = frame.dropna(subset=['id'] + WEIGHT_COLUMNS + ['delta'])
+        frame = frame[frame['id'].astype(str).str.strip() != ""]
+        return cls(
+            Buyer(str(row['id']), str(row['name'] if pd.notna(row['name']) else row['id']), str(row['type'] if pd.notna(row['type']) else ""),
+                  *(float(row[w]) for w in WEIGHT_COLUMNS), float(row['delta']))
+            for row in frame.to_dict('records')
+        )
+
+    def to_frame(self):
+        """The buyers as a DataFrame of BUYER_COLUMNS, with the weights as configured."""
+        return pd.DataFrame(self.buyers, columns=BUYER_COLUMNS)
+
+    def __len__(self):
+        return len(self.buyers)
+
+    def value(self, scores, baselines, companies=None):
+        """
+        Values every company for every buyer. `scores` is a (companies x 3) array in SCORE_COLUMNS
+        order and `baselines` the companies' baseline multiples (an array or one shared number).
+        """
+        scores = np.atleast_2d(np.asarray(scores, dtype=float))
+        baselines = np.broadcast_to(np.asarray(baselines, dtype=float), (scores.shape[0],))
+        exit_air = self.weights @ scores.T
+        projected = project_valuation_impact(exit_air, baselines[None, :], self.deltas[:, None])
+        companies = list(companies) if companies is not None else [f"Company {i}" for i in range(scores.shape[0])]
+        return BuyerValuation(exit_air, projected, companies, baselines)
+
+    def value_portfolio(self, portfolio, baseline=7.0):
+        """
+        Values a portfolio DataFrame with SCORE_COLUMNS (and optionally company_name and
+        baseline_ebitda_multiple, else the shared `baseline`) for every buyer.
+        """
+        missing = [col for col in SCORE_COLUMNS if col not in portfolio.columns]
+        if missing:
+            raise ValueError(f"Portfolio is missing required score columns: {', '.join(missing)}")
+        if 'baseline_ebitda_multiple' in portfolio.columns:
+            baseline = portfolio['baseline_ebitda_multiple'].to_numpy(dtype=float)
+        companies = portfolio['company_name'] if 'company_name' in portfolio.columns else None
+        return self.value(portfolio[SCORE_COLUMNS].to_numpy(dtype=float), baseline, companies)
+
+    def best_buyers(self, valuation, top_n=5):
+        """
+        The `top_n` buyers by projected multiple for every company, ranked, as one long DataFrame
+        with the buyer's Exit-AI-R Score for the company, the projected multiple, the uplift over the
+        baseline and the premium over the median buyer.
+        """
+        projected = valuation.projected
+        n_buyers, n_companies = projected.shape
+        top_n = max(1, min(int(top_n), n_buyers))
+        # Partial selection of the top rows per column, then a sort of only those
+        top = np.argpartition(-projected, top_n - 1, axis=0)[:top_n]
+        top = np.take_along_axis(top, np.argsort(-np.take_along_axis(projected, top, axis=0), axis=0, kind='stable'), axis=0)
+        columns = np.broadcast_to(np.arange(n_companies), top.shape)
+
+        buyer_rows = top.T.ravel()
+        company_cols = columns.T.ravel()
+        best = projected[buyer_rows, company_cols]
+        frame = self.to_frame()
+        return pd.DataFrame({
+            'company_name': np.asarray(valuation.companies, dtype=object)[company_cols],
+            'rank': np.tile(np.arange(1, top_n + 1), n_companies),
+            'buyer_id': frame['id'].to_numpy()[buyer_rows],
+            'buyer_name': frame['name'].to_numpy()[buyer_rows],
+            'buyer_type': frame['type'].to_numpy()[buyer_rows],
+            'exit_ai_r_score': valuation.exit_air[buyer_rows, company_cols],
+            'projected_ebitda_multiple': best,
+            'uplift_vs_baseline': best - valuation.baselines[company_cols],
+            'premium_vs_median_buyer': best - np.median(projected, axis=0)[company_cols],
+        })
+
+    def matrix_frame(self, valuation, field='projected'):
+        """
+        One valuation field ('projected' or 'exit_air') as a buyers x companies DataFrame. Names need
+        not be unique, so rows are labelled by (buyer_id, buyer name) and columns by (company position,
+        company_name).
+        """
+        return pd.DataFrame(
+            getattr(valuation, field),
+            index=pd.MultiIndex.from_arrays([self.ids, [b.name for b in self.buyers]], names=['buyer_id', 'buyer']),
+            columns=pd.MultiIndex.from_arrays(
+                [np.arange(len(valuation.companies)), list(valuation.companies)], names=['company', 'company_name']
+            )
+        )
+
+
+@functools.lru_cache(maxsize=4)
+def _load_buyer_library(path, mtime):
+    with open(path, encoding='utf-8') as f:
+        return BuyerLibrary.from_config(json.load(f))
+
+
+def load_buyer_library(path=None):
+    """
+    Returns the buyer library defined at `path` (default: QULAB_BUYERS or the bundled config),
+    reloading it only when the file changes. Returns None if the file is missing.
+    """
+    path = Path(path or BUYERS_PATH)
+    if not path.exists():
+        return None
+    return _load_buyer_library(str(path), path.stat().st_mtime)
+
+
+def synthetic_buyer_library(n, seed=0):
+    """Generates `n` illustrative buyers with random weights and deltas, for tests and benchmarks."""
+    rng = np.random.default_rng(seed)
+    weights = rng.dirichlet([2, 2, 2], size=n)
+    deltas = rng.uniform(0.5, 4.0, n)
+    types = np.array(["Strategic", "Financial"])[rng.integers(0, 2, n)]
+    return BuyerLibrary(
+        Buyer(f"buyer_{i:04d}", f"Buyer {i:04d}", str(t), *map(float, w), float(d))
+        for i, (w, d, t) in enumerate(zip(weights, deltas, types))
+    )
@@ -0,0 +1,97 @@
+import functools
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import record_call
+from render_cache import ByteBudgetLRUCache, make_cache_key
+
+# Every bounded cache in the process, by name, for the admin panel and for clearing.
+CACHE_REGISTRY = {}
+STATS_COLUMNS = ['entries', 'max_entries', 'current_bytes', 'max_bytes', 'ttl_seconds',
+                 'hit_ratio', 'hits', 'misses', 'evictions', 'expirations']
+_REGISTRY_LOCK = threading.Lock()
+
+
+def estimate_size(value):
+    """
+    Estimates the memory held by a cached value in bytes.
+    Arrays and DataFrames report their buffers; containers (including namedtuples) are summed recursively.
+    """
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return int(np.sum(value.memory_usage(deep=True)))
+    if isinstance(value, (list, tuple, set)):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    return sys.getsizeof(value)
+
+
+def register_cache(name, cache):
+    """Adds an existing cache to the registry so it shows up in the admin panel."""
+    with _REGISTRY_LOCK:
+        if name in CACHE_REGISTRY and CACHE_REGISTRY[name] is not cache:
+            raise ValueError(f"A different cache is already registered as '{name}'.")
+        CACHE_REGISTRY[name] = cache
+    return cache
+
+
+def _get_or_create_cache(name, max_entries, ttl_seconds, max_bytes):
+    """
+    Returns the registered cache called `name`, creating it on first use.
+    Streamlit re-executes app.py on every rerun, so decorated functions are redefined each time;
+    reusing the cache by name keeps entries (and counters) across reruns and sessions.
+    """
+    with _REGISTRY_LOCK:
+        cache = CACHE_REGISTRY.get(name)
+        if cache is None:
+            cache = CACHE_REGISTRY[name] = ByteBudgetLRUCache(
+                max_bytes=max_bytes, ttl_seconds=ttl_seconds, max_entries=max_entries, size_of=estimate_size
+            )
+        else:
+            # Pick up edited limits; they are enforced from the next insertion on
+            cache.max_bytes, cache.ttl_seconds, cache.max_entries = max_bytes, ttl_seconds, max_entries
+    return cache
+
+
+def bounded_cache(name, max_entries=128, ttl_seconds=3600, max_bytes=16 * 1024 * 1024):
+    """
+    Memoizes a function in a process-wide LRU cache bounded by entry count, TTL and an estimated
+    memory ceiling, replacing the unbounded @st.cache_data. Keys are built from all arguments,
+    so free-text inputs such as company or persona names can only displace older entries,
+    never grow the cache past its limits. Cached values are shared between sessions and must
+    be treated as read-only. The wrapper exposes `.cache` and `.clear()`.
+    """
+    def decorator(func):
+        cache = _get_or_create_cache(name, max_entries, ttl_seconds, max_bytes)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = make_cache_key(func.__qualname__, args, kwargs)
+            start = time.perf_counter()
+            value, hit = cache.lookup_or_render(key, lambda: func(*args, **kwargs))
+            record_call(name, time.perf_counter() - start, hit)
+            return value
+
+        wrapper.cache = cache
+        wrapper.clear = cache.clear
+        return wrapper
+    return decorator
+
+
+def cache_stats():
+    """Returns a DataFrame with one row of size and hit/miss/eviction statistics per registered cache."""
+    return pd.DataFrame.from_dict(
+        {name: cache.stats() for name, cache in CACHE_REGISTRY.items()}, orient='index', columns=STATS_COLUMNS
+    )
+
+
+def clear_all_caches():
+    """Empties every registered cache (counters are kept)."""
+    for cache in CACHE_REGISTRY.values():
+        cache.clear()
@@ -0,0 +1,426 @@
+import functools
+import io
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from cache_policy import register_cache
+from instrumentation import record_call
+from render_cache import ByteBudgetLRUCache, make_cache_key
+from sweep import simplex_to_cartesian
+
+# Process-wide cache of rendered chart bytes, shared by all Streamlit sessions on this server.
+# Budget and TTL can be tuned per deployment without code changes.
+CHART_CACHE = register_cache("charts", ByteBudgetLRUCache(
+    max_bytes=int(os.environ.get("QULAB_CHART_CACHE_MB", "64")) * 1024 * 1024,
+    ttl_seconds=float(os.environ.get("QULAB_CHART_CACHE_TTL_SECONDS", "3600")),
+))
+
+# The dimension-score, valuation-comparison and iso-multiple charts are sent to the browser as Vega-Lite
+# specs and drawn client-side (with hover tooltips and zoom), so an interaction costs the server no
+# rendering. Matplotlib stays for static export such as bulk reports, and for every chart when
+# QULAB_CHART_BACKEND=matplotlib.
+CHART_BACKENDS = ('vega', 'matplotlib')
+CHART_BACKEND = os.environ.get("QULAB_CHART_BACKEND", "vega")
+if CHART_BACKEND not in CHART_BACKENDS:
+    raise ValueError(f"QULAB_CHART_BACKEND must be one of {', '.join(CHART_BACKENDS)}, not '{CHART_BACKEND}'.")
+
+# Colours of the matplotlib palettes the static charts use, so both backends look alike
+VIRIDIS_3 = ['#3b528b', '#21918c', '#5ec962']
+COOLWARM_2 = ['#aac7fd', '#f7b89c']
+
+
+@functools.lru_cache(maxsize=None)
+def _plotting_stack():
+    """
+    Imports seaborn and matplotlib on the first chart request instead of at app start-up,
+    and applies the shared plot theme once per process.
+    """
+    import seaborn as sns
+    from matplotlib.figure import Figure
+
+    # Set a consistent aesthetic for plots
+    sns.set_theme(style="whitegrid")
+    return sns, Figure
+
+
+def _figure_to_bytes(fig, fmt):
+    """Serializes a figure to PNG or SVG bytes."""
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=fmt, dpi=150)
+    return buffer.getvalue()
+
+
+# Figures are built with matplotlib.figure.Figure rather than pyplot, so no global figure
+# state is shared between the threads that serve concurrent sessions.
+
+def render_dimension_scores(scores_dict, company_name, fmt='png'):
+    """
+    Renders a bar chart of the individual AI readiness dimension scores.
+    """
+    sns, Figure = _plotting_stack()
+    df_scores = pd.DataFrame(list(scores_dict.items()), columns=['Dimension', 'Score'])
+
+    fig = Figure(figsize=(8, 5), layout='tight')
+    ax = fig.subplots()
+    sns.barplot(x='Dimension', y='Score', hue='Dimension', data=df_scores, palette='viridis', legend=False, ax=ax)
+    ax.set_ylim(0, 100)
+    ax.set_title(f"{company_name}'s AI Exit-Readiness Dimension Scores")
+    ax.set_ylabel("Score (0-100)")
+    ax.set_xlabel("AI Capability Dimension")
+    return _figure_to_bytes(fig, fmt)
+
+
+def render_valuation_comparison(baseline, projected, company_name, fmt='png'):
+    """
+    Renders a bar chart comparing the baseline and projected EBITDA multiples.
+    """
+    sns, Figure = _plotting_stack()
+    multiples_df = pd.DataFrame({
+        'Metric': ['Baseline EBITDA Multiple', 'Projected EBITDA Multiple (with AI Premium)'],
+        'Value': [baseline, projected]
+    })
+
+    fig = Figure(figsize=(8, 5), layout='tight')
+    ax = fig.subplots()
+    sns.barplot(x='Metric', y='Value', hue='Metric', data=multiples_df, palette='coolwarm', legend=False, ax=ax)
+    ax.set_title(f"{company_name}'s Valuation Multiple Comparison")
+    ax.set_ylabel("EBITDA Multiple (x)")
+    ax.set_xlabel("")
+    return _figure_to_bytes(fig, fmt)
+
+
+def _bar_chart_spec(title, records, x_field, y_field, x_title, y_title, colors=None, y_domain=None):
+    """
+    Vega-Lite bar chart with tooltips and y-axis zoom/pan, in the layout of the seaborn bar charts.
+    `colors` gives one colour per bar; without it the bars use a categorical scheme.
+    """
+    y_scale = {'domain': list(y_domain)} if y_domain else {}
+    color_scale = {'domain': [r[x_field] for r in records], 'range': colors} if colors else {'scheme': 'tableau10'}
+    return {
+        'title': title,
+        'data': {'values': records},
+        'params': [{'name': 'zoom', 'select': {'type': 'interval', 'encodings': ['y']}, 'bind': 'scales'}],
+        'mark': {'type': 'bar', 'tooltip': True},
+        'encoding': {
+            'x': {'field': x_field, 'type': 'nominal', 'sort': None, 'title': x_title, 'axis': {'labelAngle': 0}},
+            'y': {'field': y_field, 'type': 'quantitative', 'title': y_title, 'scale': y_scale},
+            'color': {
+                'field': x_field, 'type': 'nominal', 'sort': None, 'legend': None,
+                'scale': color_scale,
+            },
+            'tooltip': [
+                {'field': x_field, 'type': 'nominal'},
+                {'field': y_field, 'type': 'quantitative', 'format': '.2f'},
+            ],
+        },
+    }
+
+
+def dimension_scores_spec(scores_dict, company_name):
+    """Vega-Lite spec of render_dimension_scores, for client-side rendering."""
+    return _bar_chart_spec(
+        f"{company_name}'s AI Exit-Readiness Dimension Scores",
+        [{'Dimension': str(k), 'Score': float(v)} for k, v in scores_dict.items()],
+        'Dimension', 'Score', "AI Capability Dimension", "Score (0-100)",
+        VIRIDIS_3[:len(scores_dict)], y_domain=(0, 100)
+    )
+
+
+def valuation_comparison_spec(baseline, projected, company_name):
+    """Vega-Lite spec of render_valuation_comparison, for client-side rendering."""
+    return _bar_chart_spec(
+        f"{company_name}'s Valuation Multiple Comparison",
+        [
+            {'Metric': 'Baseline EBITDA Multiple', 'Value': float(baseline)},
+            {'Metric': 'Projected EBITDA Multiple (with AI Premium)', 'Value': float(projected)},
+        ],
+        'Metric', 'Value', "", "EBITDA Multiple (x)", COOLWARM_2
+    )
+
+
+def iso_multiple_spec(line_x, line_y, current_point, fix_points, axis_labels, target_multiple, company_name):
+    """
+    Vega-Lite spec of render_iso_multiple, for client-side rendering: the iso-multiple line, the
+    shaded side that reaches the target, the current scores and arrows to the single-dimension fixes.
+    """
+    line_label = f"Projected multiple = {target_multiple:.2f}x"
+    x_title, y_title = f"{axis_labels[0]} Score", f"{axis_labels[1]} Score"
+    x_axis = {'field': 'x', 'type': 'quantitative', 'title': x_title, 'scale': {'domain': [0, 100]}}
+    y_axis = {'field': 'y', 'type': 'quantitative', 'title': y_title, 'scale': {'domain': [0, 100]}}
+    color = {
+        'field': 'Series', 'type': 'nominal', 'title': None, 'legend': {'orient': 'bottom'},
+        'scale': {
+            'domain': [line_label, "Reaches target", "Current scores", "Single-dimension fix"],
+            'range': [VIRIDIS_3[1], VIRIDIS_3[2], 'black', VIRIDIS_3[0]],
+        },
+    }
+    tooltip = [{'field': 'Series', 'type': 'nominal'}, {'field': 'x', 'type': 'quantitative', 'format': '.1f', 'title': x_title},
+               {'field': 'y', 'type': 'quantitative', 'format': '.1f', 'title': y_title}]
+
+    layers = []
+    if len(line_x):
+        # The iso-multiple line is straight, so its end points describe it
+        line = [{'Series': line_label, 'x': float(line_x[i]), 'y': float(line_y[i])} for i in (0, -1)]
+        # Scores beyond the line (away from the origin) reach the target
+        if np.ptp(line_x) == 0:
+            region = {'values': [{'Series': "Reaches target", 'x': float(line_x[0]), 'x2': 100.0, 'y': 0.0, 'y2': 100.0}]}
+            layers.append({
+                'data': region, 'mark': {'type': 'rect', 'opacity': 0.2},
+                'encoding': {'x': x_axis, 'x2': {'field': 'x2'}, 'y': y_axis, 'y2': {'field': 'y2'}, 'color': color},
+            })
+        else:
+            region = {'values': [dict(point, Series="Reaches target", y2=100.0) for point in line]}
+            layers.append({
+                'data': region, 'mark': {'type': 'area', 'opacity': 0.2},
+                'encoding': {'x': x_axis, 'y': y_axis, 'y2': {'field': 'y2'}, 'color': color},
+            })
+        layers.append({
+            'data': {'values': line}, 'mark': {'type': 'line', 'strokeWidth': 2},
+            'encoding': {'x': x_axis, 'y': y_axis, 'color': color, 'tooltip': tooltip},
+        })
+
+    current = {'Series': "Current scores", 'x': float(current_point[0]), 'y': float(current_point[1])}
+    fixes = [
+        {'Series': "Single-dimension fix", 'Label': f" {label}", 'x': float(x), 'y': float(y),
+         'x0': current['x'], 'y0': current['y']}
+        for label, (x, y) in fix_points.items()
+    ]
+    if fixes:
+        layers.append({
+            'data': {'values': fixes}, 'mark': {'type': 'rule', 'strokeDash': [4, 3]},
+            'encoding': {'x': {'field': 'x0', 'type': 'quantitative'}, 'y': {'field': 'y0', 'type': 'quantitative'},
+                         'x2': {'field': 'x'}, 'y2': {'field': 'y'}, 'color': color},
+        })
+        layers.append({
+            'data': {'values': fixes}, 'mark': {'type': 'point', 'filled': True, 'size': 60},
+            'encoding': {'x': x_axis, 'y': y_axis, 'color': color, 'tooltip': tooltip},
+        })
+        layers.append({
+            'data': {'values': fixes}, 'mark': {'type': 'text', 'align': 'left', 'baseline': 'bottom'},
+            'encoding': {'x': x_axis, 'y': y_axis, 'text': {'field': 'Label'}},
+        })
+    layers.append({
+        'data': {'values': [current]}, 'mark': {'type': 'point', 'filled': True, 'size': 80},
+        'encoding': {'x': x_axis, 'y': y_axis, 'color': color, 'tooltip': tooltip},
+    })
+    return {'title': f"{company_name}: Scores Needed for {target_multiple:.2f}x", 'layer': layers}
+
+
+def scenario_comparison_spec(scenario_names, projected, company_name):
+    """Vega-Lite spec comparing the projected EBITDA multiple of several what-if scenarios."""
+    return _bar_chart_spec(
+        f"{company_name}'s Projected EBITDA Multiple by Scenario",
+        [{'Scenario': str(name), 'Projected Multiple': float(value)} for name, value in zip(scenario_names, projected)],
+        'Scenario', 'Projected Multiple', "", "EBITDA Multiple (x)"
+    )
+
+
+def score_trend_spec(trend, metric, title, metric_label=None, rolling_label="4-quarter rolling mean"):
+    """
+    Vega-Lite line chart of one metric over quarters from a trend table indexed by quarter label,
+    with its `rolling_<metric>` column, when present, as a dashed line.
+    """
+    metric_label = metric_label or metric
+    series = [(metric, metric_label)]
+    if f"rolling_{metric}" in trend.columns:
+        series.append((f"rolling_{metric}", rolling_label))
+    records = [
+        {'Quarter': str(quarter), 'Series': label, 'Value': float(value)}
+        for column, label in series for quarter, value in trend[column].items()
+    ]
+    return {
+        'title': title,
+        'data': {'values': records},
+        'params': [{'name': 'zoom', 'select': {'type': 'interval', 'encodings': ['x']}, 'bind': 'scales'}],
+        'mark': {'type': 'line', 'point': True, 'tooltip': True},
+        'encoding': {
+            'x': {'field': 'Quarter', 'type': 'ordinal', 'title': "Quarter", 'axis': {'labelAngle': -45}},
+            'y': {'field': 'Value', 'type': 'quantitative', 'title': metric_label, 'scale': {'zero': False}},
+            'color': {'field': 'Series', 'type': 'nominal', 'sort': None, 'title': None, 'legend': {'orient': 'bottom'}},
+            'strokeDash': {'field': 'Series', 'type': 'nominal', 'sort': None, 'legend': None},
+            'tooltip': [
+                {'field': 'Quarter', 'type': 'ordinal'},
+                {'field': 'Series', 'type': 'nominal'},
+                {'field': 'Value', 'type': 'quantitative', 'format': '.2f'},
+            ],
+        },
+    }
+
+
+def tornado_spec(indices, base_projected, company_name, labels=None):
+    """
+    Vega-Lite tornado chart of one-at-a-time swings: for each input (sorted by swing) a bar from
+    the base projected multiple to the multiple with the input at its P10 and at its P90. `indices`
+    is a sensitivity.SensitivityResult.indices frame.
+    """
+    labels = labels or {}
+    ordered = indices.sort_values('swing', ascending=False)
+    records = [
+        {
+            'Input': labels.get(name, name), 'Setting': setting, 'Start': float(base_projected),
+            'End': float(row[column]), 'Input Value': float(row[value]), 'Total Effect': float(row['total_effect']),
+        }
+        for name, row in ordered.iterrows()
+        for setting, column, value in (("Input at P10", 'projected_low', 'low'), ("Input at P90", 'projected_high', 'high'))
+    ]
+    y = {'field': 'Input', 'type': 'nominal', 'sort': [labels.get(name, name) for name in ordered.index], 'title': None}
+    return {
+        'title': f"{company_name}: What Moves the Projected EBITDA Multiple",
+        'data': {'values': records},
+        'layer': [
+            {
+                'mark': {'type': 'bar', 'tooltip': True},
+                'encoding': {
+                    'y': y,
+                    'x': {'field': 'Start', 'type': 'quantitative', 'title': "Projected EBITDA Multiple (x)", 'scale': {'zero': False}},
+                    'x2': {'field': 'End'},
+                    'color': {
+                        'field': 'Setting', 'type': 'nominal', 'title': None, 'legend': {'orient': 'bottom'},
+                        'scale': {'range': COOLWARM_2},
+                    },
+                    'tooltip': [
+                        {'field': 'Input', 'type': 'nominal'},
+                        {'field': 'Setting', 'type': 'nominal'},
+                        {'field': 'Input Value', 'type': 'quantitative', 'format': '.2f'},
+                        {'field': 'End', 'type': 'quantitative', 'format': '.3f', 'title': "Projected Multiple"},
+                        {'field': 'Total Effect', 'type': 'quantitative', 'format': '.1%'},
+                    ],
+                },
+            },
+            {
+                'mark': {'type': 'rule', 'color': 'black'},
+                'encoding': {'x': {'datum': float(base_projected), 'type': 'quantitative'}},
+            },
+        ],
+    }
+
+
+def _axis_labels(index):
+    """
+    Display labels for a (key, name) MultiIndex level pair, or a plain index. A name shared by several
+    keys gets its key appended, so no two rows or columns of the chart collapse into one.
+    """
+    if not isinstance(index, pd.MultiIndex):
+        return [str(label) for label in index]
+    keys, names = index.get_level_values(0), index.get_level_values(1)
+    counts = pd.Series(names).value_counts()
+    return [f"{name} ({key})" if counts[name] > 1 else str(name) for key, name in zip(keys, names)]
+
+
+def buyer_heatmap_spec(matrix, title, value_title="Projected EBITDA Multiple (x)"):
+    """
+    Vega-Lite heatmap of a buyers x companies matrix (a buyers.BuyerLibrary.matrix_frame), with
+    buyers as rows and companies as columns in the frame's order.
+    """
+    buyers, companies = _axis_labels(matrix.index), _axis_labels(matrix.columns)
+    records = [
+        {'Buyer': buyer, 'Company': company, 'Value': float(value)}
+        for buyer, row in zip(buyers, matrix.to_numpy())
+        for company, value in zip(companies, row)
+    ]
+    return {
+        'title': title,
+        'data': {'values': records},
+        'mark': {'type': 'rect', 'tooltip': True},
+        'encoding': {
+            'x': {'field': 'Company', 'type': 'nominal', 'sort': companies, 'title': None, 'axis': {'labelAngle': -45}},
+            'y': {'field': 'Buyer', 'type': 'nominal', 'sort': buyers, 'title': None},
+            'color': {'field': 'Value', 'type': 'quantitative', 'title': value_title, 'scale': {'scheme': 'viridis'}},
+            'tooltip': [
+                {'field': 'Buyer', 'type': 'nominal'},
+                {'field': 'Company', 'type': 'nominal'},
+                {'field': 'Value', 'type': 'quantitative', 'format': '.2f', 'title': value_title},
+            ],
+        },
+    }
+
+
+def render_sensitivity_ternary(weights, projected, company_name, delta, baseline, fmt='png'):
+    """
+    Renders a ternary plot of the projected EBITDA multiple over the weight simplex
+    for one (delta, baseline) slice of a sensitivity sweep.
+    """
+    _, Figure = _plotting_stack()
+    x, y = simplex_to_cartesian(weights)
+
+    fig = Figure(figsize=(8, 6.5), layout='tight')
+    ax = fig.subplots()
+    mesh = ax.tripcolor(x, y, projected, shading='gouraud', cmap='viridis')
+    fig.colorbar(mesh, ax=ax, label="Projected EBITDA Multiple (x)")
+    ax.plot([0, 1, 0.5, 0], [0, 0, np.sqrt(3) / 2, 0], color='black', linewidth=1)
+    ax.text(0, -0.03, "Visible", ha='center', va='top')
+    ax.text(1, -0.03, "Documented", ha='center', va='top')
+    ax.text(0.5, np.sqrt(3) / 2 + 0.03, "Sustainable", ha='center', va='bottom')
+    ax.set_aspect('equal')
+    ax.set_axis_off()
+    ax.set_title(f"{company_name}'s Projected Multiple Across Buyer Weights (delta={delta:.2f}, baseline={baseline:.2f}x)")
+    return _figure_to_bytes(fig, fmt)
+
+
+def render_monte_carlo_distribution(bin_edges, hist_counts, percentiles, company_name, n_plot_bins=100, fmt='png'):
+    """
+    Renders a histogram of the simulated projected EBITDA multiple with percentile markers.
+    The fine streaming histogram is coarsened to `n_plot_bins` bars for display.
+    """
+    sns, Figure = _plotting_stack()
+    group_starts = np.linspace(0, len(hist_counts), n_plot_bins + 1).astype(int)[:-1]
+    coarse_counts = np.add.reduceat(hist_counts, group_starts)
+    coarse_edges = np.append(bin_edges[group_starts], bin_edges[-1])
+
+    fig = Figure(figsize=(8, 5), layout='tight')
+    ax = fig.subplots()
+    ax.stairs(coarse_counts / hist_counts.sum(), coarse_edges, fill=True, color=sns.color_palette('viridis')[2])
+    for p, value in percentiles.items():
+        ax.axvline(value, color='black', linestyle='--', linewidth=1)
+        ax.text(value, ax.get_ylim()[1] * 0.95, f"P{p}", ha='center', va='top', backgroundcolor='white')
+    ax.set_title(f"{company_name}'s Simulated Projected EBITDA Multiple")
+    ax.set_xlabel("Projected EBITDA Multiple (x)")
+    ax.set_ylabel("Share of Draws")
+    return _figure_to_bytes(fig, fmt)
+
+
+def render_iso_multiple(line_x, line_y, current_point, fix_points, axis_labels, target_multiple, company_name, fmt='png'):
+    """
+    Renders the iso-multiple line for a target multiple in the plane of two dimensions, shading
+    the side that reaches the target, with the current scores and the single-dimension fixes marked.
+    `fix_points` maps a label to the (x, y) scores after that dimension's improvement.
+    """
+    sns, Figure = _plotting_stack()
+    colors = sns.color_palette('viridis', 3)
+
+    fig = Figure(figsize=(6.5, 6), layout='tight')
+    ax = fig.subplots()
+    if len(line_x):
+        ax.plot(line_x, line_y, color=colors[1], linewidth=2, label=f"Projected multiple = {target_multiple:.2f}x")
+        # Scores beyond the line (away from the origin) reach the target
+        if np.ptp(line_x) == 0:
+            ax.axvspan(line_x[0], 100, color=colors[2], alpha=0.2, label="Reaches target")
+        else:
+            ax.fill_between(line_x, line_y, 100, color=colors[2], alpha=0.2, label="Reaches target")
+    ax.scatter(*current_point, color='black', zorder=3, label="Current scores")
+    for label, (x, y) in fix_points.items():
+        ax.annotate("", xy=(x, y), xytext=current_point, arrowprops=dict(arrowstyle='->', color=colors[0]))
+        ax.scatter(x, y, color=colors[0], zorder=3)
+        ax.text(x, y, f" {label}", va='bottom')
+    ax.set_xlim(0, 100)
+    ax.set_ylim(0, 100)
+    ax.set_xlabel(f"{axis_labels[0]} Score")
+    ax.set_ylabel(f"{axis_labels[1]} Score")
+    ax.set_title(f"{company_name}: Scores Needed for {target_multiple:.2f}x")
+    ax.legend(loc='lower left')
+    return _figure_to_bytes(fig, fmt)
+
+
+def render_chart_cached(render_fn, *args, fmt='png', **kwargs):
+    """
+    Returns the rendered bytes of `render_fn(*args, **kwargs)` from CHART_CACHE,
+    rendering only when the same chart with the same inputs is not already cached.
+    """
+    key = make_cache_key(render_fn.__name__, fmt, args, kwargs)
+    start = time.perf_counter()
+    payload, hit = CHART_CACHE.lookup_or_render(key, lambda: render_fn(*args, fmt=fmt, **kwargs))
+    record_call(f"charts.{render_fn.__name__}", time.perf_counter() - start, hit)
+    return payload
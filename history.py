@@ -0,0 +1,496 @@
+"""
+Append-only quarterly history of assessments with incrementally maintained roll-ups.
+
+Every recorded assessment is appended as one JSON line to the partition of its quarter
+(history/2024Q3.jsonl, ...); the log is never rewritten. Alongside the log the history keeps dense
+companies x quarters x metrics arrays: the latest value per company and quarter, the mean over the
+assessed quarters among the last ROLLING_QUARTERS, the quarter-over-quarter delta, and per-fund
+sums and counts. An insert only touches the cells it affects (its quarter, the next quarter's
+delta and the rolling windows that contain it), so trend queries are array slices that never scan
+the log. The roll-ups are snapshotted to rollups.npz together with the log offsets they cover;
+opening the history loads the snapshot and replays only the lines appended since. Each
+(company, quarter) lives in exactly one partition, so partitions can be replayed in any order.
+
+Usage:
+    python history.py seed [--companies 400] [--quarters 20]   # illustrative demo history
+    python history.py rebuild                                  # recompute roll-ups from the full log
+"""
+import argparse
+import datetime
+import functools
+import json
+import os
+import re
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from assessment_store import utc_timestamp
+from scoring import SCORE_COLUMNS, calculate_exit_air_scores, project_valuation_impact
+
+HISTORY_DIR = Path(os.environ.get("QULAB_HISTORY_DIR", "history"))
+SNAPSHOT_FILE = "rollups.npz"
+ROLLING_QUARTERS = 4
+UNASSIGNED_FUND = "Unassigned"
+
+METRIC_COLUMNS = ['exit_ai_r_score'] + SCORE_COLUMNS + ['projected_ebitda_multiple']
+METRIC_LABELS = {
+    'exit_ai_r_score': "Exit-AI-R Score",
+    'visible_score': "Visible AI Score",
+    'documented_score': "Documented AI Score",
+    'sustainable_score': "Sustainable AI Score",
+    'projected_ebitda_multiple': "Projected EBITDA Multiple",
+}
+RECORD_COLUMNS = ['company_name', 'fund', 'quarter', 'assessed_at'] + METRIC_COLUMNS
+
+_PARTITION_RE = re.compile(r'^\d{4}Q[1-4]\.jsonl$')
+_QUARTER_RE = re.compile(r'^(\d{4})\s*-?\s*Q([1-4])$', re.IGNORECASE)
+
+# Roll-up arrays: name -> (axis 0 is 'company' or 'fund', dtype, fill value). The second axis is
+# the quarter and the third, where present, follows METRIC_COLUMNS.
+_ARRAYS = {
+    'values': ('company', np.float64, np.nan),
+    'rolling': ('company', np.float64, np.nan),
+    'qoq': ('company', np.float64, np.nan),
+    'fund_of': ('company', np.int32, -1),
+    'fund_sum': ('fund', np.float64, 0.0),
+    'fund_count': ('fund', np.int64, 0),
+}
+
+
+def quarter_ordinal(quarter):
+    """Quarter number (year * 4 + quarter - 1) of a '2024Q3' label or a date."""
+    if isinstance(quarter, (datetime.date, pd.Timestamp)):
+        return quarter.year * 4 + (quarter.month - 1) // 3
+    match = _QUARTER_RE.match(str(quarter).strip())
+    if not match:
+        raise ValueError(f"Invalid quarter '{quarter}'; expected a label such as 2024Q3.")
+    return int(match.group(1)) * 4 + int(match.group(2)) - 1
+
+
+def quarter_label(ordinal):
+    """'2024Q3'-style label of a quarter_ordinal."""
+    return f"{ordinal // 4}Q{ordinal % 4 + 1}"
+
+
+def _partition_name(ordinal):
+    return f"{quarter_label(ordinal)}.jsonl"
+
+
+class ScoreHistory:
+    """
+    Quarterly assessment history stored under `directory`. All methods are thread-safe; reads
+    first replay any lines other processes have appended. Read methods return new DataFrames.
+    """
+
+    def __init__(self, directory=HISTORY_DIR):
+        self.directory = Path(directory)
+        self._lock = threading.Lock()
+        with self._lock:
+            if not self._load_snapshot():
+                self._rebuild()
+            self._catch_up()
+
+    # --- Roll-up state ---
+
+    def _reset(self):
+        self.companies_ = []
+        self.funds_ = []
+        self._company_idx, self._fund_idx = {}, {}
+        self._first = None
+        self._offsets = {}
+        self._arrays = {
+            name: np.full((0, 0, len(METRIC_COLUMNS)) if name not in ('fund_of', 'fund_count') else (0, 0), fill, dtype=dtype)
+            for name, (_, dtype, fill) in _ARRAYS.items()
+        }
+
+    def _pad(self, kind, axis, before, after):
+        """Grows every array whose `axis` is `kind` ('company', 'fund' or 'quarter') by fill values."""
+        for name, (first_axis, _, fill) in _ARRAYS.items():
+            if kind != 'quarter' and first_axis != kind:
+                continue
+            array = self._arrays[name]
+            widths = [(0, 0)] * array.ndim
+            widths[axis] = (before, after)
+            self._arrays[name] = np.pad(array, widths, constant_values=fill)
+
+    def _index(self, names, lookup, kind, name):
+        """Index of `name` in a company or fund list, adding it (with doubling capacity) if new."""
+        i = lookup.get(name)
+        if i is None:
+            i = lookup[name] = len(names)
+            names.append(name)
+            capacity = self._arrays['values' if kind == 'company' else 'fund_sum'].shape[0]
+            if i >= capacity:
+                self._pad(kind, 0, 0, max(capacity, 16))
+        return i
+
+    def _quarter_index(self, ordinal):
+        n_quarters = self._arrays['values'].shape[1]
+        if self._first is None:
+            self._first = ordinal
+            self._pad('quarter', 1, 0, 1)
+        elif ordinal < self._first:
+            self._pad('quarter', 1, self._first - ordinal, 0)
+            self._first = ordinal
+        elif ordinal >= self._first + n_quarters:
+            self._pad('quarter', 1, 0, ordinal - self._first - n_quarters + 1)
+        return ordinal - self._first
+
+    def _apply(self, record):
+        """Folds one log record into the roll-ups, touching only the cells it affects."""
+        c = self._index(self.companies_, self._company_idx, 'company', record['company_name'])
+        f = self._index(self.funds_, self._fund_idx, 'fund', record.get('fund') or UNASSIGNED_FUND)
+        q = self._quarter_index(quarter_ordinal(record['quarter']))
+        a = self._arrays
+        new = np.array([record[m] for m in METRIC_COLUMNS], dtype=float)
+
+        # A reassessment within the quarter replaces the company's earlier value in its fund's sums
+        old_fund = a['fund_of'][c, q]
+        if old_fund >= 0:
+            a['fund_sum'][old_fund, q] -= a['values'][c, q]
+            a['fund_count'][old_fund, q] -= 1
+        a['values'][c, q] = new
+        a['fund_of'][c, q] = f
+        a['fund_sum'][f, q] += new
+        a['fund_count'][f, q] += 1
+
+        series = a['values'][c]
+        n_quarters = series.shape[0]
+        for k in (q, q + 1):
+            if 0 < k < n_quarters:
+                a['qoq'][c, k] = series[k] - series[k - 1]
+        # Rolling means of the windows ending at q .. q + ROLLING_QUARTERS - 1
+        for k in range(q, min(q + ROLLING_QUARTERS, n_quarters)):
+            if not np.isnan(series[k, 0]):
+                a['rolling'][c, k] = np.nanmean(series[max(k - ROLLING_QUARTERS + 1, 0):k + 1], axis=0)
+
+    def _rebuild(self):
+        """Recomputes every roll-up from the full log in one vectorized pass. Callers hold the lock."""
+        self._reset()
+        frames = []
+        for path in self._partitions():
+            records, offset = self._read_partition(path, 0)
+            self._offsets[path.name] = offset
+            frames.append(pd.DataFrame(records, columns=RECORD_COLUMNS))
+        frames = [frame for frame in frames if not frame.empty]
+        if not frames:
+            return
+        log = pd.concat(frames, ignore_index=True)
+        log['fund'] = log['fund'].fillna(UNASSIGNED_FUND).replace('', UNASSIGNED_FUND)
+        log = log.drop_duplicates(['company_name', 'quarter'], keep='last')
+
+        company_codes, self.companies_ = pd.factorize(log['company_name'])
+        fund_codes, self.funds_ = pd.factorize(log['fund'])
+        self.companies_, self.funds_ = list(self.companies_), list(self.funds_)
+        self._company_idx = {name: i for i, name in enumerate(self.companies_)}
+        self._fund_idx = {name: i for i, name in enumerate(self.funds_)}
+        ordinals = np.array([quarter_ordinal(q) for q in log['quarter']])
+        self._first = int(ordinals.min())
+        quarter_codes = ordinals - self._first
+        n_c, n_f, n_q, n_m = len(self.companies_), len(self.funds_), int(quarter_codes.max()) + 1, len(METRIC_COLUMNS)
+        metrics = log[METRIC_COLUMNS].to_numpy(dtype=float)
+
+        values = np.full((n_c, n_q, n_m), np.nan)
+        values[company_codes, quarter_codes] = metrics
+        fund_of = np.full((n_c, n_q), -1, dtype=np.int32)
+        fund_of[company_codes, quarter_codes] = fund_codes
+        fund_sum = np.zeros((n_f, n_q, n_m))
+        np.add.at(fund_sum, (fund_codes, quarter_codes), metrics)
+        fund_count = np.zeros((n_f, n_q), dtype=np.int64)
+        np.add.at(fund_count, (fund_codes, quarter_codes), 1)
+
+        qoq = np.full_like(values, np.nan)
+        qoq[:, 1:] = values[:, 1:] - values[:, :-1]
+        # Rolling window sums and counts from cumulative sums over the quarter axis
+        present = ~np.isnan(values)
+        sums = np.concatenate([np.zeros((n_c, 1, n_m)), np.cumsum(np.where(present, values, 0.0), axis=1)], axis=1)
+        counts = np.concatenate([np.zeros((n_c, 1, n_m)), np.cumsum(present, axis=1)], axis=1)
+        hi = np.arange(1, n_q + 1)
+        lo = np.maximum(hi - ROLLING_QUARTERS, 0)
+        rolling = np.full_like(values, np.nan)
+        np.divide(sums[:, hi] - sums[:, lo], counts[:, hi] - counts[:, lo], out=rolling, where=present)
+
+        self._arrays = {
+            'values': values, 'rolling': rolling, 'qoq': qoq,
+            'fund_of': fund_of, 'fund_sum': fund_sum, 'fund_count': fund_count,
+        }
+
+    # --- Log and snapshot ---
+
+    def _partitions(self):
+        if not self.directory.is_dir():
+            return []
+        return sorted(path for path in self.directory.iterdir() if _PARTITION_RE.match(path.name))
+
+    @staticmethod
+    def _read_partition(path, offset):
+        """Complete lines of a partition from byte `offset`; returns (records, new offset)."""
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            data = f.read()
+        # A line still being written by another process is picked up on the next read
+        end = data.rfind(b'\n') + 1
+        return [json.loads(line) for line in data[:end].splitlines() if line.strip()], offset + end
+
+    def _catch_up(self):
+        """Applies lines appended to the log since the roll-ups were last updated. Callers hold the lock."""
+        for path in self._partitions():
+            offset = self._offsets.get(path.name, 0)
+            size = path.stat().st_size
+            if size < offset:
+                # The append-only log was rewritten outside the app
+                self._rebuild()
+                return
+            if size > offset:
+                records, self._offsets[path.name] = self._read_partition(path, offset)
+                for record in records:
+                    self._apply(record)
+
+    def _save_snapshot(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        meta = {
+            'companies': self.companies_, 'funds': self.funds_,
+            'first_quarter': self._first, 'offsets': self._offsets,
+        }
+        n = {'company': len(self.companies_), 'fund': len(self.funds_)}
+        arrays = {name: self._arrays[name][:n[_ARRAYS[name][0]]] for name in _ARRAYS}
+        path = self.directory / SNAPSHOT_FILE
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, meta=np.array(json.dumps(meta)), **arrays)
+        os.replace(tmp_path, path)
+
+    def _load_snapshot(self):
+        """Restores the roll-ups from the snapshot; returns False if there is no usable snapshot."""
+        self._reset()
+        path = self.directory / SNAPSHOT_FILE
+        if not path.exists():
+            return False
+        try:
+            with np.load(path, allow_pickle=False) as snapshot:
+                meta = json.loads(str(snapshot['meta']))
+                arrays = {name: snapshot[name] for name in _ARRAYS}
+        except (OSError, ValueError, KeyError):
+            return False
+        sizes = {p.name: p.stat().st_size for p in self._partitions()}
+        if any(sizes.get(name, -1) < offset for name, offset in meta['offsets'].items()):
+            return False # The snapshot covers log lines that no longer exist
+        self.companies_, self.funds_ = meta['companies'], meta['funds']
+        self._company_idx = {name: i for i, name in enumerate(self.companies_)}
+        self._fund_idx = {name: i for i, name in enumerate(self.funds_)}
+        self._first, self._offsets, self._arrays = meta['first_quarter'], meta['offsets'], arrays
+        return True
+
+    def _append_records(self, records):
+        """Appends records to their quarter partitions, then folds them in and snapshots. Callers hold the lock."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        by_partition = {}
+        for record in records:
+            by_partition.setdefault(_partition_name(quarter_ordinal(record['quarter'])), []).append(record)
+        for name, partition_records in by_partition.items():
+            # One write per partition: O_APPEND keeps concurrent writers' lines whole
+            with open(self.directory / name, 'a', encoding='utf-8') as f:
+                f.write(''.join(json.dumps(record) + '\n' for record in partition_records))
+        self._catch_up()
+        self._save_snapshot()
+
+    # --- Public API ---
+
+    def append(self, company, quarter, fund=None, assessed_at=None, **metrics):
+        """
+        Records one assessment of `company` for `quarter` (a '2024Q3' label or a date) with every
+        METRIC_COLUMNS value. A later record for the same company and quarter supersedes the
+        earlier one in the roll-ups; both stay in the log. Returns the appended record.
+        """
+        missing = [m for m in METRIC_COLUMNS if m not in metrics]
+        unknown = sorted(set(metrics) - set(METRIC_COLUMNS))
+        if missing or unknown:
+            raise ValueError(f"History records need exactly these metrics: {', '.join(METRIC_COLUMNS)}")
+        record = {
+            'company_name': str(company), 'fund': fund or UNASSIGNED_FUND,
+            'quarter': quarter_label(quarter_ordinal(quarter)), 'assessed_at': assessed_at or utc_timestamp(),
+            **{m: float(metrics[m]) for m in METRIC_COLUMNS},
+        }
+        with self._lock:
+            self._append_records([record])
+        return record
+
+    def append_many(self, frame):
+        """
+        Records every row of a DataFrame with company_name, quarter and METRIC_COLUMNS (fund and
+        assessed_at are optional), writing each quarter's partition once. Returns the number of rows.
+        """
+        missing = [c for c in ['company_name', 'quarter'] + METRIC_COLUMNS if c not in frame.columns]
+        if missing:
+            raise ValueError(f"History data is missing required columns: {', '.join(missing)}")
+        frame = frame.assign(
+            company_name=frame['company_name'].astype(str),
+            fund=frame['fund'].fillna(UNASSIGNED_FUND) if 'fund' in frame.columns else UNASSIGNED_FUND,
+            quarter=[quarter_label(quarter_ordinal(q)) for q in frame['quarter']],
+            assessed_at=frame['assessed_at'] if 'assessed_at' in frame.columns else utc_timestamp(),
+        ).astype({m: float for m in METRIC_COLUMNS})
+        with self._lock:
+            self._append_records(frame[RECORD_COLUMNS].to_dict('records'))
+        return len(frame)
+
+    def rebuild(self):
+        """Recomputes the roll-ups from the full log (e.g. after restoring a backup) and re-snapshots them."""
+        with self._lock:
+            self._rebuild()
+            self._save_snapshot()
+
+    def companies(self):
+        """Companies with at least one recorded assessment, sorted."""
+        with self._lock:
+            self._catch_up()
+            return sorted(self.companies_)
+
+    def funds(self):
+        """Funds with at least one recorded assessment, sorted."""
+        with self._lock:
+            self._catch_up()
+            return sorted(self.funds_)
+
+    def _quarter_labels(self, quarter_indices):
+        return [quarter_label(self._first + int(q)) for q in quarter_indices]
+
+    def company_trend(self, company):
+        """
+        One row per quarter `company` was assessed in, indexed by quarter label, with the
+        METRIC_COLUMNS values, their rolling means (`rolling_<metric>`) and quarter-over-quarter
+        deltas (`qoq_<metric>`, NaN when the previous quarter was not assessed).
+        Raises KeyError for a company without history.
+        """
+        with self._lock:
+            self._catch_up()
+            c = self._company_idx.get(company)
+            if c is None:
+                raise KeyError(f"No score history for '{company}'.")
+            values, rolling, qoq = (self._arrays[name][c] for name in ('values', 'rolling', 'qoq'))
+            assessed = np.flatnonzero(~np.isnan(values[:, 0]))
+            index = pd.Index(self._quarter_labels(assessed), name='quarter')
+        return pd.DataFrame(
+            np.hstack([values[assessed], rolling[assessed], qoq[assessed]]), index=index,
+            columns=METRIC_COLUMNS + [f"rolling_{m}" for m in METRIC_COLUMNS] + [f"qoq_{m}" for m in METRIC_COLUMNS]
+        )
+
+    def fund_trend(self, fund=None):
+        """
+        Per-quarter averages of METRIC_COLUMNS over the companies of `fund` (every fund when None),
+        with the number of companies assessed (`n_companies`) and the quarter-over-quarter change
+        of each average (`qoq_<metric>`). Raises KeyError for an unknown fund.
+        """
+        with self._lock:
+            self._catch_up()
+            if fund is None:
+                sums, counts = self._arrays['fund_sum'].sum(axis=0), self._arrays['fund_count'].sum(axis=0)
+            elif fund in self._fund_idx:
+                f = self._fund_idx[fund]
+                sums, counts = self._arrays['fund_sum'][f], self._arrays['fund_count'][f]
+            else:
+                raise KeyError(f"No score history for fund '{fund}'.")
+            means = np.full(sums.shape, np.nan)
+            np.divide(sums, counts[:, None], out=means, where=counts[:, None] > 0)
+            qoq = np.full(sums.shape, np.nan)
+            qoq[1:] = means[1:] - means[:-1]
+            assessed = np.flatnonzero(counts > 0)
+            index = pd.Index(self._quarter_labels(assessed), name='quarter')
+        trend = pd.DataFrame(
+            np.hstack([means[assessed], qoq[assessed]]), index=index,
+            columns=METRIC_COLUMNS + [f"qoq_{m}" for m in METRIC_COLUMNS]
+        )
+        trend.insert(len(METRIC_COLUMNS), 'n_companies', counts[assessed])
+        return trend
+
+    def latest(self, fund=None):
+        """
+        Each company's most recent assessed quarter (optionally only companies whose latest
+        assessment belongs to `fund`), with its METRIC_COLUMNS values and quarter-over-quarter
+        deltas, sorted by company.
+        """
+        with self._lock:
+            self._catch_up()
+            n = len(self.companies_)
+            values, qoq, fund_of = (self._arrays[name][:n] for name in ('values', 'qoq', 'fund_of'))
+            if not n:
+                return pd.DataFrame(columns=['company_name', 'fund', 'quarter'] + METRIC_COLUMNS + [f"qoq_{m}" for m in METRIC_COLUMNS])
+            # Index of the last assessed quarter per company
+            assessed = ~np.isnan(values[:, :, 0])
+            last = assessed.shape[1] - 1 - np.argmax(assessed[:, ::-1], axis=1)
+            rows = np.arange(n)
+            funds = np.array(self.funds_, dtype=object)[fund_of[rows, last]]
+            frame = pd.DataFrame({
+                'company_name': self.companies_, 'fund': funds, 'quarter': self._quarter_labels(last),
+                **{m: values[rows, last, i] for i, m in enumerate(METRIC_COLUMNS)},
+                **{f"qoq_{m}": qoq[rows, last, i] for i, m in enumerate(METRIC_COLUMNS)},
+            })
+        if fund is not None:
+            frame = frame[frame['fund'] == fund]
+        return frame.sort_values('company_name').reset_index(drop=True)
+
+    def records(self, company=None):
+        """The raw log (optionally for one company) in partition and append order. Scans every partition."""
+        with self._lock:
+            records = [record for path in self._partitions() for record in self._read_partition(path, 0)[0]]
+        frame = pd.DataFrame(records, columns=RECORD_COLUMNS)
+        if company is not None:
+            frame = frame[frame['company_name'] == company].reset_index(drop=True)
+        return frame
+
+
+@functools.lru_cache(maxsize=None)
+def open_score_history(directory=HISTORY_DIR):
+    """Returns the score history under `directory`, shared by every session in this process."""
+    return ScoreHistory(directory)
+
+
+def synthetic_history(n_companies=400, n_quarters=20, start="2021Q1", seed=0, funds=None):
+    """
+    Generates illustrative quarterly assessments of `n_companies` over `n_quarters`, for demos,
+    tests and benchmarks: each dimension follows a slow random walk. Not market data.
+    """
+    rng = np.random.default_rng(seed)
+    funds = funds or ["Alpha Capital Fund I", "Alpha Capital Fund II", "Alpha Capital Fund III"]
+    first = quarter_ordinal(start)
+    levels = rng.uniform(30, 80, size=(len(SCORE_COLUMNS), n_companies, 1))
+    steps = rng.normal(0.8, 4.0, size=(len(SCORE_COLUMNS), n_companies, n_quarters))
+    scores = np.clip(np.round(levels + np.cumsum(steps, axis=2)), 0, 100).reshape(len(SCORE_COLUMNS), -1)
+    exit_air = calculate_exit_air_scores(*scores, 0.35, 0.40, 0.25).score
+    baselines = np.repeat(rng.uniform(5, 12, n_companies), n_quarters)
+    return pd.DataFrame({
+        'company_name': np.repeat([f"Company {i:04d}" for i in range(n_companies)], n_quarters),
+        'fund': np.repeat(np.array(funds)[rng.integers(0, len(funds), n_companies)], n_quarters),
+        'quarter': np.tile([quarter_label(first + q) for q in range(n_quarters)], n_companies),
+        'exit_ai_r_score': exit_air,
+        **dict(zip(SCORE_COLUMNS, scores)),
+        'projected_ebitda_multiple': project_valuation_impact(exit_air, baselines, 2.0),
+    })
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Maintain the quarterly Exit-AI-R score history.")
+    parser.add_argument('--dir', type=Path, default=HISTORY_DIR, help="History directory (default: QULAB_HISTORY_DIR or ./history).")
+    commands = parser.add_subparsers(dest='command', required=True)
+    seed = commands.add_parser('seed', help="Append illustrative synthetic history for demos.")
+    seed.add_argument('--companies', type=int, default=400)
+    seed.add_argument('--quarters', type=int, default=20)
+    seed.add_argument('--start', default="2021Q1", help="First quarter, e.g. 2021Q1.")
+    commands.add_parser('rebuild', help="Recompute the roll-ups from the full log.")
+    args = parser.parse_args(argv)
+
+    history = ScoreHistory(args.dir)
+    if args.command == 'seed':
+        rows = history.append_many(synthetic_history(args.companies, args.quarters, args.start))
+        print(f"Appended {rows:,} assessments to {args.dir}", file=sys.stderr)
+    else:
+        history.rebuild()
+        print(f"Rebuilt roll-ups for {len(history.companies()):,} companies in {args.dir}", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
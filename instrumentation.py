@@ -0,0 +1,257 @@
+"""
+Optional rerun profiling for app.py.
+
+When enabled (QULAB_PROFILING=1), each script rerun is split into named sections with
+`profile_section()`, and every bounded/chart cache lookup records its duration and whether it
+was a hit. Finished reruns are aggregated process-wide and exported as:
+- JSON lines, one per rerun, in <QULAB_METRICS_DIR>/reruns.jsonl
+- a Prometheus text-format file, <QULAB_METRICS_DIR>/metrics.prom, with latency histograms
+  for reruns and sections and counters for cached calls (for p95 alerting via histogram_quantile).
+Sections wrapped in `st.fragment` can rerun on their own; decorate them with
+`profiled_fragment()` so those partial reruns are recorded too (scope = fragment name) and
+exported as a separate qulab_fragment_rerun_seconds histogram.
+When disabled, every hook is a cheap no-op.
+"""
+import functools
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+
+import numpy as np
+
+PROFILING_ENABLED = os.environ.get("QULAB_PROFILING", "0").lower() in ("1", "true", "yes")
+METRICS_DIR = Path(os.environ.get("QULAB_METRICS_DIR", "metrics"))
+
+# Histogram bucket upper bounds in seconds, shared by rerun and section latencies
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_local = threading.local()
+
+
+class RerunProfile:
+    """Collects section timings and cached-call records for one script rerun."""
+
+    def __init__(self, session_id=None, scope="app"):
+        self.session_id = session_id
+        self.scope = scope
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self._open = None # (section name, start time)
+        self.sections = []
+        self.calls = []
+
+    def mark(self, name):
+        """Closes the current section (if any) and starts `name`."""
+        now = time.perf_counter()
+        if self._open is not None:
+            self.sections.append({'section': self._open[0], 'seconds': now - self._open[1]})
+        self._open = (name, now)
+
+    def record_call(self, name, seconds, hit):
+        self.calls.append({'function': name, 'seconds': seconds, 'hit': hit})
+
+    def finish(self):
+        """Closes the last section and returns the rerun as a JSON-serializable record."""
+        now = time.perf_counter()
+        if self._open is not None:
+            self.sections.append({'section': self._open[0], 'seconds': now - self._open[1]})
+            self._open = None
+        return {
+            'timestamp': self.started_at,
+            'session_id': self.session_id,
+            'scope': self.scope,
+            'total_seconds': now - self._start,
+            'sections': self.sections,
+            'calls': self.calls,
+        }
+
+
+class _Histogram:
+    """Cumulative Prometheus-style histogram."""
+
+    def __init__(self):
+        self.bucket_counts = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        self.count += 1
+        self.sum += seconds
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                self.bucket_counts[i] += 1
+
+    def lines(self, metric, labels=""):
+        sep = "," if labels else ""
+        out = [f'{metric}_bucket{{{labels}{sep}le="{bound}"}} {n}' for bound, n in zip(LATENCY_BUCKETS, self.bucket_counts)]
+        out.append(f'{metric}_bucket{{{labels}{sep}le="+Inf"}} {self.count}')
+        out.append(f'{metric}_sum{{{labels}}} {self.sum:.6f}' if labels else f'{metric}_sum {self.sum:.6f}')
+        out.append(f'{metric}_count{{{labels}}} {self.count}' if labels else f'{metric}_count {self.count}')
+        return out
+
+
+class MetricsRegistry:
+    """Process-wide aggregates over finished reruns, shared by all sessions."""
+
+    def __init__(self, recent=500):
+        self._lock = threading.Lock()
+        self.reruns = _Histogram()
+        self.fragment_reruns = defaultdict(_Histogram)
+        self.sections = defaultdict(_Histogram)
+        self.call_counts = defaultdict(int)     # (function, 'hit'|'miss') -> count
+        self.call_seconds = defaultdict(float)  # (function, 'hit'|'miss') -> total seconds
+        self.recent_totals = deque(maxlen=recent)
+
+    def observe(self, record):
+        with self._lock:
+            if record.get('scope', "app") == "app":
+                self.reruns.observe(record['total_seconds'])
+                self.recent_totals.append(record['total_seconds'])
+            else:
+                self.fragment_reruns[record['scope']].observe(record['total_seconds'])
+            for section in record['sections']:
+                self.sections[section['section']].observe(section['seconds'])
+            for call in record['calls']:
+                key = (call['function'], 'hit' if call['hit'] else 'miss')
+                self.call_counts[key] += 1
+                self.call_seconds[key] += call['seconds']
+
+    def recent_percentiles(self, percentiles=(50, 95)):
+        """Full-rerun latency percentiles over the most recent reruns, in seconds."""
+        with self._lock:
+            totals = list(self.recent_totals)
+        if not totals:
+            return {}
+        return {p: float(np.percentile(totals, p)) for p in percentiles}
+
+    def to_prometheus(self):
+        """Renders all aggregates in the Prometheus text exposition format."""
+        with self._lock:
+            lines = [
+                "# HELP qulab_rerun_seconds Wall time of full app.py script reruns.",
+                "# TYPE qulab_rerun_seconds histogram",
+                *self.reruns.lines("qulab_rerun_seconds"),
+                "# HELP qulab_fragment_rerun_seconds Wall time of fragment-only reruns.",
+                "# TYPE qulab_fragment_rerun_seconds histogram",
+            ]
+            for name, histogram in sorted(self.fragment_reruns.items()):
+                lines += histogram.lines("qulab_fragment_rerun_seconds", f'fragment="{_escape(name)}"')
+            lines += [
+                "# HELP qulab_section_seconds Wall time of each app section within a rerun.",
+                "# TYPE qulab_section_seconds histogram",
+            ]
+            for name, histogram in sorted(self.sections.items()):
+                lines += histogram.lines("qulab_section_seconds", f'section="{_escape(name)}"')
+            lines += [
+                "# HELP qulab_cached_call_total Cached function calls by cache result.",
+                "# TYPE qulab_cached_call_total counter",
+            ]
+            for (function, result), count in sorted(self.call_counts.items()):
+                lines.append(f'qulab_cached_call_total{{function="{_escape(function)}",result="{result}"}} {count}')
+            lines += [
+                "# HELP qulab_cached_call_seconds_total Time spent in cached function calls by cache result.",
+                "# TYPE qulab_cached_call_seconds_total counter",
+            ]
+            for (function, result), seconds in sorted(self.call_seconds.items()):
+                lines.append(f'qulab_cached_call_seconds_total{{function="{_escape(function)}",result="{result}"}} {seconds:.6f}')
+        return "\n".join(lines) + "\n"
+
+
+def _escape(label_value):
+    """Escapes a Prometheus label value."""
+    return label_value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+METRICS = MetricsRegistry()
+_export_lock = threading.Lock()
+
+
+def profiling_enabled():
+    return PROFILING_ENABLED
+
+
+def start_rerun(session_id=None, scope="app"):
+    """Begins profiling the current script run on this thread (no-op when profiling is disabled)."""
+    if profiling_enabled():
+        _local.profile = RerunProfile(session_id, scope)
+
+
+def profile_section(name):
+    """Marks the start of section `name`; the previous section ends here."""
+    profile = getattr(_local, 'profile', None)
+    if profile is not None:
+        profile.mark(name)
+
+
+def record_call(name, seconds, hit):
+    """Records one cached function call for the rerun in progress on this thread, if any."""
+    profile = getattr(_local, 'profile', None)
+    if profile is not None:
+        profile.record_call(name, seconds, hit)
+
+
+def export_metrics(record, metrics_dir=None):
+    """Appends `record` to reruns.jsonl and rewrites metrics.prom atomically."""
+    metrics_dir = Path(metrics_dir or METRICS_DIR)
+    with _export_lock:
+        metrics_dir.mkdir(parents=True, exist_ok=True)
+        with open(metrics_dir / "reruns.jsonl", "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+        tmp_path = metrics_dir / "metrics.prom.tmp"
+        tmp_path.write_text(METRICS.to_prometheus(), encoding="utf-8")
+        os.replace(tmp_path, metrics_dir / "metrics.prom")
+
+
+def finish_rerun(metrics_dir=None):
+    """
+    Ends profiling of the current script run, aggregates and exports it.
+    Returns the rerun record, or None when no rerun is being profiled on this thread.
+    """
+    profile = getattr(_local, 'profile', None)
+    if profile is None:
+        return None
+    _local.profile = None
+    record = profile.finish()
+    METRICS.observe(record)
+    export_metrics(record, metrics_dir)
+    return record
+
+
+def _fragment_only_run():
+    """
+    Returns (is_fragment_only_run, session_id) from Streamlit's script run context.
+    Streamlit is imported lazily so the module stays usable from plain Python.
+    """
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+    except ImportError:
+        return False, None
+    ctx = get_script_run_ctx(suppress_warning=True)
+    if ctx is None:
+        return False, None
+    return bool(ctx.fragment_ids_this_run), ctx.session_id
+
+
+def profiled_fragment(name):
+    """
+    Decorator for functions passed to `st.fragment`. During a full rerun the fragment is timed as
+    part of the enclosing section; when Streamlit reruns only the fragment, that partial rerun is
+    profiled and exported on its own with scope `name`.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            fragment_only, session_id = _fragment_only_run() if profiling_enabled() else (False, None)
+            if not fragment_only:
+                return func(*args, **kwargs)
+            start_rerun(session_id, scope=name)
+            profile_section(name)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                finish_rerun()
+        return wrapper
+    return decorator
@@ -0,0 +1,111 @@
+"""
+Inverse mode for the valuation formulas: which scores reach a target exit multiple?
+
+Inverting Multiple = baseline + delta * Exit-AI-R / 100 gives the Exit-AI-R Score a target
+multiple requires; the feasible score region is the half-space w . scores >= that score
+inside the 0-100 cube. Everything is closed-form and broadcast with NumPy, so any mix of
+targets, companies, weights, deltas and baselines is solved in one call.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from scoring import calculate_exit_air_scores
+
+DIMENSIONS = ['visible', 'documented', 'sustainable']
+MAX_SCORE = 100.0
+
+# Result of solve_required_scores. Arrays have the broadcast shape of the inputs, except the
+# per-dimension fields, which add a trailing axis of length 3 in DIMENSIONS order.
+# - required_score: Exit-AI-R Score needed for the target (0 if the baseline already gets there,
+#   inf if no score can, e.g. delta = 0 and the baseline is below target)
+# - feasible: whether any scores within 0-100 reach the target with these weights
+# - already_met: whether the current scores reach it
+# - required_dimension: the score each single dimension would need with the others held fixed
+#   (inf where that dimension has zero weight)
+# - dimension_increase: points each dimension would have to gain (0 where already met)
+# - dimension_feasible: whether that single-dimension change stays within 0-100
+# - best_dimension: index into DIMENSIONS of the cheapest feasible single-dimension change,
+#   -1 if the target is already met or no single dimension can reach it
+# - best_increase: points needed in best_dimension (0 if already met, nan if none suffices)
+InverseResult = namedtuple('InverseResult', [
+    'required_score', 'current_score', 'feasible', 'already_met', 'required_dimension',
+    'dimension_increase', 'dimension_feasible', 'best_dimension', 'best_increase',
+])
+
+
+def required_exit_air_score(target_multiple, baseline, premium_coeff):
+    """
+    Inverts project_valuation_impact: the Exit-AI-R Score at which the projected multiple
+    equals `target_multiple`. Returns 0 where the baseline already reaches the target and
+    inf where the premium coefficient is not positive and it does not.
+    """
+    target, baseline, coeff = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (target_multiple, baseline, premium_coeff))
+    )
+    gap = target - baseline
+    required = np.full(gap.shape, np.inf)
+    np.divide(100.0 * gap, coeff, out=required, where=coeff > 0)
+    return np.where(gap <= 0, 0.0, required)
+
+
+def solve_required_scores(target_multiple, visible, documented, sustainable, w_v, w_d, w_s, baseline, premium_coeff):
+    """
+    Solves the inverse problem for every broadcast combination of the inputs.
+    Weights are normalized exactly as in calculate_exit_air_scores. See InverseResult for the fields.
+    """
+    required = required_exit_air_score(target_multiple, baseline, premium_coeff)
+    current = calculate_exit_air_scores(visible, documented, sustainable, w_v, w_d, w_s)
+    shape = np.broadcast_shapes(required.shape, current.score.shape)
+    required = np.broadcast_to(required, shape)
+
+    scores = np.stack(np.broadcast_arrays(
+        *(np.broadcast_to(np.asarray(x, dtype=float), shape) for x in (visible, documented, sustainable))
+    ), axis=-1)
+    weights = np.stack([np.broadcast_to(w, shape) for w in (current.w_v, current.w_d, current.w_s)], axis=-1)
+    current_score = np.broadcast_to(current.score, shape)
+
+    # With normalized weights the best attainable score is 100 (0 when all weights are zero)
+    max_score = weights.sum(axis=-1) * MAX_SCORE
+    feasible = required <= max_score + 1e-9
+    shortfall = np.maximum(required - current_score, 0.0)
+    already_met = shortfall == 0
+
+    # Raising one dimension by x lifts the score by w_k * x
+    with np.errstate(divide='ignore', invalid='ignore'):
+        increase = np.where(weights > 0, shortfall[..., None] / weights, np.inf)
+    increase = np.where(already_met[..., None], 0.0, increase)
+    required_dimension = scores + increase
+    dimension_feasible = required_dimension <= MAX_SCORE + 1e-9
+
+    candidate = np.where(dimension_feasible, increase, np.inf)
+    best_dimension = np.argmin(candidate, axis=-1)
+    best_increase = np.take_along_axis(candidate, best_dimension[..., None], axis=-1)[..., 0]
+    no_single_fix = ~np.isfinite(best_increase)
+    best_dimension = np.where(already_met | no_single_fix, -1, best_dimension)
+    best_increase = np.where(already_met, 0.0, np.where(no_single_fix, np.nan, best_increase))
+
+    return InverseResult(
+        required, current_score, feasible, already_met, required_dimension,
+        increase, dimension_feasible, best_dimension, best_increase,
+    )
+
+
+def iso_multiple_line(required_score, w_x, w_y, fixed_contribution=0.0, n_points=201):
+    """
+    Points (x, y) inside the 0-100 square where w_x * x + w_y * y + fixed_contribution equals
+    `required_score`: the iso-multiple line in the plane of two dimensions, with the third
+    dimension's weighted score held fixed. Returns two (possibly empty) arrays.
+    """
+    target = required_score - fixed_contribution
+    if w_y > 0:
+        x = np.linspace(0.0, MAX_SCORE, n_points)
+        y = (target - w_x * x) / w_y
+    elif w_x > 0:
+        # The line is vertical when the y dimension carries no weight
+        y = np.linspace(0.0, MAX_SCORE, n_points)
+        x = np.full_like(y, target / w_x)
+    else:
+        return np.array([]), np.array([])
+    inside = (x >= 0) & (x <= MAX_SCORE) & (y >= 0) & (y <= MAX_SCORE)
+    return x[inside], y[inside]
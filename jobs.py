@@ -0,0 +1,167 @@
+"""
+Process-wide background job queue for long-running analyses.
+
+Heavy work (bulk reports, large batch runs) is submitted as a job instead of running on the
+session's script thread. Jobs run on a shared thread pool sized per pod (QULAB_JOB_WORKERS), and
+each owner may only have QULAB_JOB_LIMIT_PER_OWNER jobs queued or running at once so one analyst
+cannot starve the rest. The job table lives in the process, not in a session, so jobs keep running
+and stay retrievable after the user navigates away; finished jobs are kept for a retention period.
+
+Job functions receive their Job as the first argument and call `job.report(progress, message)`
+as they go; cancellation is cooperative and takes effect at the next report.
+"""
+import functools
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+JOB_WORKERS = int(os.environ.get("QULAB_JOB_WORKERS", 4))
+JOB_LIMIT_PER_OWNER = int(os.environ.get("QULAB_JOB_LIMIT_PER_OWNER", 2))
+JOB_RETENTION_SECONDS = 3600
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = 'queued', 'running', 'done', 'failed', 'cancelled'
+ACTIVE_STATES = (QUEUED, RUNNING)
+
+
+class JobCancelled(Exception):
+    """Raised inside a job function by Job.report once cancellation has been requested."""
+
+
+class JobLimitError(RuntimeError):
+    """Raised by JobQueue.submit when the owner already has the maximum number of active jobs."""
+
+
+class Job:
+    """
+    One submitted job. The worker thread updates the status fields; sessions only read them.
+    `cleanup(job)`, if given, is called when a finished job is pruned from the table.
+    """
+
+    def __init__(self, job_id, owner, name, cleanup=None):
+        self.id = job_id
+        self.owner = owner
+        self.name = name
+        self.status = QUEUED
+        self.progress = 0.0
+        self.message = "Queued"
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.cleanup = cleanup
+        self._cancel = threading.Event()
+        self._future = None
+
+    @property
+    def active(self):
+        return self.status in ACTIVE_STATES
+
+    @property
+    def cancel_requested(self):
+        return self._cancel.is_set()
+
+    @property
+    def elapsed(self):
+        """Seconds spent running so far (or in total once finished)."""
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+    def report(self, progress, message=None):
+        """Records progress (0-1) from the job function; raises JobCancelled if the job was cancelled."""
+        if self._cancel.is_set():
+            raise JobCancelled()
+        self.progress = min(max(float(progress), 0.0), 1.0)
+        if message is not None:
+            self.message = message
+
+
+class JobQueue:
+    """Runs submitted jobs on a bounded thread pool and keeps a table of their state."""
+
+    def __init__(self, max_workers=JOB_WORKERS, max_per_owner=JOB_LIMIT_PER_OWNER, retention_seconds=JOB_RETENTION_SECONDS):
+        self.max_workers = max_workers
+        self.max_per_owner = max_per_owner
+        self.retention_seconds = retention_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="qulab-job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, owner, name, func, *args, cleanup=None, **kwargs):
+        """
+        Queues `func(job, *args, **kwargs)`; its return value becomes `job.result`.
+        Raises JobLimitError if `owner` already has `max_per_owner` queued or running jobs.
+        """
+        with self._lock:
+            self._prune()
+            n_active = sum(job.active for job in self._jobs.values() if job.owner == owner)
+            if n_active >= self.max_per_owner:
+                raise JobLimitError(
+                    f"You already have {n_active} jobs queued or running (limit {self.max_per_owner}). "
+                    "Wait for one to finish or cancel it."
+                )
+            job = Job(uuid.uuid4().hex, owner, name, cleanup)
+            self._jobs[job.id] = job
+        job._future = self._executor.submit(self._run, job, func, args, kwargs)
+        return job
+
+    def _run(self, job, func, args, kwargs):
+        if job.cancel_requested:
+            job.status, job.message, job.finished_at = CANCELLED, "Cancelled", time.time()
+            return
+        job.status, job.message, job.started_at = RUNNING, "Running", time.time()
+        try:
+            result = func(job, *args, **kwargs)
+        except JobCancelled:
+            job.status, job.message = CANCELLED, "Cancelled"
+        except Exception as e:
+            job.status, job.message, job.error = FAILED, "Failed", f"{type(e).__name__}: {e}"
+        else:
+            job.result, job.progress, job.status, job.message = result, 1.0, DONE, "Done"
+        finally:
+            job.finished_at = time.time()
+
+    def cancel(self, job_id):
+        """Requests cancellation. Queued jobs never start; running jobs stop at their next report."""
+        job = self._jobs.get(job_id)
+        if job is None or not job.active:
+            return False
+        job._cancel.set()
+        if job._future is not None and job._future.cancel():
+            job.status, job.message, job.finished_at = CANCELLED, "Cancelled", time.time()
+        return True
+
+    def get(self, job_id):
+        """Returns the job with `job_id`, or None if it is unknown or was pruned."""
+        return self._jobs.get(job_id)
+
+    def jobs(self, owner=None):
+        """Jobs of `owner` (or all jobs), newest first."""
+        with self._lock:
+            self._prune()
+            jobs = [job for job in self._jobs.values() if owner is None or job.owner == owner]
+        return sorted(jobs, key=lambda job: job.submitted_at, reverse=True)
+
+    def _prune(self):
+        """Drops finished jobs older than the retention period. Callers hold the lock."""
+        cutoff = time.time() - self.retention_seconds
+        for job_id, job in list(self._jobs.items()):
+            if not job.active and job.finished_at is not None and job.finished_at < cutoff:
+                del self._jobs[job_id]
+                if job.cleanup is not None:
+                    job.cleanup(job)
+
+    def shutdown(self, wait=True):
+        """Cancels every active job and stops the worker threads."""
+        for job in list(self._jobs.values()):
+            self.cancel(job.id)
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+
+@functools.lru_cache(maxsize=1)
+def get_job_queue():
+    """Returns the job queue shared by every session in this process."""
+    return JobQueue()
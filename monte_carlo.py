@@ -0,0 +1,281 @@
+import multiprocessing
+import numpy as np
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from scoring import calculate_exit_air_scores, project_valuation_impact
+
+# Uncertain inputs of the valuation chain, in the order they are sampled.
+MC_INPUTS = ['visible', 'documented', 'sustainable', 'delta', 'baseline']
+
+# A distribution for one uncertain input. `kind` is one of 'fixed', 'triangular', 'normal' or 'uniform';
+# `params` holds the keyword arguments of the matching constructor below.
+Distribution = namedtuple('Distribution', ['kind', 'params'])
+
+# Streaming summary of a simulation. `hist_counts` / `bin_edges` describe the projected-multiple
+# distribution on a fixed grid, so the result has the same size for 1k or 100M draws.
+MonteCarloResult = namedtuple(
+    'MonteCarloResult',
+    ['n_draws', 'mean', 'std', 'min', 'max', 'percentiles', 'hist_counts', 'bin_edges']
+)
+
+DEFAULT_CHUNK_SIZE = 250_000
+DEFAULT_N_BINS = 10_000
+DEFAULT_PERCENTILES = (10, 50, 90)
+
+# Simulations may run on a background-job thread of the Streamlit server. Forking a multithreaded
+# process can copy locks held by other threads into the workers, so they are spawned instead.
+POOL_CONTEXT = multiprocessing.get_context("spawn")
+
+
+def fixed(value):
+    """A degenerate distribution that always returns `value`."""
+    return Distribution('fixed', {'value': float(value)})
+
+
+def triangular(low, mode, high):
+    """A triangular distribution on [low, high] peaking at `mode`."""
+    if not low <= mode <= high:
+        raise ValueError(f"Triangular distribution requires low <= mode <= high, got {low}, {mode}, {high}.")
+    return Distribution('triangular', {'low': float(low), 'mode': float(mode), 'high': float(high)})
+
+
+def uniform(low, high):
+    """A uniform distribution on [low, high]."""
+    if low > high:
+        raise ValueError(f"Uniform distribution requires low <= high, got {low}, {high}.")
+    return Distribution('uniform', {'low': float(low), 'high': float(high)})
+
+
+def normal(mean, std, low=None, high=None):
+    """
+    A normal distribution, optionally clipped to [low, high]
+    (e.g. 0-100 for dimension scores or >= 0 for multiples).
+    """
+    if std < 0:
+        raise ValueError(f"Normal distribution requires std >= 0, got {std}.")
+    return Distribution('normal', {'mean': float(mean), 'std': float(std), 'low': low, 'high': high})
+
+
+def as_distribution(value):
+    """Wraps plain numbers as fixed distributions so callers can mix point and range inputs."""
+    return value if isinstance(value, Distribution) else fixed(value)
+
+
+def distribution_from_range(kind, value, low, high, clip_low=None, clip_high=None):
+    """
+    Builds a distribution from a point estimate and an analyst-provided range.
+    Triangular peaks at the point estimate, Normal treats the range as +/- 2 standard deviations
+    around it, and Uniform ignores the point estimate.
+    """
+    kind = kind.lower()
+    if kind == 'fixed':
+        return fixed(value)
+    if kind == 'triangular':
+        return triangular(low, min(max(value, low), high), high)
+    if kind == 'uniform':
+        return uniform(low, high)
+    if kind == 'normal':
+        return normal(value, (high - low) / 4, low=clip_low, high=clip_high)
+    raise ValueError(f"Unknown distribution kind: {kind}")
+
+
+def sample_distribution(dist, rng, size):
+    """Draws `size` samples from a Distribution using the NumPy Generator `rng`."""
+    p = dist.params
+    if dist.kind == 'fixed':
+        return np.full(size, p['value'])
+    if dist.kind == 'triangular':
+        if p['low'] == p['high']:
+            return np.full(size, p['low'])
+        return rng.triangular(p['low'], p['mode'], p['high'], size)
+    if dist.kind == 'uniform':
+        return rng.uniform(p['low'], p['high'], size)
+    if dist.kind == 'normal':
+        draws = rng.normal(p['mean'], p['std'], size)
+        if p['low'] is not None or p['high'] is not None:
+            np.clip(draws, p['low'], p['high'], out=draws)
+        return draws
+    raise ValueError(f"Unknown distribution kind: {dist.kind}")
+
+
+def _normal_ppf(u):
+    """
+    Standard normal quantile function (Acklam's rational approximation, relative error < 1.2e-9),
+    vectorized so the app does not need SciPy.
+    """
+    a = [-3.969683028665376e+01, 2.209460984245205e+02, -2.759285104469687e+02, 1.383577518672690e+02, -3.066479806614716e+01, 2.506628277459239e+00]
+    b = [-5.447609879822406e+01, 1.615858368580409e+02, -1.556989798598866e+02, 6.680131188771972e+01, -1.328068155288572e+01]
+    c = [-7.784894002430293e-03, -3.223964580411365e-01, -2.400758277161838e+00, -2.549732539343734e+00, 4.374664141464968e+00, 2.938163982698783e+00]
+    d = [7.784695709041462e-03, 3.224671290700398e-01, 2.445134137142996e+00, 3.754408661907416e+00]
+    u = np.clip(np.asarray(u, dtype=float), 1e-300, 1 - 1e-16)
+    z = np.empty_like(u)
+
+    tail = np.minimum(u, 1 - u)
+    in_tail = tail < 0.02425
+    q = np.sqrt(-2 * np.log(tail[in_tail]))
+    tail_z = (((((c[0] * q + c[1]) * q + c[2]) * q + c[3]) * q + c[4]) * q + c[5]) / ((((d[0] * q + d[1]) * q + d[2]) * q + d[3]) * q + 1)
+    z[in_tail] = np.where(u[in_tail] < 0.5, tail_z, -tail_z)
+
+    q = u[~in_tail] - 0.5
+    r = q * q
+    z[~in_tail] = (((((a[0] * r + a[1]) * r + a[2]) * r + a[3]) * r + a[4]) * r + a[5]) * q / (((((b[0] * r + b[1]) * r + b[2]) * r + b[3]) * r + b[4]) * r + 1)
+    return z
+
+
+def distribution_ppf(dist, u):
+    """
+    Maps uniform values `u` in [0, 1) to quantiles of a Distribution (its inverse CDF), so
+    quasi-random unit samples can be turned into input draws without losing their stratification.
+    """
+    p = dist.params
+    u = np.asarray(u, dtype=float)
+    if dist.kind == 'fixed':
+        return np.full(u.shape, p['value'])
+    if dist.kind == 'uniform':
+        return p['low'] + u * (p['high'] - p['low'])
+    if dist.kind == 'triangular':
+        low, mode, high = p['low'], p['mode'], p['high']
+        if low == high:
+            return np.full(u.shape, low)
+        split = (mode - low) / (high - low)
+        return np.where(
+            u < split,
+            low + np.sqrt(u * (high - low) * (mode - low)),
+            high - np.sqrt((1 - u) * (high - low) * (high - mode)),
+        )
+    if dist.kind == 'normal':
+        draws = p['mean'] + p['std'] * _normal_ppf(u)
+        if p['low'] is not None or p['high'] is not None:
+            np.clip(draws, p['low'], p['high'], out=draws)
+        return draws
+    raise ValueError(f"Unknown distribution kind: {dist.kind}")
+
+
+def distribution_support(dist, n_sigma=8.0):
+    """
+    Returns a (low, high) interval containing (practically) all samples of `dist`.
+    Unclipped normal tails are truncated at `n_sigma` standard deviations.
+    """
+    p = dist.params
+    if dist.kind == 'fixed':
+        return p['value'], p['value']
+    if dist.kind in ('triangular', 'uniform'):
+        return p['low'], p['high']
+    low = p['mean'] - n_sigma * p['std'] if p['low'] is None else p['low']
+    high = p['mean'] + n_sigma * p['std'] if p['high'] is None else p['high']
+    return low, high
+
+
+def projected_multiple_range(dists, weights):
+    """
+    Bounds the projected multiple by interval arithmetic over the input supports,
+    which fixes the histogram grid before any sampling happens.
+    """
+    score_bounds = calculate_exit_air_scores(
+        [distribution_support(dists['visible'])[i] for i in (0, 1)],
+        [distribution_support(dists['documented'])[i] for i in (0, 1)],
+        [distribution_support(dists['sustainable'])[i] for i in (0, 1)],
+        *weights
+    ).score
+    delta_bounds = np.array(distribution_support(dists['delta']))
+    baseline_bounds = np.array(distribution_support(dists['baseline']))
+
+    corners = project_valuation_impact(score_bounds[:, None, None], baseline_bounds[None, None, :], delta_bounds[None, :, None])
+    low, high = float(corners.min()), float(corners.max())
+    if np.isclose(low, high):
+        low, high = low - 0.5, high + 0.5
+    return low, high
+
+
+def _simulate_chunk(args):
+    """
+    Simulates one chunk of draws and reduces it to sufficient statistics.
+    Module-level so it can run in a worker process.
+    """
+    seed_seq, size, dists, weights, bin_edges = args
+    rng = np.random.default_rng(seed_seq)
+    draws = {name: sample_distribution(dists[name], rng, size) for name in MC_INPUTS}
+
+    scores = calculate_exit_air_scores(draws['visible'], draws['documented'], draws['sustainable'], *weights).score
+    projected = project_valuation_impact(scores, draws['baseline'], draws['delta'])
+
+    # Out-of-grid values (only possible from truncated normal tails) are counted in the edge bins
+    counts, _ = np.histogram(np.clip(projected, bin_edges[0], bin_edges[-1]), bins=bin_edges)
+    mean = projected.mean()
+    return size, mean, ((projected - mean) ** 2).sum(), projected.min(), projected.max(), counts
+
+
+def _histogram_percentiles(counts, bin_edges, percentiles):
+    """Linearly interpolates percentiles within the bins of a histogram."""
+    cdf = np.concatenate([[0], np.cumsum(counts)]) / counts.sum()
+    return {p: float(np.interp(p / 100, cdf, bin_edges)) for p in percentiles}
+
+
+def simulate_valuation(inputs, weights, n_draws=1_000_000, seed=42, chunk_size=DEFAULT_CHUNK_SIZE,
+                       n_workers=1, n_bins=DEFAULT_N_BINS, percentiles=DEFAULT_PERCENTILES, progress=None):
+    """
+    Runs a seeded Monte Carlo simulation of the Exit-AI-R -> projected multiple chain.
+    `inputs` maps each name in MC_INPUTS to a Distribution or a plain number; `weights` is the
+    (w_v, w_d, w_s) triplet applied to every draw. Draws are generated and reduced chunk by chunk,
+    so memory is bounded by `chunk_size` regardless of `n_draws`. Each chunk has its own child seed,
+    so results are identical for any `n_workers`; n_workers > 1 spreads chunks over a process pool.
+    `progress(done, total)` is called with the number of draws simulated after each chunk.
+    """
+    missing = [name for name in MC_INPUTS if name not in inputs]
+    if missing:
+        raise ValueError(f"Missing Monte Carlo inputs: {', '.join(missing)}")
+    if n_draws < 1:
+        raise ValueError("n_draws must be at least 1.")
+
+    dists = {name: as_distribution(inputs[name]) for name in MC_INPUTS}
+    weights = tuple(float(w) for w in weights)
+    bin_edges = np.linspace(*projected_multiple_range(dists, weights), n_bins + 1)
+
+    chunk_sizes = [chunk_size] * (n_draws // chunk_size)
+    if n_draws % chunk_size:
+        chunk_sizes.append(n_draws % chunk_size)
+    child_seeds = np.random.SeedSequence(seed).spawn(len(chunk_sizes))
+    tasks = ((child_seeds[i], size, dists, weights, bin_edges) for i, size in enumerate(chunk_sizes))
+
+    # Streaming aggregation: merge per-chunk count/mean/M2 (Chan et al.), extrema and histogram counts
+    total, mean, m2 = 0, 0.0, 0.0
+    low, high = np.inf, -np.inf
+    counts = np.zeros(n_bins, dtype=np.int64)
+
+    def merge(chunk):
+        nonlocal total, mean, m2, low, high, counts
+        n_b, mean_b, m2_b, low_b, high_b, counts_b = chunk
+        delta = mean_b - mean
+        new_total = total + n_b
+        mean += delta * n_b / new_total
+        m2 += m2_b + delta ** 2 * total * n_b / new_total
+        total = new_total
+        low, high = min(low, low_b), max(high, high_b)
+        counts += counts_b
+        if progress is not None:
+            progress(total, n_draws)
+
+    if n_workers > 1 and len(chunk_sizes) > 1:
+        with ProcessPoolExecutor(max_workers=n_workers, mp_context=POOL_CONTEXT) as executor:
+            try:
+                for chunk in executor.map(_simulate_chunk, tasks):
+                    merge(chunk)
+            except BaseException:
+                # e.g. a background job cancelled from the progress callback: drop chunks not yet started
+                executor.shutdown(cancel_futures=True)
+                raise
+    else:
+        for task in tasks:
+            merge(_simulate_chunk(task))
+
+    return MonteCarloResult(
+        n_draws=total,
+        mean=mean,
+        std=float(np.sqrt(m2 / total)),
+        min=float(low),
+        max=float(high),
+        percentiles=_histogram_percentiles(counts, bin_edges, percentiles),
+        hist_counts=counts,
+        bin_edges=bin_edges,
+    )
@@ -0,0 +1,66 @@
+import pandas as pd
+
+from peer_index import ordinal
+
+
+def build_ai_exit_narrative(company, air_score, visible, documented, sustainable, base_mult, proj_mult, delta, persona_name, firm_name,
+                            peer_context=None, report_date=None):
+    """
+    Builds the Markdown AI exit narrative report for one company.
+    Shared by the Streamlit app and the batch CLI so both produce identical reports.
+    `peer_context`, as returned by PeerIndex.peer_context, adds a peer benchmarking block.
+    `report_date` (a date or ISO string) is printed in the header and defaults to today.
+    """
+    peer_block = ""
+    if peer_context:
+        ranks = peer_context['percentiles']
+        peer_block = f"""
+**Peer Benchmarking ({peer_context['group']}, {peer_context['n_peers']:,} peer assessments):**
+*   **Exit-AI-R Score**: {ordinal(ranks['exit_ai_r_score'])} percentile
+*   **Visible / Documented / Sustainable**: {ordinal(ranks['visible_score'])} / {ordinal(ranks['documented_score'])} / {ordinal(ranks['sustainable_score'])} percentile
+"""
+    # Use double backslashes for literal backslashes in f-strings when they are part of LaTeX commands
+    # (e.g., `\\delta` to produce `\delta` in Markdown).
+    narrative = f"""
+---
+**{company}: Quantified AI Exit Narrative Report**
+Date: {pd.Timestamp(report_date or 'today').strftime('%Y-%m-%d')}
+Prepared by: {persona_name}, {firm_name}
+---
+
+**Executive Summary:**
+{company} demonstrates a strong AI readiness for exit, with an overall **Exit-AI-R Score of {air_score:.2f}**.
+This robust capability is projected to contribute to a significant valuation uplift, transforming the
+baseline sector EBITDA multiple of {base_mult:.2f}x to an estimated **{proj_mult:.2f}x**.
+This uplift, driven by an AI Premium Coefficient ($\\delta$) of {delta:.2f}, underscores the market's
+recognition of {company}'s advanced AI integration and value creation potential.
+
+**1. AI Exit-Readiness Assessment Details:**
+*   **Overall Exit-AI-R Score**: {air_score:.2f} (out of 100)
+*   **Visible AI Capabilities Score**: {visible:.0f}/100
+*   **Documented AI Impact Score**: {documented:.0f}/100
+*   **Sustainable AI Capabilities Score**: {sustainable:.0f}/100
+{peer_block}
+**2. Projected Valuation Impact:**
+*   **Baseline Sector EBITDA Multiple**: {base_mult:.2f}x
+*   **AI Premium Coefficient ($\\delta$)**: {delta:.2f} turns
+*   **Projected EBITDA Multiple (with AI Premium)**: {proj_mult:.2f}x
+*   **Implied Multiple Uplift**: {(proj_mult - base_mult):.2f}x
+
+**3. Strategic Narrative Points:**
+*   **Strong Capability Foundation**: {company} has achieved an impressive Exit-AI-R score of {air_score:.2f},
+    reflecting a deliberate and strategic build-out of AI capabilities that are poised for market recognition and premium valuation.
+*   **Proven Value Creation**: With a **Documented AI Impact Score of {documented:.0f}**, {company}
+    provides auditable evidence of financial return on AI investments, proving that our AI is a profit-center,
+    not just a cost-center. This directly translates into higher, quantifiable value for acquirers.
+*   **Market Differentiation & Visibility**: A high **Visible AI Capabilities Score of {visible:.0f}**
+    ensures that potential buyers can clearly perceive and understand how {company}'s AI differentiates
+    its products and services, creating a defensible competitive moat and immediate market appeal.
+*   **Long-term & Scalable Impact**: The **Sustainable AI Capabilities Score of {sustainable:.0f}**
+    assures buyers of deep integration, robust governance, a strong talent base, and scalable processes.
+    This signifies low integration risk and guarantees enduring AI-driven value post-acquisition,
+    making {company} a highly attractive long-term investment.
+
+---
+"""
+    return narrative
@@ -0,0 +1,185 @@
+"""
+Peer percentile index for Exit-AI-R and dimension scores.
+
+Reference assessments are split into one group per (sector, deal size) pair and each group keeps
+one sorted array per score. A percentile rank is then two binary searches per group instead of a
+scan over the peer table; sector-wide or all-peer ranks add up the counts of the matching groups,
+so each score is stored only once. With 1M peers a lookup takes well under a millisecond.
+"""
+import functools
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from scoring import SCORE_COLUMNS, calculate_exit_air_scores
+
+PEER_METRICS = ['exit_ai_r_score'] + SCORE_COLUMNS
+DEAL_SIZES = ['Small', 'Mid', 'Large']
+DEFAULT_PEER_DATA = Path(__file__).resolve().parent / "data" / "peer_assessments.csv"
+PEER_DATA_PATH = Path(os.environ.get("QULAB_PEER_DATA", DEFAULT_PEER_DATA))
+
+# Weights used to score peers that come without an exit_ai_r_score column (the app defaults)
+DEFAULT_PEER_WEIGHTS = (0.35, 0.40, 0.25)
+
+
+class PeerIndex:
+    """
+    Sorted per-(sector, deal size) score arrays supporting vectorized percentile-rank lookups.
+    `groups` maps (sector, deal_size) -> {metric: sorted float array}. `dimensions` optionally maps
+    the same keys to the unsorted (visible, documented, sustainable) arrays, so peers can be
+    rescored with other weights; `score_weights` are the weights the stored Exit-AI-R scores were
+    computed with, or None if they came with the data.
+    """
+
+    def __init__(self, groups, dimensions=None, score_weights=None):
+        self.groups = groups
+        self.dimensions = dimensions or {}
+        self.score_weights = score_weights
+        self.sectors = sorted({sector for sector, _ in groups})
+        self.deal_sizes = [s for s in DEAL_SIZES if any(size == s for _, size in groups)] + sorted(
+            {size for _, size in groups} - set(DEAL_SIZES)
+        )
+
+    @classmethod
+    def from_frame(cls, peers, sector_col='sector', size_col='deal_size'):
+        """
+        Builds the index from a DataFrame with sector and deal size columns and the SCORE_COLUMNS.
+        Peers without an `exit_ai_r_score` are scored with DEFAULT_PEER_WEIGHTS.
+        """
+        missing = [c for c in [sector_col, size_col] + SCORE_COLUMNS if c not in peers.columns]
+        if missing:
+            raise ValueError(f"Peer data is missing required columns: {', '.join(missing)}")
+        score_weights = None
+        if 'exit_ai_r_score' not in peers.columns:
+            score_weights = DEFAULT_PEER_WEIGHTS
+            peers = peers.assign(exit_ai_r_score=calculate_exit_air_scores(
+                *(peers[c].to_numpy(dtype=float) for c in SCORE_COLUMNS), *score_weights
+            ).score)
+
+        groups, dimensions = {}, {}
+        for (sector, size), group in peers.groupby([sector_col, size_col], sort=False):
+            key = (str(sector), str(size))
+            groups[key] = {m: np.sort(group[m].to_numpy(dtype=float)) for m in PEER_METRICS}
+            dimensions[key] = tuple(group[c].to_numpy(dtype=float) for c in SCORE_COLUMNS)
+        return cls(groups, dimensions, score_weights)
+
+    def _matching_keys(self, sector=None, deal_size=None):
+        return [
+            (g_sector, g_size) for g_sector, g_size in self.groups
+            if (sector is None or g_sector == sector) and (deal_size is None or g_size == deal_size)
+        ]
+
+    def _matching(self, sector=None, deal_size=None):
+        return [self.groups[key] for key in self._matching_keys(sector, deal_size)]
+
+    def count(self, sector=None, deal_size=None):
+        """Number of peers in the selected sector and/or deal size (None = any)."""
+        return sum(len(arrays[PEER_METRICS[0]]) for arrays in self._matching(sector, deal_size))
+
+    def percentile_ranks(self, metric, values, sector=None, deal_size=None):
+        """
+        Percentile ranks (0-100) of `values` for `metric` among the selected peers: the share of
+        peers scoring below, counting ties as half. Returns NaN when no peers match.
+        """
+        values = np.asarray(values, dtype=float)
+        below = np.zeros(values.shape)
+        at_or_below = np.zeros(values.shape)
+        n = 0
+        for arrays in self._matching(sector, deal_size):
+            sorted_scores = arrays[metric]
+            below += np.searchsorted(sorted_scores, values, side='left')
+            at_or_below += np.searchsorted(sorted_scores, values, side='right')
+            n += len(sorted_scores)
+        if n == 0:
+            return np.full(values.shape, np.nan)
+        return 100.0 * (below + at_or_below) / (2 * n)
+
+    def weighted_percentile_rank(self, score, weights, sector=None, deal_size=None):
+        """
+        Percentile rank of an Exit-AI-R `score` computed with `weights` (w_v, w_d, w_s), against the
+        selected peers rescored with the same weights. The stored sorted scores are used when they
+        were computed with exactly these weights; otherwise each matching group is rescored and counted
+        in one vectorized pass, O(n) instead of a sort.
+        """
+        if self.score_weights is not None and tuple(map(float, weights)) == self.score_weights:
+            return float(self.percentile_ranks('exit_ai_r_score', score, sector, deal_size))
+        below = at_or_below = n = 0
+        for key in self._matching_keys(sector, deal_size):
+            peer_scores = calculate_exit_air_scores(*self.dimensions[key], *weights).score
+            below += np.count_nonzero(peer_scores < score)
+            at_or_below += np.count_nonzero(peer_scores <= score)
+            n += len(peer_scores)
+        return 100.0 * (below + at_or_below) / (2 * n) if n else float('nan')
+
+    def peer_context(self, scores, sector=None, deal_size=None, min_peers=30, weights=None):
+        """
+        Percentile ranks for a dict of PEER_METRICS scores against the narrowest peer group with at
+        least `min_peers` members: sector and deal size, then sector only, then all peers.
+        With `weights` (w_v, w_d, w_s), the Exit-AI-R score is ranked against peers rescored with
+        the same weights, so custom weightings compare like with like.
+        Returns {'group', 'n_peers', 'percentiles': {metric: rank}}, or None if there are no peers.
+        """
+        for group_sector, group_size in ((sector, deal_size), (sector, None), (None, None)):
+            n_peers = self.count(group_sector, group_size)
+            if n_peers >= min_peers or (group_sector is None and group_size is None and n_peers):
+                label = " / ".join(p for p in (group_sector, group_size and f"{group_size} deals") if p) or "All sectors"
+                percentiles = {}
+                for m in PEER_METRICS:
+                    if m not in scores:
+                        continue
+                    if m == 'exit_ai_r_score' and weights is not None:
+                        percentiles[m] = self.weighted_percentile_rank(scores[m], weights, group_sector, group_size)
+                    else:
+                        percentiles[m] = float(self.percentile_ranks(m, scores[m], group_sector, group_size))
+                return {'group': label, 'n_peers': n_peers, 'percentiles': percentiles}
+        return None
+
+
+def ordinal(rank):
+    """Formats a percentile rank as an ordinal, e.g. 71.4 -> '71st'."""
+    n = int(round(rank))
+    suffix = 'th' if 10 <= n % 100 <= 20 else {1: 'st', 2: 'nd', 3: 'rd'}.get(n % 10, 'th')
+    return f"{n}{suffix}"
+
+
+@functools.lru_cache(maxsize=4)
+def _load_peer_index(path, mtime):
+    path = Path(path)
+    peers = pd.read_parquet(path) if path.suffix == '.parquet' else pd.read_csv(path)
+    return PeerIndex.from_frame(peers)
+
+
+def load_peer_index(path=None):
+    """
+    Returns the process-wide index for the peer file at `path` (default: QULAB_PEER_DATA or the
+    bundled sample), rebuilding it only when the file changes. Returns None if the file is missing.
+    """
+    path = Path(path or PEER_DATA_PATH)
+    if not path.exists():
+        return None
+    return _load_peer_index(str(path), path.stat().st_mtime)
+
+
+def synthetic_peer_assessments(n, seed=0, sectors=None):
+    """
+    Generates `n` illustrative peer assessments with sector-specific score levels, for demos,
+    tests and benchmarks. Not market data.
+    """
+    rng = np.random.default_rng(seed)
+    sectors = sectors or ['Software', 'Healthcare', 'Financial Services', 'Industrials', 'Consumer', 'Business Services']
+    sector_idx = rng.integers(0, len(sectors), n)
+    # Sector maturity shifts every dimension; larger deals skew slightly more mature
+    sector_shift = np.linspace(12, -12, len(sectors))[sector_idx]
+    size_idx = rng.choice(len(DEAL_SIZES), n, p=[0.5, 0.35, 0.15])
+    size_shift = np.array([-4.0, 0.0, 6.0])[size_idx]
+    scores = {
+        col: np.clip(np.round(rng.normal(mean, 16, n) + sector_shift + size_shift), 0, 100)
+        for col, mean in zip(SCORE_COLUMNS, (58, 48, 52))
+    }
+    return pd.DataFrame({
+        'sector': np.array(sectors)[sector_idx],
+        'deal_size': np.array(DEAL_SIZES)[size_idx],
+        **scores,
+    })
@@ -0,0 +1,180 @@
+"""
+Dependency-tracked, incremental recomputation of the score -> valuation -> narrative chain.
+
+The pipeline is a small DAG of named inputs and stages. Setting an input marks only the
+stages that (transitively) depend on it dirty; a dirty stage is recomputed lazily the next
+time it is read. Each stage memoizes its recent results by the values of its dependencies,
+so returning to earlier inputs (e.g. dragging a slider back) reuses the stored value, and a
+stage whose dependencies come out unchanged is not recomputed at all.
+"""
+import datetime
+import numbers
+from collections import OrderedDict, namedtuple
+
+from narrative import build_ai_exit_narrative
+from peer_index import load_peer_index
+from render_cache import make_cache_key
+from scoring import calculate_exit_air_scores, project_valuation_impact
+
+# A derived value: `func` is called with the current values of `deps` (inputs or other stages)
+Stage = namedtuple('Stage', ['func', 'deps'])
+
+
+class IncrementalPipeline:
+    """
+    Holds the current input values and stage results for one session.
+    `compute_counts` records how often each stage actually ran, for profiling and tests.
+    """
+
+    def __init__(self, stages, inputs=None, memo_size=32):
+        self.stages = stages
+        self.memo_size = memo_size
+        self._inputs = {}
+        self._values = {}         # stage -> current result (only meaningful when clean)
+        self._dirty = set(stages) # every stage starts uncomputed
+        self._memo = {name: OrderedDict() for name in stages}
+        self.compute_counts = dict.fromkeys(stages, 0)
+
+        # stage or input name -> stages that read it directly
+        self._dependents = {}
+        for name, stage in stages.items():
+            for dep in stage.deps:
+                self._dependents.setdefault(dep, []).append(name)
+        if inputs:
+            self.set_inputs(**inputs)
+
+    def _mark_dirty(self, name):
+        """Marks every stage downstream of `name` dirty; returns the newly dirtied stages."""
+        newly_dirty, stack = set(), list(self._dependents.get(name, ()))
+        while stack:
+            stage = stack.pop()
+            # Everything downstream of a dirty stage is already dirty, so the walk can stop there
+            if stage in self._dirty:
+                continue
+            self._dirty.add(stage)
+            newly_dirty.add(stage)
+            stack.extend(self._dependents.get(stage, ()))
+        return newly_dirty
+
+    def set_inputs(self, **values):
+        """
+        Updates input values. Only inputs whose value actually changed invalidate anything.
+        Returns the set of stages that became dirty.
+        """
+        newly_dirty = set()
+        for name, value in values.items():
+            if name in self.stages:
+                raise ValueError(f"'{name}' is a pipeline stage, not an input.")
+            if name in self._inputs and _same(self._inputs[name], value):
+                continue
+            self._inputs[name] = value
+            newly_dirty |= self._mark_dirty(name)
+        return newly_dirty
+
+    def is_dirty(self, name):
+        """True if stage `name` would be recomputed (or fetched from its memo) when read."""
+        return name in self._dirty
+
+    def get(self, name):
+        """Returns the current value of an input or stage, computing dirty stages as needed."""
+        if name not in self.stages:
+            if name not in self._inputs:
+                raise KeyError(f"Unknown pipeline input or stage '{name}'.")
+            return self._inputs[name]
+        if name not in self._dirty:
+            return self._values[name]
+
+        stage = self.stages[name]
+        args = [self.get(dep) for dep in stage.deps]
+        key = make_cache_key(*args)
+        memo = self._memo[name]
+        if key in memo:
+            memo.move_to_end(key)
+            value = memo[key]
+        else:
+            value = stage.func(*args)
+            self.compute_counts[name] += 1
+            memo[key] = value
+            if len(memo) > self.memo_size:
+                memo.popitem(last=False)
+        self._values[name] = value
+        self._dirty.discard(name)
+        return value
+
+
+def _same(a, b):
+    """
+    Equality that never raises for array-likes or mixed types. Numbers compare by value, so a
+    slider's 7 and a restored 7.0 (or a NumPy scalar) are the same input; bools stay distinct.
+    """
+    if _is_number(a) and _is_number(b):
+        return float(a) == float(b)
+    try:
+        return bool(a == b) and type(a) is type(b)
+    except (TypeError, ValueError):
+        return False
+
+
+def _is_number(value):
+    return isinstance(value, numbers.Real) and not isinstance(value, bool)
+
+
+def _exit_ai_r_score(exit_air):
+    return float(exit_air.score)
+
+
+def _projected_multiple(score, baseline, premium_coeff):
+    return float(project_valuation_impact(score, baseline, premium_coeff))
+
+
+def _peer_context(score, visible, documented, sustainable, w_v, w_d, w_s, sector, deal_size):
+    """
+    Percentile ranks against the peer index, or None when no peer data is available.
+    Peers are rescored with the current weights so the Exit-AI-R rank compares like with like.
+    """
+    index = load_peer_index()
+    if index is None:
+        return None
+    return index.peer_context(
+        {'exit_ai_r_score': score, 'visible_score': visible, 'documented_score': documented, 'sustainable_score': sustainable},
+        sector=sector, deal_size=deal_size, weights=(w_v, w_d, w_s)
+    )
+
+
+# Inputs read from the app's session state, in the order the workflow collects them
+EXIT_PIPELINE_INPUTS = [
+    'persona_name', 'firm_name', 'company_name', 'sector', 'deal_size',
+    'visible_score', 'documented_score', 'sustainable_score',
+    'w_visible', 'w_documented', 'w_sustainable',
+    'baseline_ebitda_multiple', 'ai_premium_coefficient',
+]
+
+EXIT_PIPELINE_STAGES = {
+    # Full batch result, including the weight normalization masks the UI warns about
+    'exit_air': Stage(calculate_exit_air_scores, (
+        'visible_score', 'documented_score', 'sustainable_score', 'w_visible', 'w_documented', 'w_sustainable'
+    )),
+    'exit_ai_r_score': Stage(_exit_ai_r_score, ('exit_air',)),
+    'projected_ebitda_multiple': Stage(_projected_multiple, (
+        'exit_ai_r_score', 'baseline_ebitda_multiple', 'ai_premium_coefficient'
+    )),
+    'peer_context': Stage(_peer_context, (
+        'exit_ai_r_score', 'visible_score', 'documented_score', 'sustainable_score',
+        'w_visible', 'w_documented', 'w_sustainable', 'sector', 'deal_size'
+    )),
+    'narrative': Stage(build_ai_exit_narrative, (
+        'company_name', 'exit_ai_r_score', 'visible_score', 'documented_score', 'sustainable_score',
+        'baseline_ebitda_multiple', 'projected_ebitda_multiple', 'ai_premium_coefficient', 'persona_name', 'firm_name',
+        'peer_context', 'report_date'
+    )),
+}
+
+
+def build_exit_pipeline(**inputs):
+    """
+    Returns a fresh score -> valuation -> narrative pipeline, optionally with initial inputs.
+    The narrative's `report_date` is an input like any other (today unless given), so a
+    memoized narrative is never served with a stale date once the caller pushes a new one.
+    """
+    inputs.setdefault('report_date', datetime.date.today())
+    return IncrementalPipeline(EXIT_PIPELINE_STAGES, inputs)
@@ -0,0 +1,138 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+# Sentinel distinguishing a cache miss from a cached None
+_MISSING = object()
+
+
+def make_cache_key(*parts):
+    """
+    Builds a stable hex digest from the inputs of a render call.
+    NumPy arrays are hashed by dtype, shape and raw bytes; dicts by their sorted items;
+    everything else by repr(), so equal plotted inputs always map to the same key.
+    """
+    digest = hashlib.sha256()
+
+    def feed(part):
+        if isinstance(part, np.ndarray):
+            digest.update(f"ndarray:{part.dtype.str}:{part.shape}:".encode())
+            digest.update(np.ascontiguousarray(part).tobytes())
+        elif isinstance(part, dict):
+            digest.update(b"dict:")
+            for k in sorted(part, key=repr):
+                feed(k)
+                feed(part[k])
+        elif isinstance(part, (list, tuple)):
+            digest.update(f"{type(part).__name__}:{len(part)}:".encode())
+            for item in part:
+                feed(item)
+        else:
+            digest.update(f"{type(part).__name__}:{part!r};".encode())
+
+    for part in parts:
+        feed(part)
+    return digest.hexdigest()
+
+
+class ByteBudgetLRUCache:
+    """
+    A thread-safe LRU cache for byte payloads (e.g. rendered PNG/SVG charts).
+    Entries are evicted least-recently-used first once their total size exceeds `max_bytes`
+    (or their count exceeds `max_entries`), and expire `ttl_seconds` after they were stored.
+    Hit, miss, eviction and expiration counters are kept for monitoring.
+    Payload sizes are measured with `size_of` (len() by default), so the cache can also hold
+    other objects when given a suitable size estimate.
+    """
+
+    def __init__(self, max_bytes, ttl_seconds=None, max_entries=None, size_of=len, clock=time.monotonic):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._size_of = size_of
+        self._clock = clock
+        self._entries = OrderedDict() # key -> (payload, size, expires_at)
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _drop(self, key):
+        _, size, _ = self._entries.pop(key)
+        self.current_bytes -= size
+
+    def get(self, key, default=None):
+        """Returns the cached payload for `key`, or `default` on a miss or an expired entry."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] is not None and entry[2] <= self._clock():
+                self._drop(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, payload):
+        """Stores `payload`, evicting old entries to stay within the byte budget."""
+        size = self._size_of(payload)
+        if size > self.max_bytes:
+            return # Never cache a single payload larger than the whole budget
+        expires_at = None if self.ttl_seconds is None else self._clock() + self.ttl_seconds
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (payload, size, expires_at)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes or (
+                self.max_entries is not None and len(self._entries) > self.max_entries
+            ):
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def lookup_or_render(self, key, render):
+        """
+        Returns (payload, hit) for `key`, calling `render()` and storing its result on a miss.
+        `hit` tells the caller whether the payload came from the cache.
+        """
+        payload = self.get(key, _MISSING)
+        if payload is not _MISSING:
+            return payload, True
+        payload = render()
+        self.put(key, payload)
+        return payload, False
+
+    def get_or_render(self, key, render):
+        """Returns the cached payload for `key`, calling `render()` and storing its result on a miss."""
+        return self.lookup_or_render(key, render)[0]
+
+    def clear(self):
+        """Removes all entries; counters are kept."""
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        """Returns a snapshot of the cache size and counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'current_bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
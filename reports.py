@@ -0,0 +1,118 @@
+import multiprocessing
+import os
+import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from narrative import build_ai_exit_narrative
+
+# Chart files written next to each report when charts are requested
+DIMENSION_CHART_FILE = 'dimension_scores.png'
+VALUATION_CHART_FILE = 'valuation_comparison.png'
+
+# Bulk reports are rendered from a job queue thread, and a forked child could inherit another
+# thread's held locks, so worker processes start from a fresh interpreter
+POOL_CONTEXT = multiprocessing.get_context("spawn")
+
+
+def company_slug(index, company):
+    """Builds a filesystem-safe, unique folder name for one company's report."""
+    name = re.sub(r'[^A-Za-z0-9_-]+', '_', str(company)).strip('_') or 'company'
+    return f"{index:05d}_{name}"
+
+
+def _render_company_report(task):
+    """
+    Renders one company's narrative (and optionally its two charts) into its own folder.
+    Module-level so it can run in a worker process; returns the written paths relative to the output dir.
+    """
+    index, row, output_dir, with_charts, persona_name, firm_name = task
+    slug = company_slug(index, row['company_name'])
+    company_dir = Path(output_dir) / slug
+    company_dir.mkdir(parents=True, exist_ok=True)
+
+    report = build_ai_exit_narrative(
+        row['company_name'], row['exit_ai_r_score'], row['visible_score'], row['documented_score'],
+        row['sustainable_score'], row['baseline_ebitda_multiple'], row['projected_ebitda_multiple'],
+        row['ai_premium_coefficient'], persona_name, firm_name
+    )
+    written = []
+
+    if with_charts:
+        # Imported here so report workers without charts never load the plotting stack
+        from charts import render_dimension_scores, render_valuation_comparison
+        scores = {'Visible': row['visible_score'], 'Documented': row['documented_score'], 'Sustainable': row['sustainable_score']}
+        (company_dir / DIMENSION_CHART_FILE).write_bytes(render_dimension_scores(scores, row['company_name']))
+        (company_dir / VALUATION_CHART_FILE).write_bytes(
+            render_valuation_comparison(row['baseline_ebitda_multiple'], row['projected_ebitda_multiple'], row['company_name'])
+        )
+        report += f"\n![Dimension Scores]({DIMENSION_CHART_FILE})\n\n![Valuation Comparison]({VALUATION_CHART_FILE})\n"
+        written += [f"{slug}/{DIMENSION_CHART_FILE}", f"{slug}/{VALUATION_CHART_FILE}"]
+
+    (company_dir / 'report.md').write_text(report, encoding='utf-8')
+    return [f"{slug}/report.md"] + written
+
+
+def generate_bulk_reports(scored_portfolio, output_dir, baseline=7.0, delta=2.0, persona_name="Jane Doe",
+                          firm_name="Alpha Capital", with_charts=True, n_workers=None, progress=None):
+    """
+    Writes a narrative report (and optionally its charts) for every company of a scored portfolio,
+    as returned by scoring.score_portfolio, into per-company folders under `output_dir`.
+    Reports are rendered across a process pool of `n_workers` (default: all CPUs) and written to disk
+    as they complete, so no more than a handful of reports are held in memory at once.
+    `progress(done, total)` is called after each company. Returns the list of written relative paths.
+    """
+    total = len(scored_portfolio)
+    columns = ['company_name', 'visible_score', 'documented_score', 'sustainable_score',
+               'exit_ai_r_score', 'projected_ebitda_multiple']
+    frame = scored_portfolio.copy()
+    if 'company_name' not in frame.columns:
+        frame['company_name'] = [f"Company {i}" for i in range(total)]
+    if 'baseline_ebitda_multiple' not in frame.columns:
+        frame['baseline_ebitda_multiple'] = baseline
+    if 'ai_premium_coefficient' not in frame.columns:
+        frame['ai_premium_coefficient'] = delta
+    frame = frame[columns + ['baseline_ebitda_multiple', 'ai_premium_coefficient']]
+
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    tasks = (
+        (i, row, str(output_dir), with_charts, persona_name, firm_name)
+        for i, row in enumerate(frame.to_dict('records'))
+    )
+
+    n_workers = n_workers or os.cpu_count() or 1
+    written = []
+
+    def collect(i, paths):
+        written.extend(paths)
+        if progress is not None:
+            progress(i + 1, total)
+
+    if n_workers > 1 and total > 1:
+        with ProcessPoolExecutor(max_workers=n_workers, mp_context=POOL_CONTEXT) as executor:
+            # Small chunks keep all workers busy while returning results steadily for progress updates
+            chunksize = max(1, min(16, total // (n_workers * 4)))
+            try:
+                for i, paths in enumerate(executor.map(_render_company_report, tasks, chunksize=chunksize)):
+                    collect(i, paths)
+            except BaseException:
+                # e.g. a background job cancelled from the progress callback: drop reports not yet started
+                executor.shutdown(cancel_futures=True)
+                raise
+    else:
+        for i, task in enumerate(tasks):
+            collect(i, _render_company_report(task))
+    return written
+
+
+def write_reports_zip(output_dir, relative_paths, zip_path):
+    """
+    Packs the written report files into `zip_path`, streaming each file from disk.
+    Markdown is deflated; PNG charts are already compressed and are stored as-is.
+    """
+    with zipfile.ZipFile(zip_path, 'w') as archive:
+        for rel in relative_paths:
+            compression = zipfile.ZIP_STORED if rel.endswith('.png') else zipfile.ZIP_DEFLATED
+            archive.write(Path(output_dir) / rel, arcname=rel, compress_type=compression)
+    return zip_path
@@ -0,0 +1,148 @@
+"""
+Hierarchical sub-criteria rubric for the three Exit-AI-R dimensions.
+
+Each dimension (Visible, Documented, Sustainable) is a weighted rubric of checklist criteria
+rated 0-100, defined in a JSON config (data/rubric.json, or QULAB_RUBRIC). The rubric is a
+criteria x dimensions weight matrix with one non-zero entry per row, so the dimension scores of
+a whole portfolio are a single (companies x criteria) @ (criteria x 3) product, and
+calculate_exit_air_scores combines them into the Exit-AI-R Score as the top of the hierarchy.
+
+Config format:
+    {"dimensions": [{"column": "visible_score", "label": "Visible",
+                     "criteria": [{"id": "ai_product_features", "label": "...", "weight": 3}, ...]},
+                    ...]}
+"""
+import functools
+import json
+import os
+from collections import namedtuple
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from scoring import SCORE_COLUMNS, calculate_exit_air_scores
+
+DEFAULT_RUBRIC = Path(__file__).resolve().parent / "data" / "rubric.json"
+RUBRIC_PATH = Path(os.environ.get("QULAB_RUBRIC", DEFAULT_RUBRIC))
+
+# One checklist item: `dimension` is its SCORE_COLUMNS entry, `weight` its weight within that dimension
+Criterion = namedtuple('Criterion', ['id', 'label', 'dimension', 'weight'])
+
+# Result of Rubric.score: dimension_scores has shape (..., 3) in SCORE_COLUMNS order and
+# exit_air is the ExitAIRBatchResult computed from them
+RubricScores = namedtuple('RubricScores', ['dimension_scores', 'exit_air'])
+
+
+class Rubric:
+    """
+    Weighted sub-criteria for every dimension. `matrix` is the criteria x dimensions weight
+    matrix with each column normalized to sum to 1.
+    """
+
+    def __init__(self, criteria, labels=None):
+        self.criteria = list(criteria)
+        self.ids = [c.id for c in self.criteria]
+        self.labels = labels or {col: col for col in SCORE_COLUMNS}
+        if len(set(self.ids)) != len(self.ids):
+            raise ValueError("Rubric criterion ids must be unique.")
+        unknown = sorted({c.dimension for c in self.criteria} - set(SCORE_COLUMNS))
+        if unknown:
+            raise ValueError(f"Rubric has criteria for unknown dimensions: {', '.join(unknown)}")
+
+        matrix = np.zeros((len(self.criteria), len(SCORE_COLUMNS)))
+        for row, criterion in enumerate(self.criteria):
+            if criterion.weight < 0:
+                raise ValueError(f"Criterion '{criterion.id}' has a negative weight.")
+            matrix[row, SCORE_COLUMNS.index(criterion.dimension)] = criterion.weight
+        totals = matrix.sum(axis=0)
+        empty = [col for col, total in zip(SCORE_COLUMNS, totals) if total <= 0]
+        if empty:
+            raise ValueError(f"Rubric has no weighted criteria for: {', '.join(empty)}")
+        self.matrix = matrix / totals
+
+    @classmethod
+    def from_config(cls, config):
+        """Builds the rubric from the parsed JSON config (see the module docstring)."""
+        criteria, labels = [], {}
+        for dimension in config['dimensions']:
+            labels[dimension['column']] = dimension.get('label', dimension['column'])
+            criteria += [
+                Criterion(c['id'], c.get('label', c['id']), dimension['column'], float(c.get('weight', 1.0)))
+                for c in dimension['criteria']
+            ]
+        return cls(criteria, labels)
+
+    def criteria_for(self, dimension):
+        """Criteria of one dimension (a SCORE_COLUMNS entry), in config order."""
+        return [c for c in self.criteria if c.dimension == dimension]
+
+    def _ratings_matrix(self, ratings):
+        if isinstance(ratings, pd.DataFrame):
+            missing = [c for c in self.ids if c not in ratings.columns]
+            if missing:
+                raise ValueError(f"Ratings are missing rubric criteria: {', '.join(missing)}")
+            return ratings[self.ids].to_numpy(dtype=float)
+        if isinstance(ratings, dict):
+            return np.array([ratings.get(c, np.nan) for c in self.ids], dtype=float)
+        ratings = np.asarray(ratings, dtype=float)
+        if ratings.shape[-1] != len(self.ids):
+            raise ValueError(f"Expected {len(self.ids)} criterion ratings per company, got {ratings.shape[-1]}.")
+        return ratings
+
+    def dimension_scores(self, ratings):
+        """
+        Dimension scores for a DataFrame with one column per criterion id, a (..., n_criteria)
+        array, or a single company's {criterion id: rating} dict. Returns shape (..., 3).
+        Unrated (NaN) criteria are left out and the remaining weights of their dimension are
+        rescaled; a dimension with no rated criteria scores NaN.
+        """
+        ratings = self._ratings_matrix(ratings)
+        rated = ~np.isnan(ratings)
+        if rated.all():
+            return ratings @ self.matrix
+        # Same product on the rated entries, divided by the weight that was actually rated
+        weighted = np.where(rated, ratings, 0.0) @ self.matrix
+        coverage = rated @ self.matrix
+        scores = np.full(weighted.shape, np.nan)
+        np.divide(weighted, coverage, out=scores, where=coverage > 0)
+        return scores
+
+    def score(self, ratings, w_v, w_d, w_s):
+        """Dimension scores and the Exit-AI-R result for the given ratings and dimension weights."""
+        dimension_scores = self.dimension_scores(ratings)
+        return RubricScores(
+            dimension_scores,
+            calculate_exit_air_scores(*np.moveaxis(dimension_scores, -1, 0), w_v, w_d, w_s)
+        )
+
+    def ratings_from_dimension_scores(self, scores):
+        """Ratings that reproduce the given {dimension column: score}: every criterion gets its dimension's score."""
+        return {c.id: float(scores[c.dimension]) for c in self.criteria}
+
+    def with_dimension_scores(self, portfolio):
+        """
+        Returns `portfolio` with SCORE_COLUMNS computed from its criterion columns when it has
+        all of them and lacks the dimension scores; otherwise returns it unchanged.
+        """
+        if all(col in portfolio.columns for col in SCORE_COLUMNS) or not all(c in portfolio.columns for c in self.ids):
+            return portfolio
+        scores = self.dimension_scores(portfolio)
+        return portfolio.assign(**{col: scores[:, i] for i, col in enumerate(SCORE_COLUMNS)})
+
+
+@functools.lru_cache(maxsize=4)
+def _load_rubric(path, mtime):
+    with open(path, encoding='utf-8') as f:
+        return Rubric.from_config(json.load(f))
+
+
+def load_rubric(path=None):
+    """
+    Returns the rubric defined at `path` (default: QULAB_RUBRIC or the bundled config), reloading
+    it only when the file changes. Returns None if the file is missing.
+    """
+    path = Path(path or RUBRIC_PATH)
+    if not path.exists():
+        return None
+    return _load_rubric(str(path), path.stat().st_mtime)
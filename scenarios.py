@@ -0,0 +1,203 @@
+"""
+Named what-if scenarios per company in one columnar table.
+
+Every scenario ("Strategic buyer", "Financial sponsor", "Downside", ...) is one row with typed
+columns for its inputs (scores, weights, delta, baseline) and outputs (Exit-AI-R Score and
+projected multiple). Outputs are recomputed for the whole table in one vectorized pass, so
+changing a shared input across tens of scenarios x hundreds of companies costs microseconds per
+row, and comparisons are plain column selections. The table is persisted as Parquet, written
+atomically, and reloaded when another process has changed the file.
+"""
+import functools
+import os
+import threading
+from collections import namedtuple
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from assessment_store import utc_timestamp
+from scoring import SCORE_COLUMNS, WEIGHT_COLUMNS, calculate_exit_air_scores, project_valuation_impact
+
+DEFAULT_SCENARIO_PATH = os.environ.get("QULAB_SCENARIO_STORE", "scenarios.parquet")
+
+KEY_COLUMNS = ['company_name', 'scenario']
+INPUT_COLUMNS = SCORE_COLUMNS + WEIGHT_COLUMNS + ['baseline_ebitda_multiple', 'ai_premium_coefficient']
+OUTPUT_COLUMNS = ['exit_ai_r_score', 'projected_ebitda_multiple']
+# Rows of a side-by-side comparison, in display order
+COMPARE_COLUMNS = INPUT_COLUMNS + OUTPUT_COLUMNS
+
+# compare() result: `values` has one column per scenario and one row per COMPARE_COLUMNS entry;
+# `diff` holds each scenario minus the base scenario (None when no base was given)
+ScenarioComparison = namedtuple('ScenarioComparison', ['values', 'diff'])
+
+
+def _empty_frame():
+    frame = pd.DataFrame({col: pd.Series(dtype='string') for col in KEY_COLUMNS})
+    for col in INPUT_COLUMNS + OUTPUT_COLUMNS:
+        frame[col] = pd.Series(dtype='float64')
+    frame['updated_at'] = pd.Series(dtype='string')
+    return frame
+
+
+def recompute_outputs(frame):
+    """Fills OUTPUT_COLUMNS of a scenario frame in place from its input columns, in one pass."""
+    if frame.empty:
+        return frame
+    columns = {col: frame[col].to_numpy(dtype=float) for col in INPUT_COLUMNS}
+    result = calculate_exit_air_scores(*(columns[c] for c in SCORE_COLUMNS), *(columns[c] for c in WEIGHT_COLUMNS))
+    frame['exit_ai_r_score'] = result.score
+    frame['projected_ebitda_multiple'] = project_valuation_impact(
+        result.score, columns['baseline_ebitda_multiple'], columns['ai_premium_coefficient']
+    )
+    return frame
+
+
+class ScenarioStore:
+    """
+    Process-wide scenario table backed by a Parquet file. All methods are thread-safe; every
+    change is written through to disk. Read methods return copies.
+    """
+
+    def __init__(self, path=DEFAULT_SCENARIO_PATH):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._frame = _empty_frame()
+        self._refresh()
+
+    def _refresh(self):
+        """Reloads the table if the file changed since it was last read or written. Callers hold the lock or are __init__."""
+        if not self.path.exists():
+            return
+        mtime = self.path.stat().st_mtime_ns
+        if mtime != self._mtime:
+            frame = pd.read_parquet(self.path)
+            self._frame = pd.concat([_empty_frame(), frame[_empty_frame().columns]], ignore_index=True)
+            self._mtime = mtime
+
+    def _write(self):
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        self._frame.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, self.path)
+        self._mtime = self.path.stat().st_mtime_ns
+
+    def _mask(self, company=None, scenarios=None):
+        mask = np.ones(len(self._frame), dtype=bool)
+        if company is not None:
+            mask &= (self._frame['company_name'] == company).to_numpy(dtype=bool)
+        if scenarios is not None:
+            mask &= self._frame['scenario'].isin(list(scenarios)).to_numpy(dtype=bool)
+        return mask
+
+    def _upsert(self, new_rows):
+        """Replaces rows with the same keys by `new_rows` (already typed and computed) and writes once. Callers hold the lock."""
+        replaced = pd.MultiIndex.from_frame(self._frame[KEY_COLUMNS]).isin(pd.MultiIndex.from_frame(new_rows[KEY_COLUMNS]))
+        self._frame = pd.concat([self._frame[~replaced], new_rows], ignore_index=True)
+        self._write()
+
+    def _typed_rows(self, rows):
+        rows = rows[KEY_COLUMNS + INPUT_COLUMNS].drop_duplicates(KEY_COLUMNS, keep='last').assign(updated_at=utc_timestamp())
+        rows = recompute_outputs(rows.reset_index(drop=True).astype({c: 'float64' for c in INPUT_COLUMNS}))
+        return rows[self._frame.columns].astype(self._frame.dtypes.to_dict())
+
+    def save(self, company, scenario, **inputs):
+        """
+        Creates or overwrites scenario `scenario` of `company` with INPUT_COLUMNS values. Inputs
+        not given keep their stored values; all of them are required for a new scenario.
+        Returns the stored row as a dict.
+        """
+        unknown = sorted(set(inputs) - set(INPUT_COLUMNS))
+        if unknown:
+            raise ValueError(f"Unknown scenario inputs: {', '.join(unknown)}")
+        with self._lock:
+            self._refresh()
+            existing = np.flatnonzero(self._mask(company, [scenario]))
+            row = self._frame.loc[existing[0], INPUT_COLUMNS].to_dict() if len(existing) else {}
+            row.update(inputs)
+            missing = [c for c in INPUT_COLUMNS if c not in row]
+            if missing:
+                raise ValueError(f"New scenario is missing inputs: {', '.join(missing)}")
+            self._upsert(self._typed_rows(pd.DataFrame([{'company_name': company, 'scenario': scenario, **row}])))
+            return self._frame.iloc[-1].to_dict()
+
+    def save_many(self, scenarios):
+        """
+        Creates or overwrites every scenario in a DataFrame with KEY_COLUMNS and INPUT_COLUMNS,
+        computing all outputs in one pass and writing the file once. Returns the number of rows saved.
+        """
+        missing = [c for c in KEY_COLUMNS + INPUT_COLUMNS if c not in scenarios.columns]
+        if missing:
+            raise ValueError(f"Scenarios are missing required columns: {', '.join(missing)}")
+        rows = self._typed_rows(scenarios)
+        with self._lock:
+            self._refresh()
+            self._upsert(rows)
+        return len(rows)
+
+    def update_shared(self, company=None, **inputs):
+        """
+        Sets INPUT_COLUMNS values on every scenario of `company` (every company when None) and
+        recomputes their outputs in one vectorized pass. Returns the number of scenarios updated.
+        """
+        unknown = sorted(set(inputs) - set(INPUT_COLUMNS))
+        if unknown:
+            raise ValueError(f"Unknown scenario inputs: {', '.join(unknown)}")
+        with self._lock:
+            self._refresh()
+            mask = self._mask(company)
+            if not mask.any():
+                return 0
+            for col, value in inputs.items():
+                self._frame.loc[mask, col] = float(value)
+            self._frame.loc[mask, 'updated_at'] = utc_timestamp()
+            recompute_outputs(self._frame)
+            self._write()
+            return int(mask.sum())
+
+    def delete(self, company, scenario):
+        """Removes one scenario; returns True if it existed."""
+        with self._lock:
+            self._refresh()
+            mask = self._mask(company, [scenario])
+            if not mask.any():
+                return False
+            self._frame = self._frame[~mask].reset_index(drop=True)
+            self._write()
+            return True
+
+    def scenarios(self, company=None):
+        """Scenario rows of `company` (or all companies), in the order they were last saved."""
+        with self._lock:
+            self._refresh()
+            return self._frame[self._mask(company)].reset_index(drop=True)
+
+    def companies(self):
+        """Companies with at least one scenario, sorted."""
+        with self._lock:
+            self._refresh()
+            return sorted(self._frame['company_name'].dropna().unique())
+
+    def compare(self, company, scenarios=None, base=None):
+        """
+        Side-by-side inputs and outputs of `company`'s scenarios (all, or the named ones in that
+        order). With `base`, also returns every scenario's difference from the base scenario.
+        """
+        with self._lock:
+            self._refresh()
+            rows = self._frame[self._mask(company, scenarios)].set_index('scenario')[COMPARE_COLUMNS]
+        if scenarios is not None:
+            rows = rows.reindex([s for s in scenarios if s in rows.index])
+        diff = None
+        if base is not None:
+            if base not in rows.index:
+                raise KeyError(f"Unknown base scenario '{base}' for {company}.")
+            diff = (rows - rows.loc[base]).T
+        return ScenarioComparison(rows.T, diff)
+
+
+@functools.lru_cache(maxsize=None)
+def open_scenario_store(path=DEFAULT_SCENARIO_PATH):
+    """Returns the scenario store for `path`, shared by every session in this process."""
+    return ScenarioStore(path)
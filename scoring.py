@@ -0,0 +1,98 @@
+import numpy as np
+from collections import namedtuple
+
+# Column names used for portfolio tables. They mirror the st.session_state keys in app.py
+# so that a single-company assessment and a portfolio row describe the same quantities.
+SCORE_COLUMNS = ['visible_score', 'documented_score', 'sustainable_score']
+WEIGHT_COLUMNS = ['w_visible', 'w_documented', 'w_sustainable']
+
+# Result of a vectorized Exit-AI-R calculation. Every field is an array with the broadcast
+# shape of the inputs; the two masks report the weight handling that the single-company
+# calculation surfaces as st.warning / st.error messages.
+ExitAIRBatchResult = namedtuple(
+    'ExitAIRBatchResult',
+    ['score', 'w_v', 'w_d', 'w_s', 'normalized_mask', 'zero_weight_mask']
+)
+
+
+def calculate_exit_air_scores(visible, documented, sustainable, w_v, w_d, w_s):
+    """
+    Calculates Exit-AI-R Scores for many companies in one vectorized pass.
+    Scores and weights may be scalars or arrays; weights can be shared (scalars) or per-row.
+    Rows whose weights do not sum to 1.0 are normalized and flagged in `normalized_mask`;
+    rows whose weights sum to zero get a score and weights of 0.0 and are flagged in `zero_weight_mask`.
+    """
+    visible, documented, sustainable, w_v, w_d, w_s = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (visible, documented, sustainable, w_v, w_d, w_s))
+    )
+    total_weight = w_v + w_d + w_s
+
+    # Same tolerance as the single-company calculation, evaluated element-wise
+    normalized_mask = ~np.isclose(total_weight, 1.0)
+    zero_weight_mask = total_weight == 0
+
+    # Divide only where normalization is needed and possible; zero-sum rows fall back to 0.0
+    scale = np.ones_like(total_weight)
+    np.divide(1.0, total_weight, out=scale, where=normalized_mask & ~zero_weight_mask)
+    scale[zero_weight_mask] = 0.0
+
+    w_v_norm = w_v * scale
+    w_d_norm = w_d * scale
+    w_s_norm = w_s * scale
+
+    score = w_v_norm * visible + w_d_norm * documented + w_s_norm * sustainable
+    return ExitAIRBatchResult(score, w_v_norm, w_d_norm, w_s_norm, normalized_mask, zero_weight_mask)
+
+
+def project_valuation_impact(score, baseline, premium_coeff):
+    """
+    Projects the EBITDA multiple including the AI premium.
+    Works unchanged on scalars and on NumPy arrays / pandas Series of equal or broadcastable shape.
+    """
+    ai_multiple_uplift = (premium_coeff * score) / 100
+    return baseline + ai_multiple_uplift
+
+
+def score_portfolio(portfolio, weights=None, baseline=None, premium_coeff=None):
+    """
+    Scores a whole portfolio DataFrame and projects its valuation multiples.
+    `portfolio` must contain the SCORE_COLUMNS. Weights are read from WEIGHT_COLUMNS when present,
+    otherwise the shared `weights` triplet is used. The same applies to the per-row
+    'baseline_ebitda_multiple' / 'ai_premium_coefficient' columns versus the shared `baseline` /
+    `premium_coeff`; when neither is available, no projected multiple is added.
+    Returns a copy of the input with the score, normalized weights, weight masks and projection appended.
+    """
+    missing = [col for col in SCORE_COLUMNS if col not in portfolio.columns]
+    if missing:
+        raise ValueError(f"Portfolio is missing required score columns: {', '.join(missing)}")
+
+    if all(col in portfolio.columns for col in WEIGHT_COLUMNS):
+        w_v, w_d, w_s = (portfolio[col].to_numpy(dtype=float) for col in WEIGHT_COLUMNS)
+    elif weights is not None:
+        w_v, w_d, w_s = weights
+    else:
+        raise ValueError("Provide per-row weight columns or a shared weights triplet.")
+
+    result = calculate_exit_air_scores(
+        portfolio['visible_score'].to_numpy(dtype=float),
+        portfolio['documented_score'].to_numpy(dtype=float),
+        portfolio['sustainable_score'].to_numpy(dtype=float),
+        w_v, w_d, w_s
+    )
+
+    scored = portfolio.copy()
+    scored['exit_ai_r_score'] = result.score
+    scored['w_visible_norm'] = result.w_v
+    scored['w_documented_norm'] = result.w_d
+    scored['w_sustainable_norm'] = result.w_s
+    scored['weights_normalized'] = result.normalized_mask
+    scored['weights_zero_sum'] = result.zero_weight_mask
+
+    if 'baseline_ebitda_multiple' in portfolio.columns:
+        baseline = portfolio['baseline_ebitda_multiple'].to_numpy(dtype=float)
+    if 'ai_premium_coefficient' in portfolio.columns:
+        premium_coeff = portfolio['ai_premium_coefficient'].to_numpy(dtype=float)
+    if baseline is not None and premium_coeff is not None:
+        scored['projected_ebitda_multiple'] = project_valuation_impact(result.score, baseline, premium_coeff)
+
+    return scored
@@ -0,0 +1,194 @@
+"""
+Variance-based sensitivity attribution for the projected EBITDA multiple.
+
+Answers "which input drives the valuation?" three ways for the dimension scores, weights, delta
+and baseline:
+  * first-order and total-effect Sobol indices: the share of the projected multiple's variance
+    each input explains alone and including its interactions (Saltelli 2010 / Jansen estimators
+    over N * (k + 2) evaluations of the calculate_exit_air_scores -> project_valuation_impact chain);
+  * analytic partial derivatives of the projected multiple at the current inputs;
+  * one-at-a-time swings from each input's P10 to P90, for the tornado chart.
+
+The unit-hypercube sample matrices are quasi-random (digit-scrambled Halton, or scrambled Sobol
+when SciPy is installed) and depend only on the sample size, seed and sampler, so they are kept
+in a byte-bounded process-wide cache and reused across runs; each run only maps them through the
+inputs' inverse CDFs and evaluates the vectorized chain.
+"""
+import os
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from cache_policy import bounded_cache
+from monte_carlo import as_distribution, distribution_ppf
+from scoring import calculate_exit_air_scores, project_valuation_impact
+
+# Inputs of the projected-multiple chain, in sampling order
+SENSITIVITY_INPUTS = ['visible', 'documented', 'sustainable', 'w_visible', 'w_documented', 'w_sustainable', 'delta', 'baseline']
+SENSITIVITY_LABELS = {
+    'visible': "Visible Score",
+    'documented': "Documented Score",
+    'sustainable': "Sustainable Score",
+    'w_visible': "Visible Weight",
+    'w_documented': "Documented Weight",
+    'w_sustainable': "Sustainable Weight",
+    'delta': "AI Premium Coefficient (δ)",
+    'baseline': "Baseline EBITDA Multiple",
+}
+SAMPLERS = ('halton', 'sobol')
+TORNADO_QUANTILES = (0.1, 0.9)
+
+# `indices` has one row per SENSITIVITY_INPUTS entry with columns first_order, total_effect,
+# derivative, low, high, projected_low, projected_high and swing; the other fields describe the
+# projected multiple at the base inputs and over the sampled distribution.
+SensitivityResult = namedtuple('SensitivityResult', ['indices', 'base_projected', 'mean', 'variance', 'n_samples', 'sampler'])
+
+_SMALL_PRIMES = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47, 53, 59, 61, 67, 71, 73, 79, 83, 89, 97]
+
+
+def scrambled_halton(n, d, seed=0):
+    """
+    First `n` points (skipping the origin) of the `d`-dimensional Halton sequence with random
+    digit permutations per dimension and digit, which removes the correlation between the
+    higher prime bases that plain Halton shows.
+    """
+    if d > len(_SMALL_PRIMES):
+        raise ValueError(f"scrambled_halton supports up to {len(_SMALL_PRIMES)} dimensions.")
+    rng = np.random.default_rng(seed)
+    index = np.arange(1, n + 1)
+    points = np.empty((n, d))
+    for j, base in enumerate(_SMALL_PRIMES[:d]):
+        n_digits = int(np.ceil(np.log(n + 1) / np.log(base))) + 1
+        value, rest, scale = np.zeros(n), index.copy(), 1.0 / base
+        for _ in range(n_digits):
+            value += rng.permutation(base)[rest % base] * scale
+            rest //= base
+            scale /= base
+        points[:, j] = value
+    return points
+
+
+def _unit_samples(n, d, seed, sampler):
+    if sampler == 'halton':
+        return scrambled_halton(n, d, seed)
+    if sampler == 'sobol':
+        try:
+            from scipy.stats import qmc
+        except ImportError:
+            raise ValueError("The 'sobol' sampler needs SciPy (see requirements-extras.txt); use 'halton'.")
+        m = int(np.ceil(np.log2(max(n, 2))))
+        return qmc.Sobol(d, scramble=True, seed=seed).random_base2(m)[:n]
+    raise ValueError(f"Unknown sampler '{sampler}'. Use one of: {', '.join(SAMPLERS)}.")
+
+
+@bounded_cache(
+    "sensitivity_samples", max_entries=8, ttl_seconds=3600,
+    max_bytes=int(os.environ.get("QULAB_SENSITIVITY_CACHE_MB", "256")) * 1024 * 1024
+)
+def saltelli_unit_samples(n, k, seed=0, sampler='halton'):
+    """
+    The two independent (n, k) unit-hypercube matrices A and B of a Saltelli design, taken from
+    one 2k-dimensional low-discrepancy sequence. Cached and shared between runs, so read-only.
+    """
+    points = _unit_samples(n, 2 * k, seed, sampler)
+    a, b = np.ascontiguousarray(points[:, :k]), np.ascontiguousarray(points[:, k:])
+    a.flags.writeable = False
+    b.flags.writeable = False
+    return a, b
+
+
+def projected_multiple(x):
+    """The projected multiple for an (n, 8) array of SENSITIVITY_INPUTS columns."""
+    visible, documented, sustainable, w_v, w_d, w_s, delta, baseline = x.T
+    score = calculate_exit_air_scores(visible, documented, sustainable, w_v, w_d, w_s).score
+    return project_valuation_impact(score, baseline, delta)
+
+
+def projected_multiple_gradient(base):
+    """
+    Analytic partial derivatives of the projected multiple at the `base` inputs (a dict keyed by
+    SENSITIVITY_INPUTS). With W the weight sum, normalized weights w/W and score S = sum(w_j x_j)/W:
+    dP/dx_j = delta * w_j / (100 W), dP/dw_j = delta * (x_j - S) / (100 W), dP/d delta = S / 100, dP/d baseline = 1.
+    """
+    scores = np.array([base['visible'], base['documented'], base['sustainable']], dtype=float)
+    weights = np.array([base['w_visible'], base['w_documented'], base['w_sustainable']], dtype=float)
+    total = weights.sum()
+    if total == 0:
+        # Zero weights score 0 whatever the inputs; only the baseline moves the multiple
+        return dict(zip(SENSITIVITY_INPUTS, [0.0] * 7 + [1.0]))
+    score = float(weights @ scores / total)
+    gradient = np.concatenate([
+        base['delta'] * weights / (100 * total),
+        base['delta'] * (scores - score) / (100 * total),
+        [score / 100, 1.0],
+    ])
+    return dict(zip(SENSITIVITY_INPUTS, gradient.tolist()))
+
+
+def sensitivity_analysis(base, distributions=None, n_samples=100_000, seed=0, sampler='halton', progress=None):
+    """
+    Sobol indices, partial derivatives and P10/P90 swings of the projected multiple.
+    `base` maps every SENSITIVITY_INPUTS name to its current value; `distributions` maps any of
+    them to a monte_carlo Distribution (or a number), and inputs without one stay at their base
+    value. Runs n_samples * (k + 2) model evaluations for k = 8 inputs; `progress(done, total)` is
+    called after each batch of n_samples evaluations.
+    """
+    missing = [name for name in SENSITIVITY_INPUTS if name not in base]
+    if missing:
+        raise ValueError(f"Missing base inputs: {', '.join(missing)}")
+    if n_samples < 2:
+        raise ValueError("n_samples must be at least 2.")
+    distributions = distributions or {}
+    dists = [as_distribution(distributions.get(name, base[name])) for name in SENSITIVITY_INPUTS]
+    k = len(SENSITIVITY_INPUTS)
+
+    unit_a, unit_b = saltelli_unit_samples(int(n_samples), k, int(seed), sampler)
+    x_a = np.column_stack([distribution_ppf(dist, unit_a[:, i]) for i, dist in enumerate(dists)])
+    x_b = np.column_stack([distribution_ppf(dist, unit_b[:, i]) for i, dist in enumerate(dists)])
+    f_a, f_b = projected_multiple(x_a), projected_multiple(x_b)
+    variance = float(np.var(np.concatenate([f_a, f_b])))
+    if progress is not None:
+        progress(2, k + 2)
+
+    first_order, total_effect = np.full(k, np.nan), np.full(k, np.nan)
+    x_ab = x_a.copy()
+    for i in range(k):
+        if variance > 0:
+            # A with column i taken from B
+            x_ab[:, i] = x_b[:, i]
+            f_ab = projected_multiple(x_ab)
+            first_order[i] = np.mean(f_b * (f_ab - f_a)) / variance
+            total_effect[i] = 0.5 * np.mean((f_a - f_ab) ** 2) / variance
+            x_ab[:, i] = x_a[:, i]
+        if progress is not None:
+            progress(i + 3, k + 2)
+
+    # One-at-a-time swings: each input at its P10 and P90 with the others at their base values
+    base_row = np.array([float(base[name]) for name in SENSITIVITY_INPUTS])
+    quantiles = np.array([distribution_ppf(dist, np.array(TORNADO_QUANTILES)) for dist in dists])
+    swings = np.tile(base_row, (2 * k, 1))
+    swings[np.arange(k), np.arange(k)] = quantiles[:, 0]
+    swings[k + np.arange(k), np.arange(k)] = quantiles[:, 1]
+    projected_swings = projected_multiple(swings)
+
+    gradient = projected_multiple_gradient(base)
+    indices = pd.DataFrame({
+        'first_order': first_order,
+        'total_effect': total_effect,
+        'derivative': [gradient[name] for name in SENSITIVITY_INPUTS],
+        'low': quantiles[:, 0],
+        'high': quantiles[:, 1],
+        'projected_low': projected_swings[:k],
+        'projected_high': projected_swings[k:],
+    }, index=pd.Index(SENSITIVITY_INPUTS, name='input'))
+    indices['swing'] = (indices['projected_high'] - indices['projected_low']).abs()
+
+    return SensitivityResult(
+        indices=indices,
+        base_projected=float(projected_multiple(base_row[None, :])[0]),
+        mean=float(np.mean(np.concatenate([f_a, f_b]))),
+        variance=variance,
+        n_samples=int(n_samples),
+        sampler=sampler,
+    )
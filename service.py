@@ -0,0 +1,421 @@
+"""
+Local HTTP scoring service for deal-pipeline tooling.
+
+Exposes the Exit-AI-R score, valuation projection and narrative functions used by the app as JSON
+endpoints on a stdlib ThreadingHTTPServer with HTTP/1.1 keep-alive. Every connection is served by
+its own thread, but scores and projections are not computed there: requests are queued to a
+MicroBatcher whose workers take everything pending (up to --max-batch requests, waiting at most
+--batch-wait-ms for more) and compute it in one vectorized calculate_exit_air_scores /
+project_valuation_impact call. Under concurrent load, thousands of small requests per second
+become a few hundred NumPy calls. With --processes N, N servers share the port (SO_REUSEPORT) to
+use more than one core.
+
+Endpoints (JSON in, JSON out; POST bodies may also be a JSON array of objects):
+    POST /v1/score       visible_score, documented_score, sustainable_score (0-100), optional
+                         w_visible, w_documented, w_sustainable (>= 0, default 0.35/0.40/0.25) and,
+                         for the projected multiple, baseline_ebitda_multiple (0-20) and
+                         ai_premium_coefficient (0-5)
+    POST /v1/valuation   exit_ai_r_score (0-100), baseline_ebitda_multiple, ai_premium_coefficient
+    POST /v1/narrative   the /v1/score fields plus company_name, baseline_ebitda_multiple and
+                         ai_premium_coefficient; optional persona_name, firm_name, sector, deal_size
+    GET  /healthz        liveness and batching statistics
+
+Usage:
+    python service.py [--host 127.0.0.1] [--port 8765] [--workers 2] [--processes 1]
+                      [--max-batch 1024] [--batch-wait-ms 0] [--keep-alive 15]
+"""
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from narrative import build_ai_exit_narrative
+from peer_index import load_peer_index
+from scoring import SCORE_COLUMNS, WEIGHT_COLUMNS, calculate_exit_air_scores, project_valuation_impact
+
+SERVICE_HOST = os.environ.get("QULAB_SERVICE_HOST", "127.0.0.1")
+SERVICE_PORT = int(os.environ.get("QULAB_SERVICE_PORT", 8765))
+SERVICE_WORKERS = int(os.environ.get("QULAB_SERVICE_WORKERS", 2))
+SERVICE_MAX_BATCH = int(os.environ.get("QULAB_SERVICE_MAX_BATCH", 1024))
+SERVICE_BATCH_WAIT_MS = float(os.environ.get("QULAB_SERVICE_BATCH_WAIT_MS", 0.0))
+SERVICE_KEEP_ALIVE = float(os.environ.get("QULAB_SERVICE_KEEP_ALIVE", 15.0))
+# Largest accepted request body
+MAX_BODY_BYTES = 8 * 1024 * 1024
+
+DEFAULT_WEIGHTS = dict(zip(WEIGHT_COLUMNS, (0.35, 0.40, 0.25)))
+VALUATION_FIELDS = ['baseline_ebitda_multiple', 'ai_premium_coefficient']
+# Accepted (low, high) range of each valuation input, as in the app's section 4 widgets
+VALUATION_BOUNDS = {'baseline_ebitda_multiple': (0, 20), 'ai_premium_coefficient': (0, 5)}
+
+_STOP = object()
+
+
+class RequestError(ValueError):
+    """Invalid request; reported to the client with `status` and the message."""
+
+    def __init__(self, message, status=HTTPStatus.BAD_REQUEST):
+        super().__init__(message)
+        self.status = status
+
+
+def _number(body, field, low=None, high=None):
+    value = body.get(field)
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        raise RequestError(f"'{field}' must be a finite number.")
+    if high is None and low is not None and value < low:
+        raise RequestError(f"'{field}' must be at least {low}.")
+    if (low is not None and value < low) or (high is not None and value > high):
+        raise RequestError(f"'{field}' must be between {low} and {high}.")
+    return float(value)
+
+
+def parse_score_request(body):
+    """Validated /v1/score fields of one request object: scores, weights and the optional valuation inputs."""
+    if not isinstance(body, dict):
+        raise RequestError("Each request must be a JSON object.")
+    row = {col: _number(body, col, 0, 100) for col in SCORE_COLUMNS}
+    row.update({col: _number(body, col, 0) if col in body else default for col, default in DEFAULT_WEIGHTS.items()})
+    given = [field for field in VALUATION_FIELDS if field in body]
+    if given and len(given) < len(VALUATION_FIELDS):
+        raise RequestError("Give both 'baseline_ebitda_multiple' and 'ai_premium_coefficient' for a projected multiple.")
+    row.update({field: _number(body, field, *VALUATION_BOUNDS[field]) for field in given})
+    return row
+
+
+def parse_valuation_request(body):
+    """Validated /v1/valuation fields of one request object."""
+    if not isinstance(body, dict):
+        raise RequestError("Each request must be a JSON object.")
+    return {
+        'exit_ai_r_score': _number(body, 'exit_ai_r_score', 0, 100),
+        **{field: _number(body, field, *VALUATION_BOUNDS[field]) for field in VALUATION_FIELDS},
+    }
+
+
+def score_batch(rows):
+    """Scores parsed /v1/score rows in one vectorized pass; returns one result dict per row."""
+    columns = np.array([[row[col] for col in SCORE_COLUMNS + WEIGHT_COLUMNS] for row in rows]).T
+    result = calculate_exit_air_scores(*columns)
+    projected = {}
+    with_valuation = [i for i, row in enumerate(rows) if VALUATION_FIELDS[0] in row]
+    if with_valuation:
+        baseline, coeff = np.array([[rows[i][field] for field in VALUATION_FIELDS] for i in with_valuation]).T
+        projected = dict(zip(with_valuation, project_valuation_impact(result.score[with_valuation], baseline, coeff).tolist()))
+
+    fields = zip(
+        result.score.tolist(), result.w_v.tolist(), result.w_d.tolist(), result.w_s.tolist(),
+        result.normalized_mask.tolist(), result.zero_weight_mask.tolist()
+    )
+    results = []
+    for i, (score, w_v, w_d, w_s, normalized, zero_sum) in enumerate(fields):
+        item = {
+            'exit_ai_r_score': score, 'w_visible_norm': w_v, 'w_documented_norm': w_d, 'w_sustainable_norm': w_s,
+            'weights_normalized': normalized, 'weights_zero_sum': zero_sum,
+        }
+        if i in projected:
+            item['projected_ebitda_multiple'] = projected[i]
+        results.append(item)
+    return results
+
+
+def valuation_batch(rows):
+    """Projects parsed /v1/valuation rows in one vectorized pass."""
+    score, baseline, coeff = np.array([[row['exit_ai_r_score'], *(row[f] for f in VALUATION_FIELDS)] for row in rows]).T
+    return [{'projected_ebitda_multiple': value} for value in project_valuation_impact(score, baseline, coeff).tolist()]
+
+
+class _Pending:
+    __slots__ = ('payload', 'result', 'error', 'done')
+
+    def __init__(self, payload):
+        self.payload = payload
+        self.result = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent calls into batches for `batch_func(payloads) -> results`. Each of
+    `workers` threads takes the oldest pending payload plus everything queued behind it (up to
+    `max_batch`, waiting up to `max_wait` seconds for more) and computes them in one call. With
+    `max_wait=0` an idle service adds no latency and batches grow only as requests pile up.
+    """
+
+    def __init__(self, batch_func, max_batch=SERVICE_MAX_BATCH, max_wait=SERVICE_BATCH_WAIT_MS / 1000,
+                 workers=SERVICE_WORKERS, name="batcher"):
+        self.batch_func = batch_func
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.n_batches = 0
+        self.n_items = 0
+        self.max_batch_seen = 0
+        self._queue = queue.SimpleQueue()
+        self._stats_lock = threading.Lock()
+        self._threads = [
+            threading.Thread(target=self._work, name=f"{name}-{i}", daemon=True) for i in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, payloads):
+        """Computes `payloads` (a list) as part of one or more batches; returns their results in order."""
+        pending = [_Pending(payload) for payload in payloads]
+        for item in pending:
+            self._queue.put(item)
+        for item in pending:
+            item.done.wait()
+            if item.error is not None:
+                raise item.error
+        return [item.result for item in pending]
+
+    def _collect(self, first):
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+        while len(batch) < self.max_batch:
+            try:
+                remaining = deadline - time.perf_counter()
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                self._queue.put(_STOP) # Stop after this batch
+                break
+            batch.append(item)
+        return batch
+
+    def _work(self):
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            batch = self._collect(first)
+            try:
+                results = self.batch_func([item.payload for item in batch])
+            except Exception as e:
+                for item in batch:
+                    item.error = e
+            else:
+                for item, result in zip(batch, results):
+                    item.result = result
+            with self._stats_lock:
+                self.n_batches += 1
+                self.n_items += len(batch)
+                self.max_batch_seen = max(self.max_batch_seen, len(batch))
+            for item in batch:
+                item.done.set()
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                'batches': self.n_batches, 'requests': self.n_items, 'max_batch': self.max_batch_seen,
+                'mean_batch': self.n_items / self.n_batches if self.n_batches else 0.0,
+            }
+
+    def close(self):
+        """Stops the worker threads once the queued payloads are done."""
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+
+
+class ScoringRequestHandler(BaseHTTPRequestHandler):
+    """JSON endpoints over HTTP/1.1; connections stay open for `server.keep_alive` idle seconds."""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "QuLabScoring/1.0"
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        self.timeout = self.server.keep_alive
+        super().setup()
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status, payload):
+        # Strict JSON: a NaN or infinity is an error rather than a token clients cannot parse
+        body = json.dumps(payload, allow_nan=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if self.close_connection:
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _content_length(self):
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            # Where the body ends is unknown, so the connection cannot be reused
+            self.close_connection = True
+            raise RequestError("Invalid Content-Length header.")
+        return length
+
+    def _read_json(self):
+        length = self._content_length()
+        if length == 0:
+            raise RequestError("Request body must be JSON.")
+        if length > MAX_BODY_BYTES:
+            # The body is left unread, so the connection cannot be reused
+            self.close_connection = True
+            raise RequestError("Request body is too large.", HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+        try:
+            return json.loads(self.rfile.read(length))
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise RequestError(f"Invalid JSON: {e}")
+
+    def do_GET(self):
+        if self.path != '/healthz':
+            self._send_json(HTTPStatus.NOT_FOUND, {'error': f"Unknown endpoint '{self.path}'."})
+            return
+        self._send_json(HTTPStatus.OK, {'status': 'ok', **self.server.stats()})
+
+    def do_POST(self):
+        handler = self.server.routes.get(self.path)
+        try:
+            if handler is None:
+                # Drain the body so the keep-alive connection stays usable
+                self.rfile.read(self._content_length())
+                raise RequestError(f"Unknown endpoint '{self.path}'.", HTTPStatus.NOT_FOUND)
+            body = self._read_json()
+            # An array is answered with an array, in order
+            results = handler(body if isinstance(body, list) else [body])
+            self._send_json(HTTPStatus.OK, results if isinstance(body, list) else results[0])
+        except RequestError as e:
+            self._send_json(e.status, {'error': str(e)})
+        except Exception as e:
+            self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {'error': f"{type(e).__name__}: {e}"})
+
+
+class ScoringServer(ThreadingHTTPServer):
+    """ThreadingHTTPServer with one score and one valuation MicroBatcher shared by all connections."""
+
+    daemon_threads = True
+    request_queue_size = 512
+
+    def __init__(self, address=(SERVICE_HOST, SERVICE_PORT), workers=SERVICE_WORKERS, max_batch=SERVICE_MAX_BATCH,
+                 batch_wait_ms=SERVICE_BATCH_WAIT_MS, keep_alive=SERVICE_KEEP_ALIVE, reuse_port=False, verbose=False):
+        self.allow_reuse_port = reuse_port
+        super().__init__(address, ScoringRequestHandler)
+        self.keep_alive = keep_alive
+        self.verbose = verbose
+        self.score_batcher = MicroBatcher(score_batch, max_batch, batch_wait_ms / 1000, workers, name="score")
+        self.valuation_batcher = MicroBatcher(valuation_batch, max_batch, batch_wait_ms / 1000, workers, name="valuation")
+        self.routes = {
+            '/v1/score': self.score,
+            '/v1/valuation': self.valuation,
+            '/v1/narrative': self.narrative,
+        }
+        self.started_at = time.time()
+
+    def score(self, bodies):
+        return self.score_batcher.submit([parse_score_request(body) for body in bodies])
+
+    def valuation(self, bodies):
+        return self.valuation_batcher.submit([parse_valuation_request(body) for body in bodies])
+
+    def narrative(self, bodies):
+        rows = []
+        for body in bodies:
+            row = parse_score_request(body)
+            if VALUATION_FIELDS[0] not in row:
+                raise RequestError("Narratives need 'baseline_ebitda_multiple' and 'ai_premium_coefficient'.")
+            if not isinstance(body.get('company_name'), str) or not body['company_name'].strip():
+                raise RequestError("'company_name' must be a non-empty string.")
+            rows.append(row)
+        scored = self.score_batcher.submit(rows)
+        peers = load_peer_index() if any('sector' in body for body in bodies) else None
+
+        results = []
+        for body, row, result in zip(bodies, rows, scored):
+            peer_context = None
+            if peers is not None and 'sector' in body:
+                peer_context = peers.peer_context(
+                    {'exit_ai_r_score': result['exit_ai_r_score'], **{col: row[col] for col in SCORE_COLUMNS}},
+                    body['sector'], body.get('deal_size'), weights=tuple(row[col] for col in WEIGHT_COLUMNS)
+                )
+            narrative = build_ai_exit_narrative(
+                body['company_name'], result['exit_ai_r_score'], row['visible_score'], row['documented_score'],
+                row['sustainable_score'], row['baseline_ebitda_multiple'], result['projected_ebitda_multiple'],
+                row['ai_premium_coefficient'], body.get('persona_name', "Jane Doe"), body.get('firm_name', "Alpha Capital"),
+                peer_context=peer_context
+            )
+            results.append({**result, 'narrative': narrative})
+        return results
+
+    def stats(self):
+        return {
+            'pid': os.getpid(),
+            'uptime_seconds': time.time() - self.started_at,
+            'score_batches': self.score_batcher.stats(),
+            'valuation_batches': self.valuation_batcher.stats(),
+        }
+
+    def server_close(self):
+        super().server_close()
+        self.score_batcher.close()
+        self.valuation_batcher.close()
+
+
+def _serve(host, port, options):
+    server = ScoringServer((host, port), **options)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local HTTP service for Exit-AI-R scoring, valuation and narratives.")
+    parser.add_argument('--host', default=SERVICE_HOST)
+    parser.add_argument('--port', type=int, default=SERVICE_PORT)
+    parser.add_argument('--workers', type=int, default=SERVICE_WORKERS, help="Batch worker threads per endpoint and process.")
+    parser.add_argument('--processes', type=int, default=1, help="Server processes sharing the port (SO_REUSEPORT).")
+    parser.add_argument('--max-batch', type=int, default=SERVICE_MAX_BATCH, help="Most requests computed in one batch.")
+    parser.add_argument('--batch-wait-ms', type=float, default=SERVICE_BATCH_WAIT_MS, help="How long a batch waits for more requests.")
+    parser.add_argument('--keep-alive', type=float, default=SERVICE_KEEP_ALIVE, help="Idle seconds before a keep-alive connection is closed.")
+    parser.add_argument('--verbose', action='store_true', help="Log every request.")
+    args = parser.parse_args(argv)
+
+    options = dict(
+        workers=args.workers, max_batch=args.max_batch, batch_wait_ms=args.batch_wait_ms,
+        keep_alive=args.keep_alive, reuse_port=args.processes > 1, verbose=args.verbose,
+    )
+    print(f"Serving Exit-AI-R scoring on http://{args.host}:{args.port} ({args.processes} process(es))", file=sys.stderr)
+    if args.processes <= 1:
+        _serve(args.host, args.port, options)
+        return 0
+    processes = [
+        multiprocessing.Process(target=_serve, args=(args.host, args.port, options), daemon=True)
+        for _ in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,56 @@
+import numpy as np
+from collections import namedtuple
+
+from scoring import calculate_exit_air_scores, project_valuation_impact
+
+# Result of a sensitivity sweep:
+# - weights:   (n_weights, 3) array of (w_visible, w_documented, w_sustainable) points on the simplex
+# - deltas:    (n_deltas,) AI premium coefficients
+# - baselines: (n_baselines,) baseline EBITDA multiples
+# - scores:    (n_weights,) Exit-AI-R score for each weight point
+# - projected: (n_weights, n_deltas, n_baselines) projected EBITDA multiples
+SweepResult = namedtuple('SweepResult', ['weights', 'deltas', 'baselines', 'scores', 'projected'])
+
+
+def weight_simplex_grid(resolution=0.01):
+    """
+    Returns every weight triplet on a regular grid over the simplex w_v + w_d + w_s = 1.
+    The resolution must divide 1.0 evenly; a 1% grid yields 5,151 points.
+    """
+    n_steps = int(round(1.0 / resolution))
+    if n_steps < 1 or not np.isclose(n_steps * resolution, 1.0):
+        raise ValueError("Resolution must divide 1.0 evenly, e.g. 0.01, 0.05 or 0.1.")
+
+    i, j = np.meshgrid(np.arange(n_steps + 1), np.arange(n_steps + 1), indexing='ij')
+    on_simplex = i + j <= n_steps
+    i, j = i[on_simplex], j[on_simplex]
+    return np.column_stack([i, j, n_steps - i - j]) / n_steps
+
+
+def run_sensitivity_sweep(visible, documented, sustainable, resolution=0.01, deltas=(2.0,), baselines=(7.0,)):
+    """
+    Evaluates the Exit-AI-R score for every weight point on the simplex and the projected multiple
+    for every (weight point, delta, baseline) combination as broadcasted array operations.
+    """
+    weights = weight_simplex_grid(resolution)
+    deltas = np.atleast_1d(np.asarray(deltas, dtype=float))
+    baselines = np.atleast_1d(np.asarray(baselines, dtype=float))
+
+    scores = calculate_exit_air_scores(
+        visible, documented, sustainable, weights[:, 0], weights[:, 1], weights[:, 2]
+    ).score
+    projected = project_valuation_impact(
+        scores[:, None, None], baselines[None, None, :], deltas[None, :, None]
+    )
+    return SweepResult(weights, deltas, baselines, scores, projected)
+
+
+def simplex_to_cartesian(weights):
+    """
+    Maps (w_visible, w_documented, w_sustainable) triplets to 2-D coordinates of an equilateral
+    triangle with Visible at (0, 0), Documented at (1, 0) and Sustainable at (0.5, sqrt(3)/2).
+    """
+    weights = np.asarray(weights, dtype=float)
+    x = weights[:, 1] + weights[:, 2] / 2
+    y = weights[:, 2] * np.sqrt(3) / 2
+    return x, y
@@ -0,0 +1,97 @@
+from contextlib import closing
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from assessment_store import AssessmentStore
+
+
+def _assessment(company="InnovateTech", score=71.0, **overrides):
+    assessment = {
+        'persona_name': "Jane Doe", 'firm_name': "Alpha Capital", 'company_name': company,
+        'visible_score': 75, 'documented_score': 60, 'sustainable_score': 80,
+        'w_visible': 0.35, 'w_documented': 0.40, 'w_sustainable': 0.25,
+        'baseline_ebitda_multiple': 7.0, 'ai_premium_coefficient': 2.0,
+        'exit_ai_r_score': score, 'projected_ebitda_multiple': 7.0 + 2.0 * score / 100,
+        'narrative': "Report text",
+    }
+    assessment.update(overrides)
+    return assessment
+
+
+def test_save_and_get_round_trip(tmp_path):
+    """A saved assessment comes back with its id, timestamp and narrative."""
+    store = AssessmentStore(tmp_path / "assessments.db")
+    assessment_id = store.save(_assessment(score=np.float64(70.25)), created_at="2025-03-01T10:00:00")
+
+    saved = store.get(assessment_id)
+    assert saved['id'] == assessment_id
+    assert saved['created_at'] == "2025-03-01T10:00:00"
+    assert saved['exit_ai_r_score'] == pytest.approx(70.25)
+    assert saved['narrative'] == "Report text"
+    assert store.get(assessment_id + 1) is None
+    assert store.delete(assessment_id) and store.count() == 0
+
+
+def test_bulk_insert_filters_and_pagination(tmp_path):
+    """Bulk-inserted rows are filtered, sorted and paged in SQL."""
+    store = AssessmentStore(tmp_path / "assessments.db")
+    rng = np.random.default_rng(0)
+    n = 20_000
+    portfolio = pd.DataFrame({
+        'firm_name': np.where(np.arange(n) % 2 == 0, "Alpha Capital", "Beta Partners"),
+        'company_name': [f"Company {i:05d}" for i in range(n)],
+        'visible_score': rng.integers(0, 101, n), 'documented_score': rng.integers(0, 101, n),
+        'sustainable_score': rng.integers(0, 101, n),
+        'w_visible': 0.35, 'w_documented': 0.40, 'w_sustainable': 0.25,
+        'exit_ai_r_score': rng.uniform(0, 100, n),
+    })
+    assert store.save_many(portfolio, created_at="2025-01-15T09:00:00", chunk_size=3_000) == n
+    store.save(_assessment("Company 00001 Follow-up", 99.5, firm_name="Gamma Growth"), created_at="2025-02-01T09:00:00")
+
+    assert store.count() == n + 1
+    assert store.count(firm="Beta Partners") == n // 2
+    assert store.count(company_prefix="Company 0000") == 11
+    assert store.count(date_from="2025-02-01") == 1
+    assert store.count(date_to="2025-01-15") == n
+
+    expected = portfolio[(portfolio['firm_name'] == "Alpha Capital") & (portfolio['exit_ai_r_score'] >= 50)]
+    page = store.query(firm="Alpha Capital", min_score=50, order_by='exit_ai_r_score', page=2, page_size=25)
+    assert len(page) == 25
+    assert 'narrative' not in page.columns
+    np.testing.assert_allclose(page['exit_ai_r_score'], np.sort(expected['exit_ai_r_score'])[::-1][50:75])
+    assert store.count(firm="Alpha Capital", min_score=50) == len(expected)
+
+    compared = store.get_many(page['id'][:2])
+    assert list(compared['id']) == sorted(page['id'][:2])
+    with pytest.raises(ValueError):
+        store.query(order_by='narrative')
+
+
+def test_bulk_insert_is_all_or_nothing(tmp_path):
+    """A row without a company name in a later chunk fails the whole save, and no earlier chunk is kept."""
+    store = AssessmentStore(tmp_path / "assessments.db")
+    rows = [_assessment(f"Company {i}") for i in range(10)]
+    rows[7]['company_name'] = np.nan
+    with pytest.raises(ValueError, match="company_name"):
+        store.save_many(pd.DataFrame(rows), chunk_size=3)
+    with pytest.raises(ValueError, match="company_name"):
+        store.save_many(rows, chunk_size=3)
+    assert store.count() == 0
+    assert store.save_many(pd.DataFrame(rows[:7]), chunk_size=3) == 7 and store.count() == 7
+
+
+def test_filtered_queries_use_indexes(tmp_path):
+    """Company, firm, date and score filters are answered from an index, not a table scan."""
+    store = AssessmentStore(tmp_path / "assessments.db")
+    cases = [
+        ("company_name >= ? AND company_name < ?", ["Inno", "Inno\U0010ffff"]),
+        ("firm_name = ?", ["Alpha Capital"]),
+        ("created_at >= ?", ["2025-01-01"]),
+        ("exit_ai_r_score >= ?", [50.0]),
+    ]
+    with closing(store._connect()) as conn:
+        for where, params in cases:
+            plan = " ".join(row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN SELECT id FROM assessments WHERE {where}", params))
+            assert "USING INDEX" in plan or "USING COVERING INDEX" in plan, (where, plan)
@@ -0,0 +1,50 @@
+import datetime
+
+import pandas as pd
+import pytest
+
+from baselines import DEFAULT_BASELINE_SOURCE, build_baseline_table, load_baseline_table
+
+
+def _write_table(tmp_path, rows):
+    source = tmp_path / "baselines.csv"
+    pd.DataFrame(rows, columns=['sector', 'sub_sector', 'as_of', 'ebitda_multiple']).to_csv(source, index=False)
+    target = tmp_path / "baselines.arrow"
+    build_baseline_table(source, target)
+    return load_baseline_table(target)
+
+
+def test_step_and_interpolated_lookups(tmp_path):
+    """Lookups take the last observation on or before the date, or interpolate between quarters."""
+    table = _write_table(tmp_path, [
+        # Deliberately unsorted; the build sorts by sector, sub-sector and date
+        ("Software", "Apps", "2024-06-30", 12.0),
+        ("Software", "Apps", "2024-03-31", 10.0),
+        ("Software", "Services", "2024-03-31", 8.0),
+        ("Software", "Services", "2024-06-30", 8.0),
+        ("Retail", "Grocery", "2024-03-31", 6.0),
+    ])
+    assert table.sectors == ["Retail", "Software"] and table.sub_sectors("Software") == ["Apps", "Services"]
+    assert table.date_range("Software") == (datetime.date(2024, 3, 31), datetime.date(2024, 6, 30))
+
+    as_of = datetime.date(2024, 5, 15)
+    assert table.baseline_multiple("Software", "Apps", as_of) == 10.0
+    assert table.baseline_multiple("Software", "Apps", as_of, interpolate=True) == pytest.approx(10.0 + 2.0 * 45 / 91)
+    assert table.baseline_multiple("Software", "Apps", datetime.date(2020, 1, 1)) == 10.0
+    # Without a sub-sector the series are averaged; without a date the latest values are used
+    assert table.baseline_multiple("Software") == pytest.approx(10.0)
+    with pytest.raises(KeyError):
+        table.baseline_multiple("Energy")
+
+
+def test_bundled_table_is_mapped_once_and_matches_its_source():
+    """The shipped Arrow file is built from the shipped CSV and shared across calls."""
+    table = load_baseline_table()
+    assert table is load_baseline_table()
+    source = pd.read_csv(DEFAULT_BASELINE_SOURCE)
+    assert len(table.table) == len(source)
+    latest = source[source['sector'] == "Software"].sort_values('as_of').groupby('sub_sector')['ebitda_multiple'].last()
+    assert table.baseline_multiple("Software") == pytest.approx(latest.mean())
+    # Multiples are read in place from the mapped file rather than copied
+    assert not table._multiples.flags.owndata
+    assert load_baseline_table("does/not/exist.arrow") is None
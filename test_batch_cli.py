@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+from batch_cli import main, run_batch
+from narrative import build_ai_exit_narrative
+
+
+def make_portfolio(n=25):
+    """Builds a small portfolio with deterministic scores."""
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        'company_name': [f"Co{i}" for i in range(n)],
+        'visible_score': rng.integers(0, 101, n),
+        'documented_score': rng.integers(0, 101, n),
+        'sustainable_score': rng.integers(0, 101, n),
+    })
+
+
+def test_csv_batch_is_chunked_and_matches_formulas(tmp_path):
+    """
+    Verifies chunked CSV scoring against the Exit-AI-R and valuation formulas.
+    """
+    portfolio = make_portfolio()
+    portfolio.to_csv(tmp_path / "in.csv", index=False)
+
+    summary = run_batch(tmp_path / "in.csv", tmp_path / "out.csv", weights=(0.35, 0.40, 0.25), baseline=8.0, delta=3.0, chunk_size=10)
+    scored = pd.read_csv(tmp_path / "out.csv")
+
+    assert summary['rows'] == 25 and summary['chunks'] == 3
+    expected_score = 0.35 * portfolio['visible_score'] + 0.40 * portfolio['documented_score'] + 0.25 * portfolio['sustainable_score']
+    assert np.allclose(scored['exit_ai_r_score'], expected_score)
+    assert np.allclose(scored['projected_ebitda_multiple'], 8.0 + 3.0 * expected_score / 100)
+
+
+def test_parquet_batch_with_narratives(tmp_path):
+    """
+    Tests Parquet input/output and that the narrative column matches the app's report template.
+    """
+    make_portfolio(5).to_parquet(tmp_path / "in.parquet", index=False)
+
+    run_batch(tmp_path / "in.parquet", tmp_path / "out.parquet", chunk_size=2, with_narrative=True)
+    scored = pd.read_parquet(tmp_path / "out.parquet")
+
+    row = scored.iloc[3]
+    expected = build_ai_exit_narrative(
+        row['company_name'], row['exit_ai_r_score'], row['visible_score'], row['documented_score'],
+        row['sustainable_score'], 7.0, row['projected_ebitda_multiple'], 2.0, "Jane Doe", "Alpha Capital"
+    )
+    assert len(scored) == 5
+    assert row['narrative'] == expected
+
+
+def test_cli_reports_invalid_input(tmp_path, capsys):
+    """
+    Tests that the CLI exits with an error for a file missing score columns.
+    """
+    pd.DataFrame({'visible_score': [1]}).to_csv(tmp_path / "bad.csv", index=False)
+
+    assert main([str(tmp_path / "bad.csv"), str(tmp_path / "out.csv")]) == 1
+    assert "missing required score columns" in capsys.readouterr().err
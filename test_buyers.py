@@ -0,0 +1,76 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from buyers import DEFAULT_BUYERS, Buyer, BuyerLibrary, load_buyer_library, synthetic_buyer_library
+from scoring import calculate_exit_air_scores, project_valuation_impact
+
+SMALL_LIBRARY = BuyerLibrary([
+    Buyer('tech', "Tech Strategic", "Strategic", 0.6, 0.2, 0.2, 3.0),
+    Buyer('pe', "Buyout Fund", "Financial", 2.0, 5.0, 3.0, 2.0),
+    Buyer('none', "No Interest", "Financial", 0.0, 0.0, 0.0, 2.0),
+])
+
+
+def test_matrix_matches_per_buyer_valuation():
+    """Every (buyer, company) cell equals calculate_exit_air_scores -> project_valuation_impact with that buyer's inputs."""
+    library = synthetic_buyer_library(40, seed=3)
+    scores = np.random.default_rng(1).uniform(0, 100, size=(25, 3))
+    baselines = np.random.default_rng(2).uniform(5, 12, size=25)
+    valuation = library.value(scores, baselines)
+    assert valuation.projected.shape == (40, 25)
+    for i, buyer in enumerate(library.buyers):
+        air = calculate_exit_air_scores(*scores.T, buyer.w_visible, buyer.w_documented, buyer.w_sustainable).score
+        np.testing.assert_allclose(valuation.exit_air[i], air)
+        np.testing.assert_allclose(valuation.projected[i], project_valuation_impact(air, baselines, buyer.delta))
+
+    # Unnormalized weights are normalized and zero weights score 0, as for a single triplet
+    small = SMALL_LIBRARY.value([[75, 60, 80]], 7.0)
+    assert small.exit_air[1, 0] == pytest.approx(0.2 * 75 + 0.5 * 60 + 0.3 * 80)
+    assert small.exit_air[2, 0] == 0 and small.projected[2, 0] == pytest.approx(7.0)
+
+
+def test_best_buyers_are_ranked_per_company():
+    """The ranking lists each company's top buyers by projected multiple, best first."""
+    portfolio = pd.DataFrame({
+        'company_name': ["Visible Co", "Documented Co"],
+        'visible_score': [95, 10], 'documented_score': [10, 95], 'sustainable_score': [50, 50],
+        'baseline_ebitda_multiple': [7.0, 9.0],
+    })
+    valuation = SMALL_LIBRARY.value_portfolio(portfolio)
+    ranked = SMALL_LIBRARY.best_buyers(valuation, top_n=2)
+    assert list(ranked['company_name']) == ["Visible Co", "Visible Co", "Documented Co", "Documented Co"]
+    assert list(ranked['rank']) == [1, 2, 1, 2]
+    assert list(ranked['buyer_id']) == ['tech', 'pe', 'pe', 'tech']
+    np.testing.assert_allclose(ranked['uplift_vs_baseline'], ranked['projected_ebitda_multiple'] - [7, 7, 9, 9])
+
+    # Agrees with a full sort on a larger library
+    library = synthetic_buyer_library(200, seed=5)
+    valuation = library.value(np.random.default_rng(0).uniform(0, 100, size=(50, 3)), 7.0)
+    ranked = library.best_buyers(valuation, top_n=10)
+    expected = np.sort(valuation.projected, axis=0)[::-1][:10].T.ravel()
+    np.testing.assert_allclose(ranked['projected_ebitda_multiple'], expected)
+
+
+def test_library_loading_and_validation(tmp_path):
+    """The bundled config loads, edited tables round-trip and invalid buyers are rejected."""
+    library = load_buyer_library(DEFAULT_BUYERS)
+    assert library is not None and len(library) >= 20
+    assert load_buyer_library(tmp_path / "missing.json") is None
+
+    path = tmp_path / "buyers.json"
+    path.write_text(json.dumps({'buyers': [
+        {'id': 'a', 'name': "A", 'type': "Strategic", 'w_visible': 1, 'w_documented': 1, 'w_sustainable': 2, 'delta': 2.5},
+    ]}))
+    loaded = load_buyer_library(path)
+    np.testing.assert_allclose(loaded.weights, [[0.25, 0.25, 0.5]])
+    assert BuyerLibrary.from_frame(loaded.to_frame()).buyers == loaded.buyers
+
+    with pytest.raises(ValueError, match="unique"):
+        BuyerLibrary([SMALL_LIBRARY.buyers[0], SMALL_LIBRARY.buyers[0]])
+    with pytest.raises(ValueError, match="non-negative"):
+        BuyerLibrary([Buyer('x', "X", "", -0.5, 1.0, 0.5, 2.0)])
+    with pytest.raises(ValueError, match="missing required columns"):
+        BuyerLibrary.from_frame(pd.DataFrame({'id': ['x']}))
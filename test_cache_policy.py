@@ -0,0 +1,77 @@
+import numpy as np
+
+from cache_policy import bounded_cache, cache_stats, clear_all_caches, estimate_size, CACHE_REGISTRY
+
+
+def test_bounded_cache_memoizes_and_caps_entries():
+    """
+    Verifies memoization and that distinct free-text keys cannot grow the cache past max_entries.
+    """
+    calls = []
+
+    @bounded_cache("test_names", max_entries=3, ttl_seconds=None)
+    def greet(name):
+        calls.append(name)
+        return f"Hello {name}"
+
+    for name in ["I", "In", "Inn", "Inno", "Innov"]: # One entry per keystroke
+        greet(name)
+    assert greet("Innov") == "Hello Innov"
+
+    stats = greet.cache.stats()
+    assert stats['entries'] == 3
+    assert stats['evictions'] == 2
+    assert stats['hits'] == 1
+    assert len(calls) == 5
+
+
+def test_bounded_cache_enforces_memory_ceiling():
+    """
+    Tests that entries are evicted once their estimated size exceeds the memory ceiling.
+    """
+    @bounded_cache("test_arrays", max_entries=100, max_bytes=10_000)
+    def zeros(n):
+        return np.zeros(n)
+
+    zeros(500) # 4,000 bytes
+    zeros(600) # 4,800 bytes
+    zeros(700) # 5,600 bytes -> oldest entries evicted to stay under 10,000 bytes
+
+    stats = zeros.cache.stats()
+    assert stats['current_bytes'] <= 10_000
+    assert stats['entries'] == 1
+
+
+def test_redefined_function_reuses_cache_and_caches_none():
+    """
+    Tests that redefining a decorated function (as every Streamlit rerun does) keeps its cache,
+    and that a None result is cached rather than treated as a miss.
+    """
+    calls = []
+
+    def define():
+        @bounded_cache("test_rerun")
+        def maybe(x):
+            calls.append(x)
+            return None
+        return maybe
+
+    define()(1)
+    define()(1)
+    assert calls == [1]
+    assert define().cache is CACHE_REGISTRY["test_rerun"]
+
+
+def test_cache_stats_and_clear_all():
+    """
+    Tests the admin statistics table and clearing every registered cache.
+    """
+    @bounded_cache("test_admin")
+    def square(x):
+        return x * x
+
+    square(3)
+    assert cache_stats().loc["test_admin", "entries"] == 1
+    clear_all_caches()
+    assert cache_stats().loc["test_admin", "entries"] == 0
+    assert estimate_size(np.zeros(10)) == 80
@@ -0,0 +1,59 @@
+import json
+
+from buyers import Buyer, BuyerLibrary
+from charts import buyer_heatmap_spec, dimension_scores_spec, iso_multiple_spec, render_valuation_comparison, valuation_comparison_spec
+from inverse import iso_multiple_line
+
+
+def test_vega_specs_carry_the_plotted_values():
+    """The client-side specs are plain JSON holding the same data and labels as the static charts."""
+    spec = dimension_scores_spec({'Visible': 75, 'Documented': 60, 'Sustainable': 80}, "InnovateTech")
+    assert json.loads(json.dumps(spec)) == spec
+    assert spec['title'] == "InnovateTech's AI Exit-Readiness Dimension Scores"
+    assert [row['Score'] for row in spec['data']['values']] == [75.0, 60.0, 80.0]
+    assert spec['encoding']['y']['scale'] == {'domain': [0, 100]}
+
+    spec = valuation_comparison_spec(7.0, 8.405, "InnovateTech")
+    assert [row['Value'] for row in spec['data']['values']] == [7.0, 8.405]
+    assert spec['encoding']['y']['title'] == "EBITDA Multiple (x)"
+
+
+def test_iso_multiple_spec_draws_line_region_and_points():
+    """The iso-multiple spec holds the line's end points, the shaded target side, the current scores and the fixes."""
+    line_x, line_y = iso_multiple_line(80.0, 0.35, 0.40, fixed_contribution=0.25 * 80)
+    spec = iso_multiple_spec(line_x, line_y, (75, 60), {'Visible': (95.0, 60.0)}, ('Visible', 'Documented'), 8.6, "InnovateTech")
+    assert json.loads(json.dumps(spec)) == spec
+    marks = [layer['mark']['type'] for layer in spec['layer']]
+    assert marks == ['area', 'line', 'rule', 'point', 'text', 'point']
+    line = spec['layer'][1]['data']['values']
+    assert [(p['x'], p['y']) for p in line] == [(line_x[0], line_y[0]), (line_x[-1], line_y[-1])]
+    assert spec['layer'][-1]['data']['values'] == [{'Series': "Current scores", 'x': 75.0, 'y': 60.0}]
+
+    # A target out of reach has no line, only the current scores
+    empty = iso_multiple_spec(*iso_multiple_line(150.0, 0.3, 0.3), (75, 60), {}, ('Visible', 'Documented'), 12.0, "InnovateTech")
+    assert [layer['mark']['type'] for layer in empty['layer']] == ['point']
+
+
+def test_buyer_heatmap_keeps_cells_of_duplicate_names():
+    """Buyers and companies sharing a name stay separate rows and columns, told apart by id or position."""
+    library = BuyerLibrary([
+        Buyer('fund_a', "Growth Fund", "Financial", 0.2, 0.5, 0.3, 2.0),
+        Buyer('fund_b', "Growth Fund", "Financial", 0.5, 0.2, 0.3, 3.0),
+        Buyer('tech', "Tech Strategic", "Strategic", 0.6, 0.2, 0.2, 3.0),
+    ])
+    valuation = library.value([[75, 60, 80], [40, 90, 50], [60, 60, 60]], 7.0, companies=["Acme", "Acme", "Beta"])
+    matrix = library.matrix_frame(valuation)
+    assert list(matrix.index.get_level_values('buyer_id')) == ['fund_a', 'fund_b', 'tech']
+    assert list(matrix.columns.get_level_values('company')) == [0, 1, 2]
+
+    spec = buyer_heatmap_spec(matrix.iloc[[2, 0, 1], [1, 0, 2]], "Top Buyers")
+    assert spec['encoding']['y']['sort'] == ["Tech Strategic", "Growth Fund (fund_a)", "Growth Fund (fund_b)"]
+    assert spec['encoding']['x']['sort'] == ["Acme (1)", "Acme (0)", "Beta"]
+    cells = {(row['Buyer'], row['Company']): row['Value'] for row in spec['data']['values']}
+    assert len(cells) == 9 and cells[("Growth Fund (fund_b)", "Acme (1)")] == valuation.projected[1, 1]
+
+
+def test_static_export_still_renders_with_matplotlib():
+    """Static export keeps the server-rendered PNG and SVG output."""
+    assert render_valuation_comparison(7.0, 8.405, "InnovateTech").startswith(b'\x89PNG')
+    assert b'<svg' in render_valuation_comparison(7.0, 8.405, "InnovateTech", fmt='svg')
@@ -0,0 +1,84 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from history import METRIC_COLUMNS, SNAPSHOT_FILE, ScoreHistory, quarter_label, quarter_ordinal, synthetic_history
+
+
+def _metrics(score):
+    return {m: float(score) for m in METRIC_COLUMNS}
+
+
+def test_incremental_rollups_match_full_rebuild(tmp_path):
+    """Rolling means, QoQ deltas and fund averages are maintained on insert and agree with a rebuild from the log."""
+    history = ScoreHistory(tmp_path)
+    for quarter, score in [("2024Q1", 40), ("2024Q2", 50), ("2024Q4", 70), ("2025Q1", 80), ("2025Q2", 90)]:
+        history.append("Acme", quarter, fund="Fund I", **_metrics(score))
+    history.append("Globex", "2024Q2", fund="Fund I", **_metrics(20))
+    history.append("Initech", "2024Q2", fund="Fund II", **_metrics(60))
+    # A late insert into an earlier quarter and a reassessment within a quarter
+    history.append("Acme", "2023Q4", fund="Fund I", **_metrics(30))
+    history.append("Globex", "2024Q2", fund="Fund I", **_metrics(30))
+
+    trend = history.company_trend("Acme")
+    assert trend.index.tolist() == ["2023Q4", "2024Q1", "2024Q2", "2024Q4", "2025Q1", "2025Q2"]
+    assert trend['exit_ai_r_score'].tolist() == [30, 40, 50, 70, 80, 90]
+    assert trend['rolling_exit_ai_r_score'].tolist() == [30, 35, 40, 160 / 3, 200 / 3, 80]
+    assert np.isnan(trend.loc["2023Q4", 'qoq_exit_ai_r_score']) and np.isnan(trend.loc["2024Q4", 'qoq_exit_ai_r_score'])
+    assert trend.loc["2025Q1", 'qoq_exit_ai_r_score'] == 10
+
+    fund = history.fund_trend("Fund I")
+    assert fund.loc["2024Q2", 'exit_ai_r_score'] == 40 and fund.loc["2024Q2", 'n_companies'] == 2
+    assert history.fund_trend().loc["2024Q2", 'n_companies'] == 3
+    latest = history.latest().set_index('company_name')
+    assert latest.loc["Acme", 'quarter'] == "2025Q2" and latest.loc["Globex", 'exit_ai_r_score'] == 30
+    assert len(history.records()) == 9 # The log keeps superseded records
+
+    incremental = (history.company_trend("Acme"), history.fund_trend(), history.latest())
+    history.rebuild()
+    pd.testing.assert_frame_equal(history.company_trend("Acme"), incremental[0])
+    pd.testing.assert_frame_equal(history.fund_trend(), incremental[1])
+    pd.testing.assert_frame_equal(history.latest(), incremental[2])
+    with pytest.raises(KeyError):
+        history.company_trend("Umbrella")
+
+
+def test_snapshot_and_log_tail_replay(tmp_path):
+    """A new instance loads the snapshot, and every instance replays lines appended by others, skipping partial ones."""
+    frame = synthetic_history(n_companies=30, n_quarters=8, seed=4)
+    writer = ScoreHistory(tmp_path)
+    assert writer.append_many(frame) == 240
+    assert (tmp_path / SNAPSHOT_FILE).exists() and len(list(tmp_path.glob("*.jsonl"))) == 8
+
+    reader = ScoreHistory(tmp_path)
+    pd.testing.assert_frame_equal(reader.fund_trend(), writer.fund_trend())
+    writer.append("Company 0003", "2023Q1", fund="Alpha Capital Fund I", **_metrics(99))
+    assert reader.company_trend("Company 0003").index[-1] == "2023Q1"
+
+    # An unterminated line (a write in progress) is left for the next read
+    with open(tmp_path / "2023Q2.jsonl", 'a', encoding='utf-8') as f:
+        f.write('{"company_name": "Company 0004"')
+    assert reader.company_trend("Company 0004").index[-1] == "2022Q4"
+
+    (tmp_path / SNAPSHOT_FILE).unlink()
+    rebuilt = ScoreHistory(tmp_path)
+    for company in ("Company 0003", "Company 0010"):
+        pd.testing.assert_frame_equal(rebuilt.company_trend(company), reader.company_trend(company))
+    pd.testing.assert_frame_equal(rebuilt.fund_trend("Alpha Capital Fund II"), reader.fund_trend("Alpha Capital Fund II"))
+
+
+def test_quarters_and_validation(tmp_path):
+    """Quarters accept labels and dates, and incomplete records are rejected."""
+    assert quarter_label(quarter_ordinal("2024q3")) == "2024Q3"
+    assert quarter_label(quarter_ordinal(datetime.date(2025, 11, 3))) == "2025Q4"
+    with pytest.raises(ValueError):
+        quarter_ordinal("2024Q5")
+
+    history = ScoreHistory(tmp_path)
+    with pytest.raises(ValueError):
+        history.append("Acme", "2024Q1", exit_ai_r_score=50.0)
+    with pytest.raises(ValueError, match="missing required columns"):
+        history.append_many(pd.DataFrame({'company_name': ["Acme"], 'quarter': ["2024Q1"]}))
+    assert history.companies() == [] and history.fund_trend().empty
@@ -0,0 +1,98 @@
+import json
+
+import pytest
+
+import instrumentation
+from cache_policy import bounded_cache, CACHE_REGISTRY
+from instrumentation import finish_rerun, profile_section, profiled_fragment, record_call, start_rerun
+
+
+@pytest.fixture
+def profiling(monkeypatch):
+    """Enables profiling with a fresh metrics registry for one test."""
+    monkeypatch.setattr(instrumentation, 'PROFILING_ENABLED', True)
+    monkeypatch.setattr(instrumentation, 'METRICS', instrumentation.MetricsRegistry())
+    yield
+    instrumentation._local.profile = None
+
+
+def test_rerun_records_sections_and_cached_calls(profiling, tmp_path):
+    """Each profile_section closes the previous one, and cached calls record hits and misses."""
+    @bounded_cache("test_instrumentation_square", max_entries=4)
+    def square(x):
+        return x * x
+
+    try:
+        start_rerun(session_id="abc")
+        profile_section("first")
+        square(3)
+        profile_section("second")
+        square(3)
+        record = finish_rerun(metrics_dir=tmp_path)
+    finally:
+        CACHE_REGISTRY.pop("test_instrumentation_square", None)
+
+    assert record['session_id'] == "abc"
+    assert [s['section'] for s in record['sections']] == ["first", "second"]
+    assert [(c['function'], c['hit']) for c in record['calls']] == [
+        ("test_instrumentation_square", False), ("test_instrumentation_square", True)
+    ]
+    assert record['total_seconds'] >= sum(s['seconds'] for s in record['sections'])
+
+
+def test_finish_rerun_exports_jsonl_and_prometheus(profiling, tmp_path):
+    """Every finished rerun appends a JSON line and refreshes the Prometheus histograms."""
+    for _ in range(2):
+        start_rerun()
+        profile_section("setup")
+        record_call("valuation", 0.002, False)
+        finish_rerun(metrics_dir=tmp_path)
+
+    lines = (tmp_path / "reruns.jsonl").read_text().splitlines()
+    assert len(lines) == 2
+    assert json.loads(lines[0])['sections'][0]['section'] == "setup"
+
+    prom = (tmp_path / "metrics.prom").read_text()
+    assert "qulab_rerun_seconds_count 2" in prom
+    assert 'qulab_section_seconds_bucket{section="setup",le="+Inf"} 2' in prom
+    assert 'qulab_cached_call_total{function="valuation",result="miss"} 2' in prom
+    assert set(instrumentation.METRICS.recent_percentiles()) == {50, 95}
+
+
+def test_profiled_fragment_records_fragment_only_reruns(profiling, monkeypatch, tmp_path):
+    """A fragment rerun is exported with its own scope; inside a full rerun it adds nothing."""
+    monkeypatch.setattr(instrumentation, 'METRICS_DIR', tmp_path)
+
+    @profiled_fragment("2_dimension_scores")
+    def fragment():
+        record_call("charts.render_dimension_scores", 0.01, True)
+        return "drawn"
+
+    monkeypatch.setattr(instrumentation, '_fragment_only_run', lambda: (False, None))
+    start_rerun()
+    profile_section("2_dimension_scores")
+    assert fragment() == "drawn"
+    full = finish_rerun(metrics_dir=tmp_path)
+    assert full['scope'] == "app" and len(full['sections']) == 1 and len(full['calls']) == 1
+
+    monkeypatch.setattr(instrumentation, '_fragment_only_run', lambda: (True, "session-1"))
+    assert fragment() == "drawn"
+    records = [json.loads(line) for line in (tmp_path / "reruns.jsonl").read_text().splitlines()]
+    assert records[-1]['scope'] == "2_dimension_scores"
+    assert records[-1]['session_id'] == "session-1"
+    assert records[-1]['calls'][0]['function'] == "charts.render_dimension_scores"
+
+    prom = (tmp_path / "metrics.prom").read_text()
+    assert "qulab_rerun_seconds_count 1" in prom
+    assert 'qulab_fragment_rerun_seconds_count{fragment="2_dimension_scores"} 1' in prom
+    assert len(instrumentation.METRICS.recent_totals) == 1
+
+
+def test_hooks_are_no_ops_when_disabled(monkeypatch, tmp_path):
+    """With profiling off nothing is recorded and no files are written."""
+    monkeypatch.setattr(instrumentation, 'PROFILING_ENABLED', False)
+    start_rerun()
+    profile_section("setup")
+    record_call("valuation", 0.001, True)
+    assert finish_rerun(metrics_dir=tmp_path) is None
+    assert not any(tmp_path.iterdir())
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from inverse import iso_multiple_line, required_exit_air_score, solve_required_scores
+from scoring import calculate_exit_air_scores, project_valuation_impact
+
+
+def test_required_score_inverts_the_projection():
+    """Projecting the required score gives back the target multiple."""
+    targets = np.linspace(7.5, 9.0, 7)
+    required = required_exit_air_score(targets, 7.0, 2.0)
+    np.testing.assert_allclose(project_valuation_impact(required, 7.0, 2.0), targets)
+    assert required_exit_air_score(6.5, 7.0, 2.0) == 0.0
+    assert np.isinf(required_exit_air_score(8.0, 7.0, 0.0))
+
+
+def test_single_dimension_improvements_reach_the_target():
+    """Raising the reported dimension by the reported amount lands exactly on the target multiple."""
+    result = solve_required_scores(8.6, 75, 60, 80, 0.35, 0.40, 0.25, 7.0, 2.0)
+    assert result.required_score == pytest.approx(80.0)
+    assert result.feasible and not result.already_met
+
+    # Documented has the largest weight, so it is the cheapest lever
+    assert result.best_dimension == 1
+    assert result.best_increase == pytest.approx((80.0 - 70.25) / 0.40)
+    new_score = calculate_exit_air_scores(75, 60 + result.best_increase, 80, 0.35, 0.40, 0.25).score
+    assert project_valuation_impact(new_score, 7.0, 2.0) == pytest.approx(8.6)
+
+    # Visible would need 102.9, which is outside the scale
+    assert not result.dimension_feasible[0]
+    assert result.required_dimension[0] == pytest.approx(75 + 9.75 / 0.35)
+
+
+def test_batched_targets_and_companies_with_edge_cases():
+    """Targets x companies broadcast in one call, including met, infeasible and zero-weight cases."""
+    targets = np.array([7.5, 8.6, 9.5])[:, None]
+    visible = np.array([75.0, 100.0, 10.0, 50.0])
+    result = solve_required_scores(targets, visible, 60, 80, np.array([0.35, 0.35, 0.35, 0.0]), 0.40, 0.25, 7.0, 2.0)
+    assert result.best_dimension.shape == (3, 4)
+    assert result.dimension_increase.shape == (3, 4, 3)
+
+    assert result.already_met[0].all() and (result.best_increase[0] == 0).all() and (result.best_dimension[0] == -1).all()
+    # 9.5x needs a score of 125, which no weights can produce
+    assert not result.feasible[2].any() and np.isnan(result.best_increase[2]).all()
+    # A dimension without weight is never the lever
+    assert np.isinf(result.dimension_increase[1, 3, 0]) and result.best_dimension[1, 3] != 0
+
+
+def test_iso_multiple_line_stays_on_target():
+    """Every point on the iso-multiple line scores exactly the required Exit-AI-R inside the square."""
+    x, y = iso_multiple_line(80.0, 0.35, 0.40, fixed_contribution=0.25 * 80)
+    assert len(x) > 0
+    np.testing.assert_allclose(0.35 * x + 0.40 * y + 0.25 * 80, 80.0)
+    assert (x >= 0).all() and (x <= 100).all() and (y >= 0).all() and (y <= 100).all()
+
+    x, y = iso_multiple_line(50.0, 0.5, 0.0)
+    assert np.allclose(x, 100.0)
+    assert iso_multiple_line(50.0, 0.0, 0.0)[0].size == 0
@@ -0,0 +1,80 @@
+import threading
+import time
+
+import pytest
+
+from jobs import CANCELLED, DONE, FAILED, JobCancelled, JobLimitError, JobQueue
+
+
+def _wait(job, timeout=5.0):
+    deadline = time.time() + timeout
+    while job.active and time.time() < deadline:
+        time.sleep(0.01)
+    assert not job.active
+
+
+def test_results_progress_and_failures_are_recorded():
+    """A finished job keeps its result and full progress; an exception marks it failed."""
+    queue = JobQueue(max_workers=2)
+    seen = []
+
+    def count(job, n):
+        for i in range(n):
+            job.report((i + 1) / n, f"{i + 1} of {n}")
+            seen.append(job.progress)
+        return n * 2
+
+    job = queue.submit("alice", "count", count, 4)
+    _wait(job)
+    assert job.status == DONE and job.result == 8 and job.progress == 1.0
+    assert seen == [0.25, 0.5, 0.75, 1.0]
+
+    failing = queue.submit("alice", "fail", lambda job: 1 / 0)
+    _wait(failing)
+    assert failing.status == FAILED and "ZeroDivisionError" in failing.error
+    assert [j.name for j in queue.jobs("alice")] == ["fail", "count"] and queue.jobs("bob") == []
+    queue.shutdown()
+
+
+def test_cancel_running_and_queued_jobs():
+    """Running jobs stop at their next report; queued jobs never start."""
+    queue = JobQueue(max_workers=1, max_per_owner=5)
+    started, release = threading.Event(), threading.Event()
+
+    def blocking(job):
+        started.set()
+        release.wait(5)
+        job.report(0.5)
+        return "finished"
+
+    running = queue.submit("alice", "running", blocking)
+    queued = queue.submit("alice", "queued", lambda job: "never")
+    assert started.wait(5)
+    assert queue.cancel(queued.id) and queued.status == CANCELLED
+    assert queue.cancel(running.id)
+    release.set()
+    _wait(running)
+    assert running.status == CANCELLED and running.result is None
+    assert not queue.cancel(running.id)
+    with pytest.raises(JobCancelled):
+        running.report(1.0)
+    queue.shutdown()
+
+
+def test_per_owner_limit_and_retention():
+    """An owner cannot exceed the active-job limit; expired finished jobs are pruned and cleaned up."""
+    queue = JobQueue(max_workers=4, max_per_owner=2, retention_seconds=0)
+    release = threading.Event()
+    jobs = [queue.submit("alice", f"job {i}", lambda job: release.wait(5)) for i in range(2)]
+    with pytest.raises(JobLimitError):
+        queue.submit("alice", "one too many", lambda job: None)
+    # Other owners are not affected by alice's limit
+    cleaned = []
+    other = queue.submit("bob", "other", lambda job: "ok", cleanup=cleaned.append)
+    release.set()
+    for job in jobs + [other]:
+        _wait(job)
+    time.sleep(0.01)
+    assert queue.jobs() == [] and cleaned == [other]
+    assert queue.get(other.id) is None
+    queue.shutdown()
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from peer_index import PeerIndex, load_peer_index, ordinal, synthetic_peer_assessments
+from scoring import SCORE_COLUMNS, calculate_exit_air_scores
+
+
+def test_percentile_ranks_match_a_brute_force_count():
+    """Sorted-array ranks equal (below + ties / 2) / n computed directly on the peer table."""
+    peers = synthetic_peer_assessments(2_000, seed=1)
+    index = PeerIndex.from_frame(peers)
+    values = np.array([0.0, 35.0, 50.0, 62.0, 100.0])
+    for sector, size in [(None, None), ("Software", None), ("Software", "Mid")]:
+        mask = np.ones(len(peers), dtype=bool)
+        if sector:
+            mask &= (peers['sector'] == sector).to_numpy()
+        if size:
+            mask &= (peers['deal_size'] == size).to_numpy()
+        group = peers.loc[mask, 'visible_score'].to_numpy()
+        expected = [100.0 * ((group < v).sum() + 0.5 * (group == v).sum()) / len(group) for v in values]
+        np.testing.assert_allclose(index.percentile_ranks('visible_score', values, sector, size), expected)
+        assert index.count(sector, size) == len(group)
+
+
+def test_peer_context_falls_back_to_wider_groups():
+    """Small (sector, size) groups fall back to the sector, then to all peers."""
+    peers = pd.DataFrame({
+        'sector': ["Software"] * 40 + ["Retail"] * 5,
+        'deal_size': ["Mid"] * 10 + ["Large"] * 30 + ["Mid"] * 5,
+        'visible_score': np.arange(45.0), 'documented_score': 50.0, 'sustainable_score': 50.0,
+    })
+    index = PeerIndex.from_frame(peers)
+    scores = {'exit_ai_r_score': 50.0, 'visible_score': 20.0, 'documented_score': 50.0, 'sustainable_score': 50.0}
+
+    context = index.peer_context(scores, "Software", "Mid", min_peers=30)
+    assert context['group'] == "Software" and context['n_peers'] == 40
+    assert context['percentiles']['visible_score'] == pytest.approx(100.0 * 20.5 / 40)
+
+    assert index.peer_context(scores, "Retail", "Mid", min_peers=30)['group'] == "All sectors"
+    assert index.peer_context(scores, "Software", "Large", min_peers=30)['group'] == "Software / Large deals"
+    assert np.isnan(index.percentile_ranks('visible_score', 20.0, "Energy"))
+
+
+def test_custom_weights_rank_against_rescored_peers():
+    """With custom weights the Exit-AI-R rank uses peers rescored with those weights; the app defaults reuse the index."""
+    peers = synthetic_peer_assessments(3_000, seed=4)
+    index = PeerIndex.from_frame(peers)
+    mask = ((peers['sector'] == "Software") & (peers['deal_size'] == "Mid")).to_numpy()
+    v, d, s = (peers.loc[mask, c].to_numpy(dtype=float) for c in SCORE_COLUMNS)
+    for weights in [(0.35, 0.40, 0.25), (0.8, 0.1, 0.1), (1.0, 1.0, 0.0)]:
+        score = float(calculate_exit_air_scores(75, 60, 80, *weights).score)
+        rescored = calculate_exit_air_scores(v, d, s, *weights).score
+        expected = 100.0 * ((rescored < score).sum() + 0.5 * (rescored == score).sum()) / len(rescored)
+        context = index.peer_context(
+            {'exit_ai_r_score': score, 'visible_score': 75}, "Software", "Mid", weights=weights
+        )
+        assert context['percentiles']['exit_ai_r_score'] == pytest.approx(expected)
+        assert context['percentiles']['visible_score'] == pytest.approx(float(index.percentile_ranks('visible_score', 75, "Software", "Mid")))
+
+
+def test_missing_columns_raise():
+    """Peer data without the score or grouping columns is rejected."""
+    with pytest.raises(ValueError, match="deal_size"):
+        PeerIndex.from_frame(pd.DataFrame({'sector': ["Software"], 'visible_score': [1], 'documented_score': [1], 'sustainable_score': [1]}))
+
+
+def test_ordinal_and_bundled_sample():
+    """Ordinals use the English suffixes, and the bundled sample loads once per file version."""
+    assert [ordinal(r) for r in (1, 2, 3, 4, 11, 12, 13, 21, 22.6, 99.5)] == [
+        '1st', '2nd', '3rd', '4th', '11th', '12th', '13th', '21st', '23rd', '100th'
+    ]
+    index = load_peer_index()
+    assert index is load_peer_index()
+    assert "Software" in index.sectors and index.deal_sizes == ['Small', 'Mid', 'Large']
+    assert load_peer_index("does/not/exist.csv") is None
@@ -0,0 +1,87 @@
+import datetime
+
+import numpy as np
+import pytest
+
+from pipeline import EXIT_PIPELINE_INPUTS, build_exit_pipeline, IncrementalPipeline, Stage
+from scoring import calculate_exit_air_scores
+
+
+def _inputs(**overrides):
+    inputs = dict(
+        persona_name="Jane Doe", firm_name="Alpha Capital", company_name="InnovateTech", sector="Software", deal_size="Mid",
+        visible_score=75, documented_score=60, sustainable_score=80,
+        w_visible=0.35, w_documented=0.40, w_sustainable=0.25,
+        baseline_ebitda_multiple=7.0, ai_premium_coefficient=2.0,
+    )
+    inputs.update(overrides)
+    return inputs
+
+
+def test_values_match_the_direct_formulas():
+    """The pipeline returns the same score, multiple and narrative as the underlying functions."""
+    pipeline = build_exit_pipeline(**_inputs())
+    assert set(EXIT_PIPELINE_INPUTS) == set(_inputs())
+    score = float(calculate_exit_air_scores(75, 60, 80, 0.35, 0.40, 0.25).score)
+    assert pipeline.get('exit_ai_r_score') == pytest.approx(score)
+    assert pipeline.get('projected_ebitda_multiple') == pytest.approx(7.0 + 2.0 * score / 100)
+    assert "InnovateTech" in pipeline.get('narrative')
+    assert "Peer Benchmarking (Software / Mid deals" in pipeline.get('narrative')
+
+
+def test_only_downstream_stages_are_invalidated():
+    """Changing delta leaves the score clean; changing a score invalidates the whole chain."""
+    pipeline = build_exit_pipeline(**_inputs())
+    pipeline.get('narrative')
+    assert pipeline.compute_counts == {
+        'exit_air': 1, 'exit_ai_r_score': 1, 'projected_ebitda_multiple': 1, 'peer_context': 1, 'narrative': 1
+    }
+
+    assert pipeline.set_inputs(ai_premium_coefficient=3.0) == {'projected_ebitda_multiple', 'narrative'}
+    assert not pipeline.is_dirty('exit_ai_r_score')
+    pipeline.get('narrative')
+    assert pipeline.compute_counts['exit_air'] == 1
+    assert pipeline.compute_counts['projected_ebitda_multiple'] == 2
+
+    assert pipeline.set_inputs(visible_score=90) == {
+        'exit_air', 'exit_ai_r_score', 'projected_ebitda_multiple', 'peer_context', 'narrative'
+    }
+    assert pipeline.set_inputs(visible_score=90, company_name="InnovateTech") == set()
+    assert pipeline.set_inputs(visible_score=90.0, baseline_ebitda_multiple=np.float64(7.0)) == set()
+
+
+def test_repeated_inputs_are_memoized_and_lazy():
+    """Returning to earlier inputs reuses memoized results, and unread stages are never computed."""
+    pipeline = build_exit_pipeline(**_inputs())
+    first = pipeline.get('projected_ebitda_multiple')
+    pipeline.set_inputs(visible_score=10)
+    pipeline.get('projected_ebitda_multiple')
+    pipeline.set_inputs(visible_score=75)
+    assert pipeline.get('projected_ebitda_multiple') == first
+    assert pipeline.compute_counts['exit_air'] == 2
+    assert pipeline.compute_counts['narrative'] == 0
+
+    # Equal weights in a different split give the same score, so the multiple is not recomputed
+    pipeline.set_inputs(w_visible=0.40, w_documented=0.35, visible_score=60, documented_score=75)
+    pipeline.get('projected_ebitda_multiple')
+    assert pipeline.compute_counts['projected_ebitda_multiple'] == 2
+
+
+def test_report_date_is_an_input_of_the_narrative():
+    """A new day re-renders only the narrative; a memoized narrative never carries a stale date."""
+    pipeline = build_exit_pipeline(report_date=datetime.date(2026, 3, 1), **_inputs())
+    assert "Date: 2026-03-01" in pipeline.get('narrative')
+    assert pipeline.set_inputs(report_date=datetime.date(2026, 3, 2)) == {'narrative'}
+    assert "Date: 2026-03-02" in pipeline.get('narrative')
+    assert pipeline.compute_counts['exit_air'] == 1
+    assert "Date: " + datetime.date.today().isoformat() in build_exit_pipeline(**_inputs()).get('narrative')
+
+
+def test_unknown_names_and_stage_inputs_are_rejected():
+    """Reading an unknown name or setting a stage as if it were an input raises."""
+    pipeline = IncrementalPipeline({'double': Stage(lambda x: 2 * x, ('x',))}, {'x': 2})
+    assert pipeline.get('double') == 4
+    with pytest.raises(KeyError):
+        pipeline.get('y')
+    with pytest.raises(ValueError):
+        pipeline.set_inputs(double=3)
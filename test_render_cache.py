@@ -0,0 +1,76 @@
+import numpy as np
+
+from render_cache import ByteBudgetLRUCache, make_cache_key
+from charts import render_chart_cached, render_dimension_scores, CHART_CACHE
+
+
+class FakeClock:
+    """A controllable clock for TTL tests."""
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_eviction_respects_byte_budget():
+    """
+    Verifies that least-recently-used entries are evicted once the byte budget is exceeded.
+    """
+    cache = ByteBudgetLRUCache(max_bytes=10)
+    cache.put('a', b'1234')
+    cache.put('b', b'1234')
+    assert cache.get('a') == b'1234' # 'a' is now most recently used
+    cache.put('c', b'1234')          # 12 bytes > 10, so 'b' is evicted
+
+    assert cache.get('b') is None
+    assert cache.get('a') == b'1234' and cache.get('c') == b'1234'
+    stats = cache.stats()
+    assert stats['current_bytes'] == 8
+    assert stats['evictions'] == 1
+    assert (stats['hits'], stats['misses']) == (3, 1)
+
+
+def test_ttl_expiration_and_oversized_payloads():
+    """
+    Tests that entries expire after the TTL and that payloads larger than the budget are not stored.
+    """
+    clock = FakeClock()
+    cache = ByteBudgetLRUCache(max_bytes=100, ttl_seconds=60, clock=clock)
+    cache.put('chart', b'png')
+    clock.now = 59
+    assert cache.get('chart') == b'png'
+    clock.now = 61
+    assert cache.get('chart') is None
+    assert cache.stats()['expirations'] == 1
+
+    cache.put('huge', b'x' * 101)
+    assert cache.stats()['entries'] == 0
+
+
+def test_cache_key_is_stable_for_equal_inputs():
+    """
+    Tests that equal plotted inputs, including NumPy arrays and dicts, produce the same key.
+    """
+    key = make_cache_key('ternary', np.arange(6.0).reshape(2, 3), {'Visible': 75, 'Documented': 60})
+    assert key == make_cache_key('ternary', np.arange(6.0).reshape(2, 3), {'Documented': 60, 'Visible': 75})
+    assert key != make_cache_key('ternary', np.arange(6.0).reshape(3, 2), {'Visible': 75, 'Documented': 60})
+    assert make_cache_key(1) != make_cache_key(1.0)
+
+
+def test_render_chart_cached_renders_once():
+    """
+    Tests that a chart is rendered to PNG on the first request and served from the cache afterwards.
+    """
+    CHART_CACHE.clear()
+    scores = {'Visible': 11, 'Documented': 22, 'Sustainable': 33}
+    misses_before = CHART_CACHE.stats()['misses']
+
+    png = render_chart_cached(render_dimension_scores, scores, "CacheCo")
+    again = render_chart_cached(render_dimension_scores, dict(scores), "CacheCo")
+    svg = render_chart_cached(render_dimension_scores, scores, "CacheCo", fmt='svg')
+
+    assert png.startswith(b'\x89PNG')
+    assert again is png
+    assert b'<svg' in svg[:500]
+    assert CHART_CACHE.stats()['misses'] - misses_before == 2 # PNG and SVG rendered once each
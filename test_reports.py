@@ -0,0 +1,46 @@
+import zipfile
+
+import pandas as pd
+
+from reports import generate_bulk_reports, write_reports_zip, company_slug
+from scoring import score_portfolio
+
+
+def make_scored_portfolio(n):
+    """Scores a small synthetic portfolio with the app's default weights and valuation inputs."""
+    portfolio = pd.DataFrame({
+        'company_name': [f"Co {i}/X" for i in range(n)],
+        'visible_score': [50 + i for i in range(n)],
+        'documented_score': [40 + i for i in range(n)],
+        'sustainable_score': [60 + i for i in range(n)],
+    })
+    return score_portfolio(portfolio, weights=(0.35, 0.40, 0.25), baseline=7.0, premium_coeff=2.0)
+
+
+def test_bulk_reports_written_per_company_in_parallel(tmp_path):
+    """
+    Verifies that a process pool writes one report folder per company and reports progress.
+    """
+    progress = []
+    written = generate_bulk_reports(
+        make_scored_portfolio(6), tmp_path / "reports", with_charts=False, n_workers=2,
+        progress=lambda done, total: progress.append((done, total))
+    )
+
+    assert len(written) == 6
+    assert progress[-1] == (6, 6)
+    report = (tmp_path / "reports" / company_slug(2, "Co 2/X") / "report.md").read_text()
+    assert "Co 2/X: Quantified AI Exit Narrative Report" in report
+
+
+def test_bulk_reports_with_charts_are_zipped(tmp_path):
+    """
+    Tests chart files alongside each report and the streamed ZIP archive.
+    """
+    written = generate_bulk_reports(make_scored_portfolio(2), tmp_path / "reports", with_charts=True, n_workers=1)
+    zip_path = write_reports_zip(tmp_path / "reports", written, tmp_path / "reports.zip")
+
+    with zipfile.ZipFile(zip_path) as archive:
+        names = archive.namelist()
+        assert len(names) == 6 # report.md + two charts per company
+        assert archive.read(f"{company_slug(0, 'Co 0/X')}/dimension_scores.png").startswith(b'\x89PNG')
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from batch_cli import main
+from rubric import RUBRIC_PATH, Criterion, Rubric, load_rubric
+from scoring import SCORE_COLUMNS, calculate_exit_air_scores
+
+SMALL_RUBRIC = Rubric([
+    Criterion('a', "A", 'visible_score', 3.0),
+    Criterion('b', "B", 'visible_score', 1.0),
+    Criterion('c', "C", 'documented_score', 1.0),
+    Criterion('d', "D", 'sustainable_score', 2.0),
+    Criterion('e', "E", 'sustainable_score', 2.0),
+])
+
+
+def test_matrix_product_matches_weighted_averages():
+    """Dimension scores are per-dimension weighted averages, and the top level is calculate_exit_air_scores."""
+    ratings = np.array([[100, 0, 50, 20, 40], [40, 80, 70, 90, 10]], dtype=float)
+    result = SMALL_RUBRIC.score(ratings, 0.35, 0.40, 0.25)
+    np.testing.assert_allclose(result.dimension_scores, [[75, 50, 30], [50, 70, 50]])
+    expected = calculate_exit_air_scores(*result.dimension_scores.T, 0.35, 0.40, 0.25).score
+    np.testing.assert_allclose(result.exit_air.score, expected)
+
+    # A single company as a dict gives the same numbers
+    single = SMALL_RUBRIC.score(dict(zip('abcde', ratings[1])), 0.35, 0.40, 0.25)
+    assert single.exit_air.score == pytest.approx(expected[1])
+
+
+def test_unrated_criteria_are_left_out():
+    """Missing ratings rescale the remaining weights; a dimension with nothing rated is NaN."""
+    scores = SMALL_RUBRIC.dimension_scores({'a': 80, 'c': np.nan, 'd': 40, 'e': np.nan})
+    assert scores[0] == pytest.approx(80) and np.isnan(scores[1]) and scores[2] == pytest.approx(40)
+
+
+def test_invalid_rubrics_and_ratings_raise():
+    """Unknown dimensions, empty dimensions and wrongly shaped ratings are rejected."""
+    with pytest.raises(ValueError, match="unknown dimensions"):
+        Rubric([Criterion('x', "X", 'growth_score', 1.0)])
+    with pytest.raises(ValueError, match="no weighted criteria"):
+        Rubric([Criterion('x', "X", 'visible_score', 1.0)])
+    with pytest.raises(ValueError):
+        SMALL_RUBRIC.dimension_scores(np.zeros((2, 4)))
+    with pytest.raises(ValueError, match="missing rubric criteria"):
+        SMALL_RUBRIC.dimension_scores(pd.DataFrame({'a': [1.0]}))
+
+
+def test_bundled_rubric_scores_criteria_portfolios(tmp_path, capsys):
+    """The bundled config round-trips slider scores and lets the batch CLI score criterion columns."""
+    rubric = load_rubric()
+    assert all(10 <= len(rubric.criteria_for(col)) <= 30 for col in SCORE_COLUMNS)
+    seed = {'visible_score': 75, 'documented_score': 60, 'sustainable_score': 80}
+    np.testing.assert_allclose(rubric.dimension_scores(rubric.ratings_from_dimension_scores(seed)), [75, 60, 80])
+
+    ratings = pd.DataFrame(np.random.default_rng(0).uniform(0, 100, (20, len(rubric.ids))), columns=rubric.ids)
+    ratings.to_csv(tmp_path / "criteria.csv", index=False)
+    assert main([str(tmp_path / "criteria.csv"), str(tmp_path / "out.csv"), "--rubric", str(RUBRIC_PATH)]) == 0
+    scored = pd.read_csv(tmp_path / "out.csv")
+    np.testing.assert_allclose(scored[SCORE_COLUMNS].to_numpy(), rubric.dimension_scores(ratings))
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from scenarios import INPUT_COLUMNS, ScenarioStore
+from scoring import calculate_exit_air_scores, project_valuation_impact
+
+BASE_INPUTS = {
+    'visible_score': 60, 'documented_score': 50, 'sustainable_score': 40,
+    'w_visible': 0.35, 'w_documented': 0.40, 'w_sustainable': 0.25,
+    'baseline_ebitda_multiple': 7.0, 'ai_premium_coefficient': 2.0,
+}
+
+
+def test_save_partial_update_and_reload(tmp_path):
+    """Saving computes the outputs, later saves only change the given inputs, and the table survives a reload."""
+    path = tmp_path / "scenarios.parquet"
+    store = ScenarioStore(path)
+    row = store.save("Acme", "Base case", **BASE_INPUTS)
+    expected = calculate_exit_air_scores(60, 50, 40, 0.35, 0.40, 0.25).score
+    assert row['exit_ai_r_score'] == pytest.approx(float(expected))
+    assert row['projected_ebitda_multiple'] == pytest.approx(float(project_valuation_impact(expected, 7.0, 2.0)))
+
+    store.save("Acme", "Downside", **{**BASE_INPUTS, 'baseline_ebitda_multiple': 5.5})
+    updated = store.save("Acme", "Base case", visible_score=80)
+    assert updated['visible_score'] == 80 and updated['documented_score'] == 50
+    assert updated['exit_ai_r_score'] > row['exit_ai_r_score']
+
+    reopened = ScenarioStore(path)
+    assert reopened.companies() == ["Acme"]
+    assert reopened.scenarios("Acme")['scenario'].tolist() == ["Downside", "Base case"]
+    assert reopened.delete("Acme", "Downside") and not reopened.delete("Acme", "Downside")
+    # The first store sees the other instance's change on its next read
+    assert store.scenarios("Acme")['scenario'].tolist() == ["Base case"]
+
+    with pytest.raises(ValueError, match="missing inputs"):
+        store.save("Acme", "New", visible_score=10)
+    with pytest.raises(ValueError, match="Unknown scenario inputs"):
+        store.save("Acme", "Base case", revenue=1.0)
+
+
+def test_update_shared_recomputes_every_scenario(tmp_path):
+    """A shared input change is applied to one company's scenarios only, with outputs matching the scalar scoring."""
+    store = ScenarioStore(tmp_path / "scenarios.parquet")
+    rng = np.random.default_rng(3)
+    frame = pd.DataFrame([
+        {'company_name': company, 'scenario': f"Case {i}", **BASE_INPUTS, 'baseline_ebitda_multiple': rng.uniform(5, 12)}
+        for company in ("Acme", "Globex") for i in range(20)
+    ])
+    assert store.save_many(frame) == 40
+    globex_before = store.scenarios("Globex")
+
+    assert store.update_shared("Acme", documented_score=90, w_documented=0.5) == 20
+    acme = store.scenarios("Acme")
+    assert (acme['documented_score'] == 90).all() and (acme['w_documented'] == 0.5).all()
+    expected = calculate_exit_air_scores(60, 90, 40, 0.35, 0.5, 0.25).score
+    np.testing.assert_allclose(acme['exit_ai_r_score'], expected)
+    np.testing.assert_allclose(
+        acme['projected_ebitda_multiple'], project_valuation_impact(expected, acme['baseline_ebitda_multiple'], 2.0)
+    )
+    pd.testing.assert_frame_equal(store.scenarios("Globex"), globex_before)
+    assert store.update_shared("Initech", w_visible=1.0) == 0
+
+
+def test_compare_and_diff_against_base(tmp_path):
+    """compare lays scenarios out side by side in the requested order and diffs them against the base."""
+    store = ScenarioStore(tmp_path / "scenarios.parquet")
+    store.save("Acme", "Strategic", **{**BASE_INPUTS, 'ai_premium_coefficient': 3.0})
+    store.save("Acme", "Sponsor", **BASE_INPUTS)
+    store.save("Acme", "Downside", **{**BASE_INPUTS, 'baseline_ebitda_multiple': 5.0})
+
+    comparison = store.compare("Acme", ["Sponsor", "Downside", "Strategic"], base="Sponsor")
+    assert comparison.values.columns.tolist() == ["Sponsor", "Downside", "Strategic"]
+    assert comparison.values.index.tolist()[:len(INPUT_COLUMNS)] == INPUT_COLUMNS
+    assert (comparison.diff["Sponsor"] == 0).all()
+    assert comparison.diff.loc['baseline_ebitda_multiple', "Downside"] == pytest.approx(-2.0)
+    assert comparison.diff.loc['projected_ebitda_multiple', "Strategic"] > 0
+
+    assert store.compare("Acme").diff is None
+    with pytest.raises(KeyError):
+        store.compare("Acme", ["Sponsor"], base="Downside")
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from scoring import calculate_exit_air_scores, project_valuation_impact, score_portfolio
+
+
+def test_batch_scores_match_scalar_formula():
+    """
+    Verifies that the vectorized calculation reproduces the single-company formula row by row.
+    """
+    visible = np.array([75, 100, 0])
+    documented = np.array([60, 50, 100])
+    sustainable = np.array([80, 0, 50])
+
+    result = calculate_exit_air_scores(visible, documented, sustainable, 0.35, 0.40, 0.25)
+
+    expected = 0.35 * visible + 0.40 * documented + 0.25 * sustainable
+    assert np.allclose(result.score, expected)
+    assert not result.normalized_mask.any()
+    assert not result.zero_weight_mask.any()
+
+
+def test_batch_weight_normalization_and_zero_sum_masks():
+    """
+    Tests per-row weights, including rows that need normalization and rows whose weights sum to zero.
+    """
+    result = calculate_exit_air_scores(
+        [100, 100, 100], [50, 50, 50], [0, 0, 0],
+        [0.5, 0.2, 0.0], [0.3, 0.2, 0.0], [0.2, 0.1, 0.0]
+    )
+
+    # Row 0 sums to 1.0, row 1 sums to 0.5 (normalized to 0.4/0.4/0.2), row 2 sums to zero
+    assert np.allclose(result.score, [65.0, 60.0, 0.0])
+    assert np.allclose(result.w_v, [0.5, 0.4, 0.0])
+    assert list(result.normalized_mask) == [False, True, True]
+    assert list(result.zero_weight_mask) == [False, False, True]
+
+
+def test_project_valuation_impact_vectorized():
+    """
+    Tests that the valuation projection broadcasts over arrays of scores.
+    """
+    projected = project_valuation_impact(np.array([70.25, 0.0, 100.0]), 8.0, 3.0)
+    assert np.allclose(projected, [10.1075, 8.0, 11.0])
+
+
+def test_score_portfolio_with_shared_and_per_row_inputs():
+    """
+    Tests portfolio scoring with shared weights and per-row valuation inputs.
+    """
+    portfolio = pd.DataFrame({
+        'company_name': ['InnovateTech', 'LegacyCo'],
+        'visible_score': [75, 20],
+        'documented_score': [60, 10],
+        'sustainable_score': [80, 30],
+        'baseline_ebitda_multiple': [7.0, 6.0],
+        'ai_premium_coefficient': [2.0, 1.0],
+    })
+
+    scored = score_portfolio(portfolio, weights=(0.35, 0.40, 0.25))
+
+    assert np.allclose(scored['exit_ai_r_score'], [70.25, 18.5])
+    assert np.allclose(scored['projected_ebitda_multiple'], [7.0 + 2.0 * 0.7025, 6.0 + 1.0 * 0.185])
+    assert 'exit_ai_r_score' not in portfolio.columns # Input is left untouched
+
+
+def test_score_portfolio_requires_score_columns():
+    """
+    Tests that a portfolio without the dimension score columns is rejected.
+    """
+    with pytest.raises(ValueError, match="documented_score"):
+        score_portfolio(pd.DataFrame({'visible_score': [1], 'sustainable_score': [1]}), weights=(1, 0, 0))
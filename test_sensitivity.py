@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+from monte_carlo import distribution_ppf, normal, triangular, uniform
+from sensitivity import (
+    SENSITIVITY_INPUTS, projected_multiple, projected_multiple_gradient, saltelli_unit_samples, scrambled_halton,
+    sensitivity_analysis,
+)
+
+BASE = {
+    'visible': 75, 'documented': 60, 'sustainable': 80,
+    'w_visible': 0.35, 'w_documented': 0.40, 'w_sustainable': 0.25, 'delta': 2.0, 'baseline': 7.0,
+}
+
+
+def test_indices_match_the_analytic_shares_of_a_linear_case():
+    """With only the scores uncertain the multiple is linear, so both indices equal each score's variance share."""
+    result = sensitivity_analysis(BASE, {
+        'visible': uniform(50, 100), 'documented': uniform(40, 60), 'sustainable': uniform(70, 90),
+    }, n_samples=2 ** 14)
+    contributions = (np.array([0.35, 0.40, 0.25]) * np.array([50, 20, 20])) ** 2
+    expected = contributions / contributions.sum()
+    indices = result.indices
+    np.testing.assert_allclose(indices['first_order'].iloc[:3], expected, atol=0.01)
+    np.testing.assert_allclose(indices['total_effect'].iloc[:3], expected, atol=0.01)
+    assert (indices['total_effect'].iloc[3:] == 0).all()
+    assert result.base_projected == pytest.approx(8.405)
+    assert result.variance == pytest.approx((2.0 / 100) ** 2 * contributions.sum() / 12, rel=0.01)
+
+
+def test_derivatives_and_tornado_swings():
+    """Analytic derivatives agree with finite differences and swings evaluate each input at its P10 and P90."""
+    base = dict(BASE, w_visible=0.5, w_documented=0.4, w_sustainable=0.3) # Unnormalized weights
+    gradient = projected_multiple_gradient(base)
+    row = np.array([base[name] for name in SENSITIVITY_INPUTS], dtype=float)
+    for i, name in enumerate(SENSITIVITY_INPUTS):
+        step = np.zeros_like(row)
+        step[i] = 1e-5
+        numeric = (projected_multiple((row + step)[None, :]) - projected_multiple((row - step)[None, :]))[0] / 2e-5
+        assert gradient[name] == pytest.approx(numeric, rel=1e-4, abs=1e-8), name
+
+    result = sensitivity_analysis(base, {'delta': triangular(1.0, 2.0, 3.0), 'baseline': normal(7.0, 1.0)}, n_samples=4096)
+    indices = result.indices
+    assert indices.loc['baseline', 'low'] == pytest.approx(7.0 - 1.2816, abs=1e-3)
+    assert indices.loc['baseline', 'projected_high'] - result.base_projected == pytest.approx(1.2816, abs=1e-3)
+    assert indices['swing'].idxmax() == 'baseline' and indices.loc['visible', 'swing'] == 0
+    assert indices['first_order'].sum() == pytest.approx(1.0, abs=0.05)
+
+
+def test_quasi_random_samples_are_uniform_and_cached():
+    """Scrambled Halton points are stratified, inverse CDFs preserve quantiles and sample matrices are reused."""
+    points = scrambled_halton(4096, 16, seed=3)
+    assert points.min() >= 0 and points.max() < 1
+    # Every 1/16 strip of every dimension holds its share of points
+    counts = np.stack([np.histogram(points[:, j], bins=16, range=(0, 1))[0] for j in range(16)])
+    assert np.abs(counts - 256).max() <= 8
+
+    u = (np.arange(10_000) + 0.5) / 10_000
+    draws = distribution_ppf(triangular(2, 3, 7), u)
+    assert np.mean(draws) == pytest.approx(4.0, abs=1e-3)
+    assert np.median(distribution_ppf(normal(5, 2), u)) == pytest.approx(5.0, abs=1e-3)
+
+    a, b = saltelli_unit_samples(1000, 8, 0, 'halton')
+    assert saltelli_unit_samples(1000, 8, 0, 'halton')[0] is a and not a.flags.writeable
+    assert not np.allclose(a, b)
+    fixed = sensitivity_analysis(BASE, n_samples=100)
+    assert fixed.variance == 0 and fixed.indices['first_order'].isna().all()
+    seen = []
+    sensitivity_analysis(BASE, {'visible': uniform(50, 100)}, n_samples=100, progress=lambda done, total: seen.append((done, total)))
+    assert seen == [(done, 10) for done in range(2, 11)]
+    with pytest.raises(ValueError):
+        sensitivity_analysis(BASE, sampler='latin')
+    with pytest.raises(ValueError):
+        sensitivity_analysis({'visible': 50})
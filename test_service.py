@@ -0,0 +1,129 @@
+import http.client
+import json
+import threading
+import time
+
+import pytest
+
+from narrative import build_ai_exit_narrative
+from scoring import calculate_exit_air_scores, project_valuation_impact
+from service import MicroBatcher, ScoringServer
+
+
+@pytest.fixture
+def service():
+    server = ScoringServer(('127.0.0.1', 0), workers=2, keep_alive=5)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _post(connection, path, body):
+    connection.request('POST', path, json.dumps(body), {'Content-Type': 'application/json'})
+    response = connection.getresponse()
+    return response.status, json.loads(response.read())
+
+
+def test_endpoints_match_the_app_functions(service):
+    """Score, valuation and narrative responses equal the shared scoring functions, over one keep-alive connection."""
+    connection = http.client.HTTPConnection(*service.server_address, timeout=5)
+    status, result = _post(connection, '/v1/score', {
+        'visible_score': 75, 'documented_score': 60, 'sustainable_score': 80,
+        'w_visible': 1, 'w_documented': 1, 'w_sustainable': 2,
+        'baseline_ebitda_multiple': 7.0, 'ai_premium_coefficient': 2.0,
+    })
+    expected = calculate_exit_air_scores(75, 60, 80, 1, 1, 2)
+    assert status == 200 and result['weights_normalized'] is True
+    assert result['exit_ai_r_score'] == pytest.approx(float(expected.score))
+    assert result['projected_ebitda_multiple'] == pytest.approx(float(project_valuation_impact(expected.score, 7.0, 2.0)))
+
+    # An array is scored as one batch and answered in order; the projection is only added where requested
+    status, results = _post(connection, '/v1/score', [
+        {'visible_score': v, 'documented_score': 50, 'sustainable_score': 50} for v in (0, 50, 100)
+    ])
+    assert status == 200 and [r['exit_ai_r_score'] for r in results] == pytest.approx([32.5, 50.0, 67.5])
+    assert 'projected_ebitda_multiple' not in results[0]
+
+    status, result = _post(connection, '/v1/valuation', {'exit_ai_r_score': 70.25, 'baseline_ebitda_multiple': 7.0, 'ai_premium_coefficient': 2.0})
+    assert status == 200 and result['projected_ebitda_multiple'] == pytest.approx(8.405)
+
+    status, result = _post(connection, '/v1/narrative', {
+        'company_name': "InnovateTech", 'visible_score': 75, 'documented_score': 60, 'sustainable_score': 80,
+        'baseline_ebitda_multiple': 7.0, 'ai_premium_coefficient': 2.0,
+    })
+    assert status == 200
+    assert result['narrative'] == build_ai_exit_narrative(
+        "InnovateTech", result['exit_ai_r_score'], 75, 60, 80, 7.0, result['projected_ebitda_multiple'], 2.0, "Jane Doe", "Alpha Capital"
+    )
+    connection.close()
+
+
+def test_invalid_requests_keep_the_connection_usable(service):
+    """Bad input gets a 400 JSON error, unknown paths a 404, and the keep-alive connection keeps working."""
+    connection = http.client.HTTPConnection(*service.server_address, timeout=5)
+    status, result = _post(connection, '/v1/score', {'visible_score': 120, 'documented_score': 60, 'sustainable_score': 80})
+    assert status == 400 and 'visible_score' in result['error']
+    status, result = _post(connection, '/v1/score', {'visible_score': 75, 'documented_score': 60, 'sustainable_score': 80, 'baseline_ebitda_multiple': 7.0})
+    assert status == 400
+    status, result = _post(connection, '/v1/narrative', {'visible_score': 75, 'documented_score': 60, 'sustainable_score': 80})
+    assert status == 400
+    status, _ = _post(connection, '/v1/unknown', {})
+    assert status == 404
+    for invalid, field in [
+        ({'w_visible': -0.5}, 'w_visible'),
+        ({'baseline_ebitda_multiple': 25.0, 'ai_premium_coefficient': 2.0}, 'baseline_ebitda_multiple'),
+        ({'baseline_ebitda_multiple': 7.0, 'ai_premium_coefficient': 6.0}, 'ai_premium_coefficient'),
+    ]:
+        status, result = _post(connection, '/v1/score', {'visible_score': 75, 'documented_score': 60, 'sustainable_score': 80, **invalid})
+        assert status == 400 and field in result['error']
+    status, result = _post(connection, '/v1/valuation', {'exit_ai_r_score': 70, 'baseline_ebitda_multiple': -1.0, 'ai_premium_coefficient': 2.0})
+    assert status == 400 and 'baseline_ebitda_multiple' in result['error']
+
+    connection.request('POST', '/v1/valuation', b'{not json', {'Content-Type': 'application/json'})
+    response = connection.getresponse()
+    assert response.status == 400 and 'Invalid JSON' in json.loads(response.read())['error']
+
+    connection.request('GET', '/healthz')
+    health = json.loads(connection.getresponse().read())
+    assert health['status'] == 'ok' and health['score_batches']['requests'] == 0
+    connection.close()
+
+    # A malformed Content-Length is a 400 on any path; the body's end is unknown, so the connection closes
+    for path in ('/v1/score', '/v1/unknown'):
+        connection = http.client.HTTPConnection(*service.server_address, timeout=5)
+        connection.putrequest('POST', path)
+        connection.putheader('Content-Length', 'abc')
+        connection.endheaders()
+        response = connection.getresponse()
+        assert response.status == 400 and 'Content-Length' in json.loads(response.read())['error']
+        assert response.getheader('Connection') == 'close'
+        connection.close()
+
+
+def test_micro_batcher_coalesces_concurrent_calls():
+    """Calls queued while a batch is computing are answered together in the next batch, and errors reach every caller."""
+    batch_sizes = []
+
+    def slow_double(payloads):
+        batch_sizes.append(len(payloads))
+        if 'boom' in payloads:
+            raise ValueError("boom")
+        time.sleep(0.05)
+        return [p * 2 for p in payloads]
+
+    batcher = MicroBatcher(slow_double, max_batch=64, max_wait=0, workers=1)
+    results = [None] * 20
+    threads = [threading.Thread(target=lambda i=i: results.__setitem__(i, batcher.submit([i])[0])) for i in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [i * 2 for i in range(20)]
+    assert sum(batch_sizes) == 20 and len(batch_sizes) < 20
+    assert batcher.stats()['max_batch'] == max(batch_sizes)
+
+    with pytest.raises(ValueError, match="boom"):
+        batcher.submit(['boom'])
+    batcher.close()
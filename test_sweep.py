@@ -0,0 +1,51 @@
+import time
+
+import numpy as np
+import pytest
+
+from sweep import weight_simplex_grid, run_sensitivity_sweep, simplex_to_cartesian
+
+
+def test_weight_simplex_grid_covers_simplex():
+    """
+    Verifies the grid size and that every weight triplet sums to 1.0.
+    """
+    grid = weight_simplex_grid(0.01)
+    assert grid.shape == (5151, 3)
+    assert np.allclose(grid.sum(axis=1), 1.0)
+    assert (grid >= 0).all()
+
+    with pytest.raises(ValueError):
+        weight_simplex_grid(0.03)
+
+
+def test_sweep_matches_single_point_formulas():
+    """
+    Tests that each cell of the sweep equals the Exit-AI-R and projection formulas evaluated directly.
+    """
+    sweep = run_sensitivity_sweep(75, 60, 80, resolution=0.05, deltas=[1.0, 2.0, 3.0], baselines=[6.0, 8.0])
+
+    assert sweep.projected.shape == (len(sweep.weights), 3, 2)
+    w_v, w_d, w_s = sweep.weights[7]
+    expected_score = 75 * w_v + 60 * w_d + 80 * w_s
+    assert np.isclose(sweep.scores[7], expected_score)
+    assert np.isclose(sweep.projected[7, 2, 1], 8.0 + 3.0 * expected_score / 100)
+
+
+def test_full_resolution_sweep_is_interactive():
+    """
+    Tests that a 1% weight grid against 50 delta values computes well under a second.
+    """
+    start = time.perf_counter()
+    sweep = run_sensitivity_sweep(75, 60, 80, resolution=0.01, deltas=np.linspace(0, 5, 50), baselines=[7.0])
+    assert time.perf_counter() - start < 1.0
+    assert sweep.projected.shape == (5151, 50, 1)
+
+
+def test_simplex_to_cartesian_vertices():
+    """
+    Tests that the pure weight vertices map to the triangle corners.
+    """
+    x, y = simplex_to_cartesian(np.eye(3))
+    assert np.allclose(x, [0.0, 1.0, 0.5])
+    assert np.allclose(y, [0.0, 0.0, np.sqrt(3) / 2])